@@ -0,0 +1,145 @@
+"""
+Answer Cache Module
+Final-answer cache with stale-while-revalidate for context-free questions
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Hashable, Optional, Tuple
+
+from config import (
+    ANSWER_CACHE_FRESH_TTL,
+    ANSWER_CACHE_STALE_TTL,
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_REFRESH_WORKERS
+)
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation"""
+    return re.sub(r"\s+", " ", question.lower()).strip().rstrip("?.! ")
+
+
+def make_answer_key(question: str, tenant_id: Optional[str], model_id: str, data_version: Hashable) -> Tuple:
+    """Cache key for a final answer"""
+    return (normalize_question(question), tenant_id, model_id, data_version)
+
+
+class AnswerCache:
+    """
+    LRU cache of final chatbot responses
+
+    Entries are fresh for fresh_ttl seconds and may then be served stale for
+    up to stale_ttl more seconds while a background refresh recomputes them.
+    """
+
+    def __init__(self, fresh_ttl: float = ANSWER_CACHE_FRESH_TTL, stale_ttl: float = ANSWER_CACHE_STALE_TTL,
+                 max_entries: int = ANSWER_CACHE_MAX_ENTRIES, refresh_workers: int = ANSWER_CACHE_REFRESH_WORKERS):
+        """
+        Args:
+            fresh_ttl: Seconds an answer is served without revalidation
+            stale_ttl: Extra seconds a stale answer may be served while refreshing
+            max_entries: Maximum cached answers
+            refresh_workers: Background threads used for revalidation
+        """
+        self.fresh_ttl = fresh_ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (response, stored_at)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="answer-refresh")
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def get(self, key: Hashable) -> Optional[Tuple[dict, bool]]:
+        """
+        Look up an answer
+
+        Returns:
+            Tuple of (response, is_stale), or None if missing or too old
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            response, stored_at = entry
+            age = time.monotonic() - stored_at
+            if age > self.fresh_ttl + self.stale_ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if age > self.fresh_ttl:
+                self.stale_hits += 1
+                return response, True
+            self.hits += 1
+            return response, False
+
+    def put(self, key: Hashable, response: dict) -> None:
+        """Store an answer, evicting the least recently used beyond max_entries"""
+        with self._lock:
+            self._entries[key] = (response, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def refresh(self, key: Hashable, compute: Callable[[], Optional[dict]]) -> None:
+        """
+        Recompute an entry in the background (at most one refresh per key at a time)
+
+        Args:
+            key: Cache key to refresh
+            compute: Returns the new response, or None if it should not be cached
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            self.refreshes += 1
+
+        def run():
+            try:
+                response = compute()
+                if response is not None:
+                    self.put(key, response)
+            except Exception:
+                pass  # Keep serving the stale answer; the next stale hit retries
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(run)
+
+    def clear(self) -> None:
+        """Drop every cached answer"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Cache metrics
+
+        Returns:
+            dict: hits, stale_hits, misses, hit_ratio, refreshes, entries
+        """
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+                "refreshes": self.refreshes,
+                "entries": len(self._entries)
+            }
+
+
+# Shared across chatbot instances (the model is part of the key)
+answer_cache = AnswerCache()
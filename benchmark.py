@@ -0,0 +1,322 @@
+"""
+Benchmark Module
+End-to-end latency, throughput, token and memory benchmark of the chat pipeline against the offline LLM stand-in
+"""
+
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Sequence, TypedDict
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from config import (
+    DB_PATH,
+    BENCHMARK_QUESTIONS,
+    BENCHMARK_CONCURRENCY,
+    BENCHMARK_UNITS,
+    BENCHMARK_SEED
+)
+from mock_llm import FaultProfile, install_fake_llm, uninstall_fake_llm
+from synthetic_data import AMENITIES, CITIES, CONFIGURATIONS, DEVELOPERS, generate_database
+
+
+class QuestionSample(TypedDict):
+    """Measurements of one ask() call"""
+    question: str
+    latency_ms: float
+    nodes: Dict[str, float]          # Graph node -> wall ms (summed over retries)
+    llm_ms: Dict[str, float]         # Graph node -> ms spent waiting on the model
+    llm_calls: int
+    retries: int
+    prompt_tokens: int
+    completion_tokens: int
+    cached: bool
+    error: str
+
+
+class LevelReport(TypedDict):
+    """Aggregates for one concurrency level"""
+    concurrency: int
+    requests: int
+    errors: int
+    retries: int                     # SQL regenerations across all requests
+    cached: int
+    wall_seconds: float
+    throughput_rps: float
+    latency_ms: Dict[str, float]     # p50 / p95 / p99 / mean / max
+    nodes: Dict[str, Dict[str, float]]
+    llm_ms: Dict[str, Dict[str, float]]
+    tokens: Dict[str, float]
+    peak_rss_mb: Optional[float]
+
+
+# =======================
+# Question Corpus
+# =======================
+
+_GREETINGS = ["Hello", "Hi!", "Thanks", "Thank you", "Good morning", "Bye"]
+
+# Phrasings the stand-in answers with real SQL (see mock_llm._SQL_TEMPLATES)
+# plus a few it does not recognize, which get its generic listing query
+_TEMPLATES = [
+    "How many projects are there?",
+    "How many projects in {city}?",
+    "How many projects are {status}?",
+    "What is the average price of {config} in {city}?",
+    "What is the average price of {config} units?",
+    "Show the cheapest {config} units in {city}",
+    "List projects by {developer}",
+    "Which projects have a {amenity}?",
+    "Show all projects in {city}",
+    "Compare possession timelines across {city} projects with good schools nearby",
+    "Which builder offers the best payment plan for first-time buyers?"
+]
+
+_STATUSES = ["under construction", "nearing possession", "ready to move", "new launch"]
+
+
+def build_corpus(count: int = BENCHMARK_QUESTIONS, seed: int = BENCHMARK_SEED,
+                 greeting_share: float = 0.05) -> List[str]:
+    """
+    Representative questions drawn from the synthetic data's distributions
+
+    Cities, configurations, developers and amenities are those synthetic_data
+    generates, so the SQL the stand-in writes finds rows at every scale.
+
+    Args:
+        count: Number of questions
+        seed: Same seed, same corpus
+        greeting_share: Fraction of greetings (answered without SQL)
+
+    Returns:
+        List[str]: Questions in benchmark order
+    """
+    rng = random.Random(f"{seed}:corpus")
+    questions = []
+    for _ in range(count):
+        if rng.random() < greeting_share:
+            questions.append(rng.choice(_GREETINGS))
+            continue
+        questions.append(rng.choice(_TEMPLATES).format(
+            city=rng.choices([c[0] for c in CITIES], weights=[c[1] for c in CITIES])[0],
+            config=rng.choice([c[0] for c in CONFIGURATIONS if "BHK" in c[0]]).replace(" Elite", "").replace(" Duplex", ""),
+            developer=rng.choice(DEVELOPERS).split()[0],
+            amenity=rng.choice(AMENITIES).lower(),
+            status=rng.choice(_STATUSES)
+        ))
+    return questions
+
+
+# =======================
+# Statistics
+# =======================
+
+def percentiles(values: Sequence[float]) -> Dict[str, float]:
+    """Nearest-rank p50/p95/p99 plus mean and max (all 0.0 for no values)"""
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def rank(p: float) -> float:
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+    return {"p50": round(rank(50), 3), "p95": round(rank(95), 3), "p99": round(rank(99), 3),
+            "mean": round(sum(ordered) / len(ordered), 3), "max": round(ordered[-1], 3)}
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None where unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if platform.system() == "Darwin" else 1024), 1)
+
+
+# =======================
+# Runner
+# =======================
+
+def _summarize(concurrency: int, samples: List[QuestionSample], wall_seconds: float) -> LevelReport:
+    nodes = sorted({node for s in samples for node in s["nodes"]})
+    stages = sorted({stage for s in samples for stage in s["llm_ms"]})
+    return {
+        "concurrency": concurrency,
+        "requests": len(samples),
+        "errors": sum(1 for s in samples if s["error"]),
+        "retries": sum(s["retries"] for s in samples),
+        "cached": sum(1 for s in samples if s["cached"]),
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(samples) / wall_seconds, 3) if wall_seconds else 0.0,
+        "latency_ms": percentiles([s["latency_ms"] for s in samples]),
+        "nodes": {node: percentiles([s["nodes"][node] for s in samples if node in s["nodes"]]) for node in nodes},
+        "llm_ms": {stage: percentiles([s["llm_ms"][stage] for s in samples if stage in s["llm_ms"]])
+                   for stage in stages},
+        "tokens": {
+            "prompt_mean": round(sum(s["prompt_tokens"] for s in samples) / max(1, len(samples)), 1),
+            "prompt_p95": percentiles([s["prompt_tokens"] for s in samples])["p95"],
+            "completion_mean": round(sum(s["completion_tokens"] for s in samples) / max(1, len(samples)), 1),
+            "total": sum(s["prompt_tokens"] + s["completion_tokens"] for s in samples),
+            "llm_calls": sum(s["llm_calls"] for s in samples)
+        },
+        "peak_rss_mb": peak_rss_mb()
+    }
+
+
+def run_level(questions: Sequence[str], concurrency: int, model_id: str,
+              tenant_id: Optional[str] = None) -> LevelReport:
+    """
+    Ask every question once with `concurrency` simultaneous callers
+
+    Each worker thread has its own RealEstateChatbot (history is not kept), as
+    each request handler would in a server.
+    """
+    # Imported late: database.py opens (and if missing creates) config.DB_PATH
+    # on import, and the CLI may first have to generate a synthetic database
+    from chatbot_core import RealEstateChatbot
+
+    workers = threading.local()
+
+    def ask(question: str) -> QuestionSample:
+        chatbot = getattr(workers, "chatbot", None)
+        if chatbot is None:
+            chatbot = workers.chatbot = RealEstateChatbot(model_id=model_id, tenant_id=tenant_id)
+        sample: QuestionSample = {"question": question, "latency_ms": 0.0, "nodes": {}, "llm_ms": {},
+                                  "llm_calls": 0, "retries": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                                  "cached": False, "error": ""}
+        started = time.perf_counter()
+        try:
+            response = chatbot.ask(question, preserve_history=False)
+        except Exception as e:
+            sample["error"] = f"{type(e).__name__}: {e}"
+            return sample
+        finally:
+            sample["latency_ms"] = round((time.perf_counter() - started) * 1000, 3)
+
+        timings = response["timings"]
+        for node in timings["nodes"]:
+            sample["nodes"][node["node"]] = sample["nodes"].get(node["node"], 0.0) + node["wall_ms"]
+            if node["llm_calls"]:
+                sample["llm_ms"][node["node"]] = sample["llm_ms"].get(node["node"], 0.0) + node["llm_ms"]
+        sample.update(llm_calls=timings["llm_calls"], retries=timings["retries"],
+                      prompt_tokens=timings["prompt_tokens"], completion_tokens=timings["completion_tokens"],
+                      cached=response["cached"], error=response["error"])
+        return sample
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as pool:
+        samples = list(pool.map(ask, questions))
+    return _summarize(concurrency, samples, time.perf_counter() - started)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmark(questions: Optional[Sequence[str]] = None,
+                  concurrency_levels: Sequence[int] = BENCHMARK_CONCURRENCY,
+                  profile: Optional[FaultProfile] = None,
+                  model_id: str = "qwen/qwen-2.5-72b-instruct",
+                  tenant_id: Optional[str] = None,
+                  warmup: int = 5,
+                  db_path: Optional[str] = None) -> dict:
+    """
+    Run the question corpus through RealEstateChatbot.ask at each concurrency level
+
+    The LLM is the in-process stand-in from mock_llm.py, so results measure
+    the pipeline's own overhead plus the profile's simulated model latency.
+    The database is db_path, or config.DB_PATH (set REAL_ESTATE_DB_PATH to
+    benchmark a synthetic one). Answer and result caches are cleared before
+    each level.
+
+    Args:
+        questions: Questions to ask (defaults to build_corpus())
+        concurrency_levels: Simultaneous callers per level
+        profile: Stand-in latency/fault settings (see mock_llm.FaultProfile)
+        model_id: Model ID passed to the chatbot
+        tenant_id: Optional tenant every question is asked for
+        warmup: Questions asked first and left out of the results
+        db_path: Database to query for this run only (the shared interface switches back afterwards)
+
+    Returns:
+        dict: Run metadata and one LevelReport per concurrency level (JSON-serializable)
+    """
+    from answer_cache import answer_cache
+    from database import db_interface
+
+    questions = list(questions) if questions is not None else build_corpus()
+    previous_db = db_interface.use_database(db_path) if db_path else None
+    injector = install_fake_llm(profile)
+    try:
+        if warmup:
+            run_level(questions[:warmup], 1, model_id, tenant_id)
+
+        levels = []
+        for concurrency in concurrency_levels:
+            answer_cache.clear()
+            if db_interface.result_cache is not None:
+                db_interface.result_cache.clear()
+            levels.append(run_level(questions, concurrency, model_id, tenant_id))
+        database = {"path": db_interface.db_path, **db_interface.get_table_counts()}
+    finally:
+        uninstall_fake_llm()
+        if previous_db is not None:
+            db_interface.use_database(previous_db)
+        answer_cache.clear()
+
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "database": database,
+        "model_id": model_id,
+        "tenant_id": tenant_id,
+        "profile": dict(injector.profile),
+        "questions": len(questions),
+        "levels": levels
+    }
+
+
+def format_level(level: LevelReport) -> str:
+    """One-line summary of a concurrency level"""
+    latency = level["latency_ms"]
+    return (f"c={level['concurrency']:<3} {level['throughput_rps']:>8.2f} req/s  "
+            f"p50 {latency['p50']:>8.1f} ms  p95 {latency['p95']:>8.1f} ms  p99 {latency['p99']:>8.1f} ms  "
+            f"{level['tokens']['prompt_mean']:>7.0f} prompt tok/q  errors {level['errors']}")
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: REAL_ESTATE_DB_PATH=bench.db python benchmark.py [questions] [c1,c2,...] [output.json]
+    # A missing database is generated with BENCHMARK_UNITS synthetic units first.
+    if not os.path.exists(DB_PATH):
+        print(f"📁 Generating {BENCHMARK_UNITS:,} synthetic units at {DB_PATH}...")
+        generate_database(DB_PATH, BENCHMARK_UNITS, seed=BENCHMARK_SEED)
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else BENCHMARK_QUESTIONS
+    levels = [int(c) for c in sys.argv[2].split(",")] if len(sys.argv) > 2 else BENCHMARK_CONCURRENCY
+    report = run_benchmark(build_corpus(count), levels)
+
+    for level in report["levels"]:
+        print(format_level(level))
+    if len(sys.argv) > 3:
+        with open(sys.argv[3], "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Results written to {sys.argv[3]}")
+    else:
+        print(json.dumps(report, indent=2))
@@ -3,13 +3,22 @@ Core Chatbot Module
 Production-ready LangGraph chatbot that can be plugged into any application
 """
 
-from typing import TypedDict, List, Literal
-import json
+import functools
+from contextlib import nullcontext
+from typing import Callable, TypedDict, List, Literal, Optional
 from langgraph.graph import StateGraph, END
 
-from llm_client import create_llm_client
-from database import get_database_schema, execute_sql
+from llm_client import create_llm_client, llm_deadline
+from database import get_database_schema, execute_sql, db_interface
 from fuzzy_matching import get_fuzzy_matching_context
+from sql_extraction import extract_sql, stream_sql
+from sql_rewriter import inject_tenant_predicates
+from sql_validator import validate_sql, format_findings
+from result_compactor import compact_results
+from answer_cache import answer_cache, make_answer_key
+from metrics import timed_node, record_query, start_request, end_request, emit
+from tracing import span, start_trace, annotate, mark_error
+from profiler import profile_request, should_profile
 from config import (
     ROUTER_SYSTEM_PROMPT,
     SQL_GENERATOR_SYSTEM_PROMPT,
@@ -17,7 +26,13 @@ from config import (
     GENERAL_CONVERSATION_PROMPT,
     ERROR_MESSAGES,
     MAX_SQL_RETRIES,
-    RECENT_HISTORY_FOR_ROUTER
+    RECENT_HISTORY_FOR_ROUTER,
+    ENABLE_TENANT_SQL_REWRITE,
+    ENABLE_SQL_VALIDATION,
+    ENABLE_ANSWER_CACHE,
+    SQL_GEN_STREAMING,
+    SQL_GEN_STOP_SEQUENCES,
+    LLM_REQUEST_DEADLINE
 )
 
 
@@ -31,7 +46,10 @@ class AgentState(TypedDict):
     chat_history: List[dict]     # Past conversation (User: ..., AI: ...)
     query_type: str              # Router output: "factual", "semantic", "data"
     sql_query: str               # The SQL generated by the LLM
-    sql_result: str              # The raw data retrieved from Query DB
+    scoped_sql: str              # sql_query with tenant predicates injected (what actually runs)
+    sql_params: List             # Bound parameters for scoped_sql
+    sql_findings: str            # Validator errors/warnings for the last generated SQL
+    sql_result: str              # Compacted data retrieved from Query DB
     final_answer: str            # The final plain English response
     error: str                   # Tracks if SQL execution failed (for retries)
     retry_count: int             # Number of SQL retries
@@ -49,7 +67,7 @@ def router_node(state: AgentState) -> dict:
     Analyzes the question + chat_history to classify intent
     """
     try:
-        llm = create_llm_client(state['model_name'])
+        llm = create_llm_client(state['model_name'], stage="router", tenant_id=state.get('tenant_id'))
 
         # Format chat history
         history_str = "\n".join([
@@ -92,11 +110,12 @@ def sql_gen_node(state: AgentState) -> dict:
     Generates SQL query based on the question
     """
     try:
-        llm = create_llm_client(state['model_name'])
+        llm = create_llm_client(state['model_name'], stage="sql_gen", tenant_id=state.get('tenant_id'))
 
-        # Get schema with tenant filtering if applicable
+        # Get schema with tenant filtering if applicable (not needed when the
+        # rewriter injects tenant predicates itself)
         tenant_id = state.get('tenant_id')
-        schema = get_database_schema(tenant_id)
+        schema = get_database_schema(None if ENABLE_TENANT_SQL_REWRITE else tenant_id)
 
         # Get fuzzy matching context (available cities, projects, developers)
         fuzzy_context = get_fuzzy_matching_context(tenant_id)
@@ -110,11 +129,13 @@ DATABASE SCHEMA:
 
         # Build prompt with error feedback if this is a retry
         if state.get('error') and state.get('retry_count', 0) > 0:
+            findings = state.get('sql_findings', '')
+            findings_block = f"\nValidator findings:\n{findings}\n" if findings else ""
             prompt = f"""User question: {state['question']}
 
 Previous SQL attempt: {state.get('sql_query')}
 Error received: {state.get('error')}
-
+{findings_block}
 Please fix the SQL query based on the error above.
 
 SQL query:"""
@@ -123,16 +144,16 @@ SQL query:"""
 
 SQL query:"""
 
-        sql_query = llm.invoke(prompt, system_prompt_with_schema).strip()
-
-        # Clean up the SQL (remove markdown if present)
-        sql_query = sql_query.replace("```sql", "").replace("```", "").strip()
-        # Remove any remaining backticks
-        sql_query = sql_query.replace("`", "")
+        # Stop reading once a complete statement has arrived (prose and code fences are dropped)
+        if SQL_GEN_STREAMING:
+            sql_query = stream_sql(llm.stream(prompt, system_prompt_with_schema, stop=SQL_GEN_STOP_SEQUENCES))
+        else:
+            sql_query = extract_sql(llm.invoke(prompt, system_prompt_with_schema, stop=SQL_GEN_STOP_SEQUENCES))
 
         return {
             "sql_query": sql_query,
             "sql_result": "",  # Clear previous results
+            "sql_findings": "",  # Findings belonged to the previous attempt
             "error": ""  # Clear previous errors
         }
 
@@ -140,18 +161,68 @@ SQL query:"""
         return {
             "sql_query": "",  # Clear failed query
             "sql_result": "",  # Clear any old results
+            "sql_findings": "",
             "error": f"SQL generation failed: {str(e)}",
             "retry_count": state.get('retry_count', 0) + 1
         }
 
 
+def scope_sql_node(state: AgentState) -> dict:
+    """
+    Node B2: Tenant Scoper
+    Injects tenant_id predicates into the generated SQL as bound parameters
+    """
+    sql_query = state.get('sql_query', '')
+
+    if not ENABLE_TENANT_SQL_REWRITE or not state.get('tenant_id') or not sql_query:
+        return {"scoped_sql": sql_query, "sql_params": []}
+
+    try:
+        scoped_sql, params = inject_tenant_predicates(sql_query, state['tenant_id'])
+        return {"scoped_sql": scoped_sql, "sql_params": list(params)}
+
+    except ValueError as e:
+        # Never fall back to the unscoped query - ask for a new one instead
+        return {
+            "scoped_sql": "",
+            "sql_params": [],
+            "error": f"SQL tenant scoping failed: {str(e)}",
+            "retry_count": state.get('retry_count', 0) + 1
+        }
+
+
+def validate_sql_node(state: AgentState) -> dict:
+    """
+    Node B3: SQL Validator
+    Rejects non-SELECT, uncompilable or pathological queries before execution
+    """
+    if not ENABLE_SQL_VALIDATION or state.get('error'):
+        return {"sql_findings": ""}
+
+    report = validate_sql(state['scoped_sql'], state.get('sql_params', []), state.get('tenant_id'))
+    findings = format_findings(report)
+
+    if not report['ok']:
+        return {
+            "sql_findings": findings,
+            "error": f"SQL validation failed: {' '.join(report['errors'])}",
+            "retry_count": state.get('retry_count', 0) + 1
+        }
+
+    return {"sql_findings": findings}
+
+
 def execute_sql_node(state: AgentState) -> dict:
     """
     Node C: Query DB
     Executes the SQL query and handles errors
     """
     try:
-        results, error = execute_sql(state['sql_query'])
+        results, error = execute_sql(
+            state['scoped_sql'],
+            state.get('sql_params', []),
+            tenant_id=state.get('tenant_id')
+        )
 
         if error:
             # SQL execution failed
@@ -163,8 +234,10 @@ def execute_sql_node(state: AgentState) -> dict:
                 "retry_count": retry_count
             }
 
-        # Success
-        sql_result = json.dumps(results)
+        record_query(len(results), 0.0 if results.cached else results.elapsed_ms, results.cached)
+
+        # Success - compact before it reaches the response prompt
+        sql_result = compact_results(results.columns, results.rows, truncated=results.truncated)
         return {
             "sql_result": sql_result,
             "sql_query": state['sql_query'],
@@ -193,7 +266,7 @@ def response_node(state: AgentState) -> dict:
             # Maximum retries exceeded - provide user-friendly error message
             return {"final_answer": ERROR_MESSAGES["max_retries"]}
 
-        llm = create_llm_client(state['model_name'])
+        llm = create_llm_client(state['model_name'], stage="response", tenant_id=state.get('tenant_id'))
 
         if state['query_type'] == 'data':
             # Validate we have both sql_query and sql_result
@@ -235,6 +308,13 @@ def route_query(state: AgentState) -> Literal["sql_gen", "response"]:
         return "response"
 
 
+def check_sql_ready(state: AgentState) -> Literal["execute_sql", "sql_gen", "response"]:
+    """Determines if the generated SQL is ready to execute"""
+    if not state.get('error'):
+        return "execute_sql"
+    return check_sql_error(state)
+
+
 def check_sql_error(state: AgentState) -> Literal["sql_gen", "response"]:
     """Determines if we need to retry SQL generation"""
     if state.get('error') and state.get('retry_count', 0) < MAX_SQL_RETRIES:
@@ -248,6 +328,19 @@ def check_sql_error(state: AgentState) -> Literal["sql_gen", "response"]:
 # GRAPH CONSTRUCTION
 # =======================
 
+def _instrumented(name: str, node: Callable[[dict], dict]) -> Callable[[dict], dict]:
+    """Run a node inside a "node.<name>" span and record its NodeTiming"""
+    @functools.wraps(node)
+    def run(state: dict) -> dict:
+        with span(f"node.{name}", **{"chatbot.retry_count": state.get('retry_count', 0)}) as current:
+            update = node(state)
+            if current is not None and update.get('error'):
+                current.set_error(update['error'])
+            return update
+
+    return timed_node(name, run)
+
+
 def create_chatbot_graph(model_id: str) -> StateGraph:
     """
     Creates the LangGraph workflow for the chatbot
@@ -260,11 +353,13 @@ def create_chatbot_graph(model_id: str) -> StateGraph:
     """
     workflow = StateGraph(AgentState)
 
-    # Add nodes
-    workflow.add_node("router", router_node)
-    workflow.add_node("sql_gen", sql_gen_node)
-    workflow.add_node("execute_sql", execute_sql_node)
-    workflow.add_node("response", response_node)
+    # Add nodes (each run is timed and traced while a request is active, see metrics.py / tracing.py)
+    workflow.add_node("router", _instrumented("router", router_node))
+    workflow.add_node("sql_gen", _instrumented("sql_gen", sql_gen_node))
+    workflow.add_node("scope_sql", _instrumented("scope_sql", scope_sql_node))
+    workflow.add_node("validate_sql", _instrumented("validate_sql", validate_sql_node))
+    workflow.add_node("execute_sql", _instrumented("execute_sql", execute_sql_node))
+    workflow.add_node("response", _instrumented("response", response_node))
 
     # Set entry point
     workflow.set_entry_point("router")
@@ -279,8 +374,22 @@ def create_chatbot_graph(model_id: str) -> StateGraph:
         }
     )
 
-    # Add edge from SQL gen to execution
-    workflow.add_edge("sql_gen", "execute_sql")
+    # Add edge from SQL gen to tenant scoping
+    workflow.add_edge("sql_gen", "scope_sql")
+
+    # Scoped SQL is validated before execution
+    workflow.add_edge("scope_sql", "validate_sql")
+
+    # Only valid SQL reaches execution; generation/scoping/validation errors retry
+    workflow.add_conditional_edges(
+        "validate_sql",
+        check_sql_ready,
+        {
+            "execute_sql": "execute_sql",
+            "sql_gen": "sql_gen",
+            "response": "response"
+        }
+    )
 
     # Add conditional edge for error handling (cyclic!)
     workflow.add_conditional_edges(
@@ -320,7 +429,8 @@ class RealEstateChatbot:
         self.graph = create_chatbot_graph(model_id)
         self.chat_history = []
 
-    def ask(self, question: str, preserve_history: bool = True, tenant_id: str = None) -> dict:
+    def ask(self, question: str, preserve_history: bool = True, tenant_id: str = None,
+            trace: Optional[bool] = None, profile: Optional[bool] = None) -> dict:
         """
         Ask a question to the chatbot
 
@@ -328,6 +438,8 @@ class RealEstateChatbot:
             question: User's question
             preserve_history: Whether to keep chat history for context
             tenant_id: Optional tenant ID override (uses instance tenant_id if not provided)
+            trace: Force (True) or skip (False) span tracing; None samples at TRACE_SAMPLE_RATE
+            profile: Force (True) or skip (False) stack-sampling profiling; None samples at PROFILE_SAMPLE_RATE
 
         Returns:
             dict: Response containing:
@@ -335,32 +447,108 @@ class RealEstateChatbot:
                 - query_type: Type of query ("data" or "general")
                 - sql_query: SQL query if applicable
                 - error: Error message if any
+                - cached: True if the answer came from the answer cache
+                - timings: RequestTimings - per-node wall time, LLM latency,
+                  tokens, retries, rows and cache hits (also sent to metrics sinks)
+                - trace_id: Trace id of this question (spans are only written if it was sampled)
+                - profile_path: PROFILE_DIR/<trace_id>.json if this question was profiled, else None
         """
         # Use provided tenant_id or fall back to instance tenant_id
         active_tenant_id = tenant_id if tenant_id is not None else self.tenant_id
 
+        with start_trace("chatbot.ask", sample=trace, **{
+            "chatbot.question": question[:200],
+            "chatbot.model": self.model_id,
+            "chatbot.tenant_id": active_tenant_id
+        }) as question_trace:
+            profiler = profile_request(
+                question_trace.trace_id, question=question[:200], model_id=self.model_id, tenant_id=active_tenant_id
+            ) if should_profile(profile) else nullcontext({"path": None})
+
+            timer = start_request()
+            try:
+                with profiler as stored_profile, llm_deadline(LLM_REQUEST_DEADLINE):
+                    response = self._answer(question, active_tenant_id)
+            finally:
+                end_request()
+            annotate(**{"chatbot.query_type": response['query_type'], "chatbot.cached": response['cached'],
+                        "chatbot.profile": stored_profile["path"]})
+            if response['error']:
+                mark_error(response['error'])
+
+        timings = timer.finish(answer_cache_hit=response['cached'])
+        response = dict(response, timings=timings, trace_id=question_trace.trace_id,
+                        profile_path=stored_profile["path"])
+        emit(timings, {
+            "model_id": self.model_id,
+            "tenant_id": active_tenant_id,
+            "query_type": response['query_type'],
+            "error": response['error'] or None
+        })
+
+        # Update chat history if preserving
+        if preserve_history:
+            self.chat_history.append({"role": "user", "content": question})
+            self.chat_history.append({"role": "assistant", "content": response['final_answer']})
+
+        return response
+
+    def _answer(self, question: str, active_tenant_id: Optional[str]) -> dict:
+        """Serve the answer from the answer cache or run the graph (and cache the result)"""
+        # Answers only depend on (question, tenant, model, data) when there is
+        # no conversation for the router/SQL stages to take context from
+        cache_key = None
+        response = None
+        if ENABLE_ANSWER_CACHE and not self.chat_history:
+            cache_key = make_answer_key(question, active_tenant_id, self.model_id,
+                                        db_interface.get_data_version(active_tenant_id))
+            cached = answer_cache.get(cache_key)
+            if cached is not None:
+                response, is_stale = cached
+                response = dict(response, cached=True)
+                if is_stale:
+                    answer_cache.refresh(
+                        cache_key,
+                        lambda: self._cacheable(self._run_graph(question, [], active_tenant_id))
+                    )
+
+        if response is None:
+            response = self._run_graph(question, self.chat_history.copy(), active_tenant_id)
+            if cache_key is not None and self._cacheable(response):
+                answer_cache.put(cache_key, response)
+            response = dict(response, cached=False)
+
+        return response
+
+    @staticmethod
+    def _cacheable(response: dict) -> Optional[dict]:
+        """Return the response if it is a successful answer worth caching, else None"""
+        if response['error'] or response['final_answer'] in ERROR_MESSAGES.values():
+            return None
+        return response
+
+    def _run_graph(self, question: str, chat_history: List[dict], tenant_id: Optional[str]) -> dict:
+        """Run the LangGraph workflow and return the clean response"""
         # Initial state
         initial_state = {
             "question": question,
-            "chat_history": self.chat_history.copy(),
+            "chat_history": chat_history,
             "query_type": "",
             "sql_query": "",
+            "scoped_sql": "",
+            "sql_params": [],
+            "sql_findings": "",
             "sql_result": "",
             "final_answer": "",
             "error": "",
             "retry_count": 0,
             "model_name": self.model_id,
-            "tenant_id": active_tenant_id
+            "tenant_id": tenant_id
         }
 
         # Run the graph
         final_state = self.graph.invoke(initial_state)
 
-        # Update chat history if preserving
-        if preserve_history:
-            self.chat_history.append({"role": "user", "content": question})
-            self.chat_history.append({"role": "assistant", "content": final_state['final_answer']})
-
         # Return clean response
         return {
             "final_answer": final_state['final_answer'],
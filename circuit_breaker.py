@@ -0,0 +1,139 @@
+"""
+Circuit Breaker Module
+Per-model breakers that stop calling a model whose recent calls mostly fail or are slow
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from config import (
+    LLM_BREAKER_WINDOW_SECONDS,
+    LLM_BREAKER_MIN_CALLS,
+    LLM_BREAKER_ERROR_RATE,
+    LLM_BREAKER_SLOW_CALL_SECONDS,
+    LLM_BREAKER_SLOW_RATE,
+    LLM_BREAKER_OPEN_SECONDS,
+    LLM_BREAKER_HALF_OPEN_PROBES
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Gauge values of each state (chatbot_llm_circuit_state)
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """
+    Closed -> open -> half-open state machine over a sliding time window
+
+    Closed: calls pass; each outcome is kept for window_seconds. Once the
+    window holds min_calls outcomes and either the failure rate or the rate
+    of calls slower than slow_call_seconds reaches its threshold, the
+    breaker opens. Open: calls are refused for open_seconds. Half-open:
+    up to probes calls go through; one success closes the breaker (with an
+    empty window), one failure opens it again.
+    """
+
+    def __init__(self, window_seconds: float = LLM_BREAKER_WINDOW_SECONDS, min_calls: int = LLM_BREAKER_MIN_CALLS,
+                 error_rate: float = LLM_BREAKER_ERROR_RATE, slow_call_seconds: float = LLM_BREAKER_SLOW_CALL_SECONDS,
+                 slow_rate: float = LLM_BREAKER_SLOW_RATE, open_seconds: float = LLM_BREAKER_OPEN_SECONDS,
+                 probes: int = LLM_BREAKER_HALF_OPEN_PROBES):
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.probes = probes
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self._outcomes: deque = deque()  # (monotonic time, failed, slow)
+        self._probes_in_flight = 0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a call may go to the model now (a True in half-open state reserves a probe)"""
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    return False
+                self.state = HALF_OPEN
+                self._probes_in_flight = 0
+            if self.state == HALF_OPEN:
+                if self._probes_in_flight >= self.probes:
+                    return False
+                self._probes_in_flight += 1
+            return True
+
+    def record(self, failed: Optional[bool], elapsed_seconds: float) -> None:
+        """
+        Outcome of an allowed call
+
+        Args:
+            failed: Whether the model failed; None if the call never reached it (only frees a probe)
+            elapsed_seconds: Duration of the call
+        """
+        slow = elapsed_seconds >= self.slow_call_seconds
+        now = time.monotonic()
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if failed is None:
+                    return
+                if failed or slow:
+                    self._open(now)
+                else:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                return
+            if self.state == OPEN or failed is None:
+                return  # Call started before the breaker opened, or never reached the model
+
+            self._outcomes.append((now, failed, slow))
+            while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+                self._outcomes.popleft()
+            calls = len(self._outcomes)
+            if calls >= self.min_calls:
+                failures = sum(1 for _, f, _ in self._outcomes if f)
+                slow_calls = sum(1 for _, _, s in self._outcomes if s)
+                if failures / calls >= self.error_rate or slow_calls / calls >= self.slow_rate:
+                    self._open(now)
+
+    def _open(self, now: float) -> None:
+        self.state = OPEN
+        self.opened_at = now
+        self.times_opened += 1
+        self._outcomes.clear()
+
+
+# =======================
+# Shared Breakers
+# =======================
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker_for(model_id: str) -> CircuitBreaker:
+    """The process-wide breaker of a model, created on first use"""
+    breaker = _breakers.get(model_id)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.setdefault(model_id, CircuitBreaker())
+    return breaker
+
+
+def reset_breakers() -> None:
+    """Forget every breaker (all models closed again)"""
+    with _breakers_lock:
+        _breakers.clear()
+
+
+def breaker_states() -> Dict[str, str]:
+    """State per model id"""
+    return {model_id: breaker.state for model_id, breaker in list(_breakers.items())}
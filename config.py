@@ -45,9 +45,81 @@ DEFAULT_MODEL = "qwen"
 # API CONFIGURATIONS
 # =======================
 
-OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+OPENROUTER_API_URL = os.getenv("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions")
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-API_TIMEOUT = 30  # seconds
+API_TIMEOUT = 30  # seconds, per attempt
+
+# LLM retries (see llm_client.RetryPolicy): 429, 408, 5xx, timeouts and connection errors
+LLM_MAX_RETRIES = 3             # Retries after the first attempt
+LLM_BACKOFF_BASE = 0.5          # seconds; retry n waits uniform(0, min(cap, base * 2**n)) ("full jitter")
+LLM_BACKOFF_CAP = 8.0           # seconds
+LLM_RETRY_BUDGET_RATIO = 0.2    # Retries allowed per call, process-wide (caps retry load at +20%)
+LLM_RETRY_BUDGET_BURST = 10     # Retries available before any calls have deposited budget
+LLM_REQUEST_DEADLINE = 60       # seconds per ask(): no attempt or backoff wait runs past it
+
+# Client-side admission control per model id, shared by every client in the process (see rate_limiter.py).
+# Set these below the provider account's limits; None disables a limit. Keys are model ids or "default".
+LLM_RATE_LIMITS = {
+    "default": {"requests_per_second": 20, "tokens_per_minute": None, "max_in_flight": 16}
+}
+LLM_QUEUE_MAX = 64              # Calls allowed to wait per model; more fail at once
+LLM_QUEUE_TIMEOUT = 10          # seconds a call may wait for admission
+LLM_COMPLETION_TOKEN_ESTIMATE = 300  # Completion tokens assumed before the response reports usage
+
+# Per-model circuit breakers (see circuit_breaker.py): a model whose recent calls mostly fail or are
+# slow is skipped (calls fail over at once) for LLM_BREAKER_OPEN_SECONDS, then probed again
+LLM_BREAKER_WINDOW_SECONDS = 60
+LLM_BREAKER_MIN_CALLS = 10      # Outcomes in the window before the breaker may open
+LLM_BREAKER_ERROR_RATE = 0.5    # Failed attempts (timeouts, connection errors, 429, 5xx, ...)
+LLM_BREAKER_SLOW_CALL_SECONDS = 15
+LLM_BREAKER_SLOW_RATE = 0.5     # Attempts slower than LLM_BREAKER_SLOW_CALL_SECONDS
+LLM_BREAKER_OPEN_SECONDS = 30
+LLM_BREAKER_HALF_OPEN_PROBES = 1
+
+# Failover order per graph stage (AVAILABLE_MODELS keys). The stage's model is tried first: its
+# LLM_STAGE_CONFIGS "model" (or a tenant override), else the chatbot's own model. These models
+# follow in order, skipping that one; the next model is used when a call fails after its retries
+# or the model's breaker is open. Router and city normalization start on the small model, so their
+# chains fall back to the larger ones.
+LLM_FAILOVER_CHAINS = {
+    "default": ["qwen", "deepseek", "glm4"],
+    "router": ["glm4", "qwen", "deepseek"],
+    "sql_gen": ["qwen", "deepseek", "glm4"],
+    "response": ["qwen", "deepseek", "glm4"],
+    "city_normalization": ["glm4", "qwen"]
+}
+
+# Model and generation settings per graph stage. "model" is an AVAILABLE_MODELS key (None: the
+# chatbot's own model); it heads the stage's failover chain. "max_tokens" caps the completion (None:
+# provider default) and "timeout" is the per-attempt timeout in seconds. Keys a stage leaves out come
+# from LLM_STAGE_DEFAULTS.
+LLM_STAGE_DEFAULTS = {"model": None, "temperature": 0.3, "max_tokens": None, "timeout": API_TIMEOUT}
+LLM_STAGE_CONFIGS = {
+    "router": {"model": "glm4", "temperature": 0.0, "max_tokens": 5, "timeout": 10},
+    "sql_gen": {"model": None, "temperature": 0.0, "max_tokens": 600, "timeout": 30},
+    "response": {"model": None, "temperature": 0.3, "max_tokens": 800, "timeout": 30},
+    "city_normalization": {"model": "glm4", "temperature": 0.0, "max_tokens": 10, "timeout": 10}
+}
+
+# Per-tenant stage settings: tenant id -> stage -> settings, merged over LLM_STAGE_CONFIGS.
+# Example: {"TM_TEAM_001": {"sql_gen": {"model": "deepseek"}}}
+LLM_TENANT_STAGE_OVERRIDES: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+# Hedged LLM requests (see llm_client.HedgePolicy): a call still unanswered at the percentile of its
+# model and stage's recent latencies gets a second request, and the first answer wins
+LLM_HEDGE_ENABLED = False
+LLM_HEDGE_PERCENTILE = 90
+LLM_HEDGE_MIN_SAMPLES = 20      # Latencies needed per model and stage before hedging starts
+LLM_HEDGE_WINDOW = 200          # Recent latencies kept per model and stage
+LLM_HEDGE_TARGET = "fallback"   # "same": the same failover chain again; "fallback": the chain without its first model
+LLM_HEDGE_BUDGET_RATIO = 0.1    # Hedges allowed per call (caps the extra spend at +10%)
+LLM_HEDGE_BUDGET_BURST = 5
+
+# Offline LLM stand-in (see mock_llm.py); error rates default to 0
+MOCK_LLM_PORT = 8799
+MOCK_LLM_LATENCY_MS = 400     # Median time to first token
+MOCK_LLM_MS_PER_TOKEN = 15    # Generation speed once tokens flow
+MOCK_LLM_JITTER = 0.35        # Sigma of the log-normal latency multiplier (drives the tail)
 
 
 # =======================
@@ -55,7 +127,59 @@ API_TIMEOUT = 30  # seconds
 # =======================
 
 DB_NAME = "real_estate_data.db"
-DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), DB_NAME)
+DB_PATH = os.getenv("REAL_ESTATE_DB_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), DB_NAME)
+
+# How tenant queries are executed:
+#   "shared" - against the shared tables (isolation via SQL rewrite / prompt)
+#   "view"   - per-connection TEMP VIEWs named projects / project_units, pre-filtered by tenant
+#   "shard"  - per-tenant SQLite files ATTACHed on demand (falls back to "view" if no shard exists)
+TENANT_EXECUTION_MODE = "shared"
+TENANT_SHARD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tenant_shards")
+TENANT_CONNECTIONS_PER_THREAD = 8  # Tenant-scoped connections kept open per thread
+INGEST_BATCH_SIZE = 5000  # Records per transaction when bulk loading (see ingest.py)
+CHANGE_LOG_RETENTION_DAYS = 30  # Incremental-ingest change log entries older than this are pruned
+INGEST_WORKERS = None  # Parser processes for multi-source ingest (None = one per CPU)
+INGEST_QUEUE_BATCHES = 8  # Parsed batches buffered between parsers and the single writer
+INGEST_TRANSACTION_ROWS = 50000  # Rows the writer commits per transaction
+SYNTHETIC_SEED = 42  # Default seed for synthetic_data.py (same seed + sizes = same database)
+SYNTHETIC_TENANTS = 5
+SYNTHETIC_UNITS_PER_PROJECT = 40  # Mean; individual projects vary between half and 1.5x
+BENCHMARK_QUESTIONS = 200  # Corpus size for benchmark.py
+BENCHMARK_CONCURRENCY = (1, 4, 16)  # Simultaneous callers per benchmark level
+BENCHMARK_UNITS = 100_000  # Synthetic units generated when the benchmark database does not exist
+BENCHMARK_SEED = 7
+MICROBENCH_SIZES = (10_000, 100_000, 1_000_000)  # Synthetic unit counts for microbench.py
+MICROBENCH_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_data")
+QUERY_MAX_ROWS = 10000  # Rows fetched per generated query; more rows mark the result truncated
+
+# Executed-result cache keyed by canonical SQL, params, tenant and PRAGMA data_version
+ENABLE_RESULT_CACHE = True
+RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Estimated bytes across all cached results
+RESULT_CACHE_TTL = 300  # seconds
+
+# Final-answer cache for questions asked without chat history (see answer_cache.py)
+ENABLE_ANSWER_CACHE = True
+ANSWER_CACHE_FRESH_TTL = 300    # seconds an answer is served as-is
+ANSWER_CACHE_STALE_TTL = 3600   # further seconds it may be served while refreshing in the background
+ANSWER_CACHE_MAX_ENTRIES = 1000
+ANSWER_CACHE_REFRESH_WORKERS = 2
+
+# Local span tracing (see tracing.py); the sampling decision is made once per question
+TRACE_SAMPLE_RATE = 0.0  # Fraction of questions traced (0 = only when ask(trace=True))
+TRACE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces", "traces.jsonl")
+TRACE_FILE_MAX_BYTES = 10 * 1024 * 1024  # Rotated to traces.jsonl.1 ... beyond this size
+TRACE_FILE_BACKUPS = 5
+TRACE_MAX_SPANS = 500  # Per trace; further spans are counted but not recorded
+
+# Stack-sampling profiler (see profiler.py); profiles are named after the question's trace id
+PROFILE_SAMPLE_RATE = 0.0  # Fraction of questions profiled (0 = only when ask(profile=True))
+PROFILE_INTERVAL_MS = 5  # Sampling interval; each sample walks the request thread's stack once
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles")
+PROFILE_MAX_FILES = 1000  # Oldest profiles are deleted beyond this count
+
+# Histogram buckets (seconds) for the /metrics endpoint (see prometheus_metrics.py)
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+METRICS_SQL_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
 
 
 # =======================
@@ -66,6 +190,27 @@ MAX_SQL_RETRIES = 2
 MAX_CHAT_HISTORY = 20  # Keep last 20 messages for context
 RECENT_HISTORY_FOR_ROUTER = 15  # Use last 15 messages for query classification
 
+# Rewrite generated SQL to inject tenant_id predicates (see sql_rewriter.py).
+# When enabled the tenant filtering paragraph is left out of the SQL prompt.
+ENABLE_TENANT_SQL_REWRITE = True
+
+# Validate generated SQL with EXPLAIN / EXPLAIN QUERY PLAN before executing it
+# (see sql_validator.py). Queries estimated to visit more rows are rejected.
+ENABLE_SQL_VALIDATION = True
+SQL_MAX_ESTIMATED_COST = 50_000_000
+
+# SQL generation output control (see sql_extraction.py). With streaming on, the completion is read
+# until it holds a complete statement (terminating semicolon or closing code fence) and the stream
+# is then closed, so preambles are skipped and trailing explanations are never generated. The stop
+# sequences end generation on the provider's side as well. Streamed calls are not hedged.
+SQL_GEN_STREAMING = True
+SQL_GEN_STOP_SEQUENCES = [";\n", "\n```\n"]
+
+# Result compaction before the response LLM (see result_compactor.py)
+RESULT_MAX_ROWS = 50          # Rows shown to the response LLM
+RESULT_MAX_LIST_ITEMS = 5     # Items shown per JSON array column
+RESULT_MAX_TEXT_CHARS = 200   # Characters shown per cell
+
 # =======================
 # CLIENT/TENANT CONFIGURATIONS
 # =======================
@@ -199,6 +344,10 @@ ERROR_MESSAGES = {
 
     "rate_limit": "Rate limit exceeded. Please try again in a moment.",
 
+    "overloaded": "The assistant is handling too many requests right now. Please try again in a moment.",
+
+    "model_unavailable": "The language model is temporarily unavailable. Please try again in a moment.",
+
     "unexpected": "Unexpected error occurred: {error}"
 }
 
@@ -215,6 +364,13 @@ def get_model_config(model_key: str = None) -> Dict[str, Any]:
     return AVAILABLE_MODELS[model_key]
 
 
+def get_stage_config(stage: str, tenant_id: str = None) -> Dict[str, Any]:
+    """Settings of a graph stage: LLM_STAGE_DEFAULTS, then LLM_STAGE_CONFIGS, then the tenant's overrides"""
+    settings = {**LLM_STAGE_DEFAULTS, **LLM_STAGE_CONFIGS.get(stage, {})}
+    settings.update(LLM_TENANT_STAGE_OVERRIDES.get(tenant_id, {}).get(stage, {}))
+    return settings
+
+
 def validate_config() -> bool:
     """Validate that all required configurations are set"""
     if not OPENROUTER_API_KEY:
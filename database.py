@@ -6,52 +6,422 @@ Handles all database operations and schema management
 import sqlite3
 import json
 import os
-from typing import List, Tuple, Optional
-from config import DB_PATH
+import re
+import threading
+import time
+from collections import OrderedDict
+from urllib.request import pathname2url
+from typing import Callable, Hashable, List, Tuple, Optional, Sequence
+from config import (
+    DB_PATH,
+    TENANT_EXECUTION_MODE,
+    TENANT_SHARD_DIR,
+    TENANT_CONNECTIONS_PER_THREAD,
+    QUERY_MAX_ROWS,
+    ENABLE_RESULT_CACHE,
+    RESULT_CACHE_MAX_BYTES,
+    RESULT_CACHE_TTL
+)
 from real_estate_db import create_real_estate_db
+from query_result import QueryResult
+from sql_rewriter import canonicalize_sql
+from tracing import KIND_CLIENT, annotate, mark_error, traced
+
+
+# Tables that hold tenant data and get shadowed by tenant-scoped TEMP VIEWs
+TENANT_TABLES = ("projects", "project_units")
+
+# Authorizer actions allowed on a tenant-scoped connection once its views exist
+_TENANT_ALLOWED_ACTIONS = {
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    getattr(sqlite3, "SQLITE_RECURSIVE", 33)
+}
+
+
+def tenant_view_authorizer(action: int, arg1: Optional[str], arg2: Optional[str],
+                           db_name: Optional[str], source: Optional[str]) -> int:
+    """
+    Authorizer for "view" mode connections
+
+    Only reads are allowed, and the shared tenant tables may only be read
+    through the tenant's TEMP VIEWs (source is the view doing the read), so
+    main.projects, ATTACHed copies or ad-hoc views cannot bypass the filter.
+    """
+    if action not in _TENANT_ALLOWED_ACTIONS:
+        return sqlite3.SQLITE_DENY
+    if action == sqlite3.SQLITE_READ and (arg1 or "").lower() in TENANT_TABLES and source not in TENANT_TABLES:
+        return sqlite3.SQLITE_DENY
+    return sqlite3.SQLITE_OK
+
+
+def _estimate_result_bytes(result: QueryResult) -> int:
+    """Rough in-memory size of a result, used for cache accounting"""
+    size = 64 + 56 * len(result.rows)
+    for row in result.rows:
+        for value in row:
+            if isinstance(value, (str, bytes)):
+                size += 49 + len(value)
+            else:
+                size += 24
+    return size
+
+
+class ResultCache:
+    """Thread-safe LRU cache of query results bounded by total bytes and entry age"""
+
+    def __init__(self, max_bytes: int = RESULT_CACHE_MAX_BYTES, ttl: float = RESULT_CACHE_TTL):
+        """
+        Args:
+            max_bytes: Maximum estimated size of all cached results
+            ttl: Seconds an entry stays valid
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (result, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[QueryResult]:
+        """Return the cached result for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            result, size, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key: Hashable, result: QueryResult) -> None:
+        """Cache a result, evicting least recently used entries to stay under max_bytes"""
+        size = _estimate_result_bytes(result)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (result, size, time.monotonic() + self.ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached result"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Cache metrics
+
+        Returns:
+            dict: hits, misses, hit_ratio, entries, bytes, evictions, expirations
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
 
 
 class DatabaseInterface:
     """Interface for database operations"""
 
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, tenant_mode: str = None, shard_dir: str = None):
         """
         Initialize database interface
 
         Args:
             db_path: Optional custom database path (defaults to config)
+            tenant_mode: Tenant execution mode - "shared", "view" or "shard" (defaults to config)
+            shard_dir: Directory holding per-tenant shard files (defaults to config)
         """
         self.db_path = db_path or DB_PATH
+        self.tenant_mode = tenant_mode or TENANT_EXECUTION_MODE
+        self.shard_dir = shard_dir or TENANT_SHARD_DIR
+        self.result_cache = ResultCache() if ENABLE_RESULT_CACHE else None
+        self._local = threading.local()
+        self._version_conn = None
+        self._version_lock = threading.Lock()
         self._ensure_database_exists()
 
+        if self.tenant_mode not in ("shared", "view", "shard"):
+            raise ValueError(f"Unknown tenant execution mode: {self.tenant_mode}")
+
     def _ensure_database_exists(self) -> None:
         """Create database if it doesn't exist"""
         if not os.path.exists(self.db_path):
             print(f"📁 Database not found at {self.db_path}, creating...")
-            create_real_estate_db()
+            create_real_estate_db(self.db_path)
             print("✅ Database created successfully!")
 
-    def execute_query(self, sql_query: str) -> Tuple[List, Optional[str]]:
+    def use_database(self, db_path: str) -> str:
+        """
+        Point this interface at another database file
+
+        Pooled connections are dropped (each thread reconnects on next use)
+        and cached results are cleared.
+
+        Args:
+            db_path: Database file to use from now on
+
+        Returns:
+            str: The previous database path (to switch back)
+        """
+        previous = self.db_path
+        with self._version_lock:
+            if self._version_conn is not None:
+                self._version_conn.close()
+                self._version_conn = None
+            self.db_path = db_path
+            self._local = threading.local()
+        if self.result_cache is not None:
+            self.result_cache.clear()
+        self._ensure_database_exists()
+        return previous
+
+    def _connect_read_only(self) -> sqlite3.Connection:
+        """Open a read-only connection to the database file"""
+        return sqlite3.connect(f"file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro", uri=True)
+
+    def get_connection(self, tenant_id: Optional[str] = None) -> sqlite3.Connection:
+        """
+        Get this thread's pooled read-only connection for running generated SQL
+
+        Args:
+            tenant_id: Optional tenant; in "view"/"shard" modes this returns the
+                       tenant-scoped connection instead of the shared one
+
+        Returns:
+            sqlite3.Connection: Connection owned by the calling thread (do not close)
+        """
+        if tenant_id and self.tenant_mode != "shared":
+            return self._tenant_connection(tenant_id)
+
+        conn = getattr(self._local, "connection", None)
+        if conn is None:
+            conn = self._local.connection = self._connect_read_only()
+        return conn
+
+    def get_data_version(self, tenant_id: Optional[str] = None) -> Hashable:
+        """
+        Database version for cache keys
+
+        Based on PRAGMA data_version, which only changes when *another*
+        connection commits, so it is read from one dedicated connection that
+        never writes; every commit by any other connection or process then
+        changes the value. In "shard" mode a tenant's version also includes
+        its shard file's identity, since rebuilding a shard does not touch
+        the shared database.
+
+        Args:
+            tenant_id: Optional tenant whose shard should be taken into account
+
+        Returns:
+            int, or (int, shard stamp) for a tenant in "shard" mode
+        """
+        with self._version_lock:
+            if self._version_conn is None:
+                self._version_conn = sqlite3.connect(
+                    f"file:{pathname2url(os.path.abspath(self.db_path))}?mode=ro",
+                    uri=True,
+                    check_same_thread=False
+                )
+            version = self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+        if tenant_id and self.tenant_mode == "shard":
+            return version, self._shard_stamp(tenant_id)
+        return version
+
+    def get_authorizer(self, tenant_id: Optional[str] = None) -> Optional[Callable]:
+        """Authorizer installed on the connection get_connection(tenant_id) returns (None if none)"""
+        if tenant_id and self.tenant_mode != "shared":
+            self._tenant_connection(tenant_id)
+            return self._local.tenant_connections[tenant_id][2]
+        return None
+
+    def get_shard_path(self, tenant_id: str) -> str:
+        """Path of the shard file for a tenant"""
+        safe_name = re.sub(r"[^A-Za-z0-9_-]", "_", tenant_id)
+        return os.path.join(self.shard_dir, f"{safe_name}.db")
+
+    def _shard_stamp(self, tenant_id: str) -> Optional[Tuple[int, int, int]]:
+        """Identity of a tenant's shard file (inode, mtime, size), or None if it does not exist"""
+        try:
+            stat = os.stat(self.get_shard_path(tenant_id))
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _tenant_connection(self, tenant_id: str) -> sqlite3.Connection:
+        """
+        Get this thread's tenant-scoped connection, creating it on first use
+
+        In "shard" mode, when the tenant's shard file exists, the connection
+        opens that file as main, so no other tenant's rows are reachable at
+        all. Otherwise ("view" mode, or a tenant without a shard yet) it opens
+        the shared database with TEMP VIEWs named projects / project_units;
+        SQLite resolves unqualified names against the temp schema first, and
+        tenant_view_authorizer denies reading the shared tables any other way.
+
+        Connections are rebuilt when the shard file appears, is rebuilt or
+        goes away, so shard exports take effect without a restart.
+        """
+        connections = getattr(self._local, "tenant_connections", None)
+        if connections is None:
+            connections = self._local.tenant_connections = OrderedDict()
+
+        stamp = self._shard_stamp(tenant_id) if self.tenant_mode == "shard" else None
+        entry = connections.get(tenant_id)
+        if entry is not None:
+            if entry[1] == stamp:
+                connections.move_to_end(tenant_id)
+                return entry[0]
+            del connections[tenant_id]
+            entry[0].close()
+
+        if stamp is not None:
+            shard_uri = f"file:{pathname2url(os.path.abspath(self.get_shard_path(tenant_id)))}?mode=ro"
+            conn = sqlite3.connect(shard_uri, uri=True)
+            authorizer = None
+        else:
+            conn = self._connect_read_only()
+            where = "WHERE tenant_id = '{}'".format(tenant_id.replace("'", "''"))
+            for table in TENANT_TABLES:
+                conn.execute(f"CREATE TEMP VIEW {table} AS SELECT * FROM main.{table} {where}")
+            authorizer = tenant_view_authorizer
+            conn.set_authorizer(authorizer)
+
+        connections[tenant_id] = (conn, stamp, authorizer)
+        while len(connections) > TENANT_CONNECTIONS_PER_THREAD:
+            _, evicted = connections.popitem(last=False)
+            evicted[0].close()
+
+        return conn
+
+    def export_tenant_shard(self, tenant_id: str) -> int:
+        """
+        Write (or rebuild) the shard file for a tenant from the shared tables
+
+        Args:
+            tenant_id: Tenant to export
+
+        Returns:
+            int: Number of unit rows written to the shard
+        """
+        os.makedirs(self.shard_dir, exist_ok=True)
+        shard_path = self.get_shard_path(tenant_id)
+        building_path = f"{shard_path}.building"
+        if os.path.exists(building_path):
+            os.remove(building_path)
+
+        # Build next to the live shard and swap it in atomically; readers notice
+        # the new file (see _tenant_connection / get_data_version) on next use
+        conn = sqlite3.connect(building_path)
+        try:
+            conn.execute("ATTACH DATABASE ? AS source", (self.db_path,))
+            ddl = conn.execute(
+                "SELECT sql FROM source.sqlite_master WHERE tbl_name IN (?, ?) AND sql IS NOT NULL "
+                "ORDER BY type = 'index', rootpage",
+                TENANT_TABLES
+            ).fetchall()
+            for (statement,) in ddl:
+                conn.execute(statement)
+
+            for table in TENANT_TABLES:
+                conn.execute(f"INSERT INTO main.{table} SELECT * FROM source.{table} WHERE tenant_id = ?", (tenant_id,))
+
+            conn.commit()
+            units = conn.execute("SELECT COUNT(*) FROM main.project_units").fetchone()[0]
+        finally:
+            conn.close()
+
+        os.replace(building_path, shard_path)
+        return units
+
+    def export_all_tenant_shards(self) -> dict:
+        """
+        Export shard files for every tenant in the shared tables
+
+        Returns:
+            dict: Tenant IDs mapped to unit rows written
+        """
+        conn = sqlite3.connect(self.db_path)
+        tenants = [row[0] for row in conn.execute("SELECT DISTINCT tenant_id FROM projects")]
+        conn.close()
+        return {tenant_id: self.export_tenant_shard(tenant_id) for tenant_id in tenants}
+
+    @traced("sqlite.query", KIND_CLIENT)
+    def execute_query(self, sql_query: str, params: Sequence = (),
+                      tenant_id: Optional[str] = None,
+                      max_rows: Optional[int] = QUERY_MAX_ROWS) -> Tuple[QueryResult, Optional[str]]:
         """
         Execute SQL query and return results
 
         Args:
             sql_query: SQL query string
+            params: Optional bound parameters for ? placeholders
+            tenant_id: Optional tenant to scope execution to ("view"/"shard" modes)
+            max_rows: Maximum rows to fetch (None for all); extra rows set result.truncated
 
         Returns:
             Tuple of (results, error_message)
-            - results: List of tuples with query results (empty if error)
+            - results: QueryResult (list-of-tuples compatible; empty if error)
             - error_message: Error string if failed, None if successful
         """
+        annotate(**{"db.system": "sqlite", "db.statement": sql_query[:1000], "db.tenant_id": tenant_id})
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(sql_query)
-            results = cursor.fetchall()
-            conn.close()
-            return results, None
+            cache_key = None
+            if self.result_cache is not None:
+                scope = tenant_id if self.tenant_mode != "shared" else None
+                cache_key = (canonicalize_sql(sql_query), tuple(params), scope, max_rows,
+                             self.get_data_version(scope))
+                cached = self.result_cache.get(cache_key)
+                if cached is not None:
+                    annotate(**{"db.rows": len(cached), "db.result_cache_hit": True})
+                    return cached.as_cached(), None
+
+            started = time.perf_counter()
+            cursor = self.get_connection(tenant_id).execute(sql_query, params)
+            if max_rows is None:
+                rows, truncated = cursor.fetchall(), False
+            else:
+                rows = cursor.fetchmany(max_rows + 1)
+                truncated = len(rows) > max_rows
+                if truncated:
+                    rows.pop()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            result = QueryResult(cursor.description, rows, truncated, elapsed_ms)
+
+            if cache_key is not None and cursor.description is not None:
+                self.result_cache.put(cache_key, result)
+            annotate(**{"db.rows": len(rows), "db.result_cache_hit": False, "db.truncated": truncated})
+            return result, None
         except Exception as e:
-            return [], str(e)
+            mark_error(str(e))
+            return QueryResult(), str(e)
 
     def get_schema(self, tenant_id: Optional[str] = None) -> str:
         """
@@ -181,6 +551,7 @@ IMPORTANT SQL GUIDELINES:
             print(f"Error getting table counts: {e}")
             return {}
 
+    @traced("sqlite.get_distinct_cities", KIND_CLIENT)
     def get_distinct_cities(self) -> List[str]:
         """
         Get list of all distinct cities in the database
@@ -199,6 +570,7 @@ IMPORTANT SQL GUIDELINES:
             print(f"Error getting cities: {e}")
             return []
 
+    @traced("sqlite.get_distinct_developers", KIND_CLIENT)
     def get_distinct_developers(self, tenant_id: Optional[str] = None) -> List[str]:
         """
         Get list of all distinct developer names in the database
@@ -228,6 +600,7 @@ IMPORTANT SQL GUIDELINES:
             print(f"Error getting developers: {e}")
             return []
 
+    @traced("sqlite.get_distinct_project_names", KIND_CLIENT)
     def get_distinct_project_names(self, tenant_id: Optional[str] = None) -> List[str]:
         """
         Get list of all distinct project names in the database
@@ -275,14 +648,18 @@ def get_database_schema(tenant_id: Optional[str] = None) -> str:
     return db_interface.get_schema(tenant_id)
 
 
-def execute_sql(sql_query: str) -> Tuple[List, Optional[str]]:
+def execute_sql(sql_query: str, params: Sequence = (),
+                tenant_id: Optional[str] = None) -> Tuple[QueryResult, Optional[str]]:
     """
     Execute SQL query (convenience function)
 
     Args:
         sql_query: SQL query string
+        params: Optional bound parameters for ? placeholders
+        tenant_id: Optional tenant to scope execution to
 
     Returns:
         Tuple of (results, error_message)
     """
-    return db_interface.execute_query(sql_query)
+    return db_interface.execute_query(sql_query, params, tenant_id)
+
@@ -6,15 +6,19 @@ Handles fuzzy matching for cities, projects, and developers using LLM and databa
 from typing import Optional, List, Dict
 from llm_client import create_llm_client
 from database import db_interface
+from tracing import traced
 
 
-def normalize_city_name(city_input: str, model_name: str = "qwen/qwen-2.5-72b-instruct") -> str:
+@traced("fuzzy.normalize_city_name")
+def normalize_city_name(city_input: str, model_name: str = "qwen/qwen-2.5-72b-instruct",
+                        tenant_id: Optional[str] = None) -> str:
     """
     Use LLM to normalize misspelled city names to correct spelling
 
     Args:
         city_input: The potentially misspelled city name
-        model_name: LLM model to use for normalization
+        model_name: LLM model to use unless the city_normalization stage configures its own
+        tenant_id: Tenant whose stage overrides apply
 
     Returns:
         str: Normalized city name
@@ -32,7 +36,7 @@ def normalize_city_name(city_input: str, model_name: str = "qwen/qwen-2.5-72b-in
             return city
 
     # Use LLM to find the best match
-    llm = create_llm_client(model_name)
+    llm = create_llm_client(model_name, stage="city_normalization", tenant_id=tenant_id)
 
     cities_list = ", ".join(known_cities)
 
@@ -65,6 +69,7 @@ Correct city name:"""
         return city_input
 
 
+@traced("fuzzy.find_matching_projects")
 def find_matching_projects(project_input: str, tenant_id: Optional[str] = None) -> List[str]:
     """
     Find project names from database that match the input (fuzzy matching)
@@ -92,6 +97,7 @@ def find_matching_projects(project_input: str, tenant_id: Optional[str] = None)
     return matches
 
 
+@traced("fuzzy.find_matching_developers")
 def find_matching_developers(developer_input: str, tenant_id: Optional[str] = None) -> List[str]:
     """
     Find developer names from database that match the input (fuzzy matching)
@@ -119,6 +125,7 @@ def find_matching_developers(developer_input: str, tenant_id: Optional[str] = No
     return matches
 
 
+@traced("fuzzy.get_fuzzy_matching_context")
 def get_fuzzy_matching_context(tenant_id: Optional[str] = None) -> str:
     """
     Get fuzzy matching context for SQL generation including available cities, projects, and developers
@@ -0,0 +1,389 @@
+"""
+Streaming Importers Module
+Bounded-memory CSV / JSONL / XLSX import through declarative field mappings
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+import string
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+
+from config import INGEST_BATCH_SIZE
+from ingest import BulkIngestor, IngestReport, PRIMARY_KEYS, build_report, format_report
+
+try:
+    import openpyxl
+except ImportError:  # Optional - only needed for .xlsx sources
+    openpyxl = None
+
+
+# =======================
+# Value Transforms
+# =======================
+
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def clean_text(value: Any) -> Optional[str]:
+    """Strip strings; blanks and NaN-like placeholders become None"""
+    if value is None:
+        return None
+    text = str(value).strip()
+    if text == "" or text.lower() in ("nan", "none", "null", "n/a", "-"):
+        return None
+    return text
+
+
+def parse_number(value: Any) -> Optional[float]:
+    """First number in a value such as '1,250 sq.ft' or '₹ 85.5 L' (None if there is none)"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return None if value != value else float(value)  # NaN check
+    text = clean_text(value)
+    if text is None:
+        return None
+    match = _NUMBER_RE.search(text.replace(",", ""))
+    return float(match.group()) if match else None
+
+
+def parse_integer(value: Any) -> Optional[int]:
+    """parse_number() truncated to an int"""
+    number = parse_number(value)
+    return None if number is None else int(number)
+
+
+def parse_list(value: Any) -> Optional[List[str]]:
+    """JSON arrays as-is, otherwise split on commas, semicolons, pipes or newlines"""
+    if isinstance(value, list):
+        return value
+    text = clean_text(value)
+    if text is None:
+        return None
+    if text.startswith("["):
+        try:
+            parsed = json.loads(text)
+            if isinstance(parsed, list):
+                return parsed
+        except ValueError:
+            pass
+    return [item.strip() for item in re.split(r"[,;|\n]", text) if item.strip()]
+
+
+def make_slug(value: Any) -> Optional[str]:
+    """Stable identifier from free text, e.g. 'Casagrand Utopia, Chennai' -> 'casagrand_utopia_chennai'"""
+    text = clean_text(value)
+    if text is None:
+        return None
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_") or None
+
+
+def make_hash_id(value: Any) -> Optional[str]:
+    """Short stable identifier (first 12 hex chars of SHA-1) for values without a natural key"""
+    text = clean_text(value)
+    if text is None:
+        return None
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+# Named transforms usable in mapping specs (extend to register more)
+TRANSFORMS: Dict[str, Callable[[Any], Any]] = {
+    "text": clean_text,
+    "number": parse_number,
+    "area": parse_number,
+    "integer": parse_integer,
+    "list": parse_list,
+    "slug": make_slug,
+    "hash_id": make_hash_id
+}
+
+
+# =======================
+# Field Mappings
+# =======================
+
+# A mapping spec describes how source rows become records for one table:
+#
+#     {
+#         "table": "project_units",
+#         "fields": {
+#             "unit_id": {"template": "{Project}-{Unit No}", "transform": "slug"},
+#             "project_id": {"source": "Project", "transform": "slug"},
+#             "tenant_id": {"value": "TM_TEAM_001"},
+#             "configuration_type": ["BHK", "Unnamed: 10"],
+#             "built_up_area_sqft": {"source": "Built up Area", "transform": "area"},
+#             "property_type": {"source": "Type", "default": "Apartment"},
+#             "amenities": {"source": "Amenities", "transform": "list"}
+#         },
+#         "skip_unless": ["unit_id"]
+#     }
+#
+# Field values may be a source column name, a list of fallback column names
+# (first non-empty wins), or a dict with one of "source" / "template" /
+# "value" plus optional "transform" (name from TRANSFORMS or a callable)
+# and "default". A template is empty unless every column it references has
+# a value. Rows where any "skip_unless" field maps to None are skipped
+# silently (section headers, blank lines); everything else goes through
+# ingest validation and is reported there.
+
+MappingSpec = Dict[str, Any]
+FieldSpec = Union[str, Sequence[str], Dict[str, Any]]
+
+
+def _resolve_transform(transform: Union[None, str, Callable]) -> Optional[Callable[[Any], Any]]:
+    if transform is None or callable(transform):
+        return transform
+    if transform not in TRANSFORMS:
+        raise ValueError(f"Unknown transform: {transform}. Available: {list(TRANSFORMS)}")
+    return TRANSFORMS[transform]
+
+
+def compile_mapping(mapping: MappingSpec) -> List[tuple]:
+    """
+    Validate a mapping spec and pre-resolve it for map_row()
+
+    Returns:
+        list: (target, kind, argument, transform, default) per field
+
+    Raises:
+        ValueError: If the table, a field spec or a transform is invalid
+    """
+    if mapping.get("table") not in PRIMARY_KEYS:
+        raise ValueError(f"Unknown table: {mapping.get('table')}. Available: {list(PRIMARY_KEYS)}")
+
+    compiled = []
+    for target, spec in mapping.get("fields", {}).items():
+        if isinstance(spec, str):
+            spec = {"source": [spec]}
+        elif isinstance(spec, (list, tuple)):
+            spec = {"source": list(spec)}
+
+        if "value" in spec:
+            kind, argument = "value", spec["value"]
+        elif "template" in spec:
+            columns = [name for _, name, _, _ in string.Formatter().parse(spec["template"]) if name]
+            kind, argument = "template", (spec["template"], columns)
+        elif "source" in spec:
+            sources = spec["source"]
+            kind, argument = "source", [sources] if isinstance(sources, str) else list(sources)
+        else:
+            raise ValueError(f"Field {target!r} needs one of 'source', 'template' or 'value'")
+
+        transform = _resolve_transform(spec.get("transform", "text" if kind != "value" else None))
+        compiled.append((target, kind, argument, transform, spec.get("default")))
+    return compiled
+
+
+def map_row(row: Dict[str, Any], compiled: List[tuple]) -> Dict[str, Any]:
+    """
+    Apply a compiled mapping to one source row
+
+    Args:
+        row: Source column name -> raw value
+        compiled: Output of compile_mapping()
+
+    Returns:
+        dict: Target column -> value (None for unmapped/empty values)
+    """
+    record = {}
+    for target, kind, argument, transform, default in compiled:
+        if kind == "value":
+            value = argument
+        elif kind == "template":
+            template, columns = argument
+            values = {column: clean_text(row.get(column)) for column in columns}
+            value = None if None in values.values() else template.format_map(values)
+        else:
+            value = None
+            for source in argument:
+                value = row.get(source)
+                if clean_text(value) is not None:
+                    break
+
+        if transform is not None and value is not None:
+            value = transform(value)
+        record[target] = default if value is None else value
+    return record
+
+
+# =======================
+# Source Readers
+# =======================
+
+def _normalize_header(header: Sequence[Any]) -> List[str]:
+    """Stringify and strip header cells; unnamed columns become 'Unnamed: <index>' like pandas"""
+    names = []
+    for i, cell in enumerate(header):
+        name = clean_text(cell)
+        names.append(name if name is not None else f"Unnamed: {i}")
+    return names
+
+
+def iter_csv_rows(path: str, encoding: str = "utf-8-sig", delimiter: str = ",") -> Iterator[Dict[str, Any]]:
+    """Yield CSV rows as dicts, one line at a time"""
+    with open(path, newline="", encoding=encoding) as f:
+        reader = csv.reader(f, delimiter=delimiter)
+        header = _normalize_header(next(reader, []))
+        for values in reader:
+            if any(value.strip() for value in values):
+                yield dict(zip(header, values))
+
+
+def iter_jsonl_rows(path: str, encoding: str = "utf-8") -> Iterator[Dict[str, Any]]:
+    """
+    Yield JSON Lines objects one line at a time
+
+    Raises:
+        ValueError: On a line that is not a JSON object (with its line number)
+    """
+    with open(path, encoding=encoding) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON ({e})")
+            if not isinstance(row, dict):
+                raise ValueError(f"{path}:{line_number}: expected a JSON object")
+            yield row
+
+
+def iter_xlsx_rows(path: str, sheet: Optional[Union[str, int]] = None, header_row: int = 1) -> Iterator[Dict[str, Any]]:
+    """
+    Yield worksheet rows as dicts using openpyxl's read-only streaming mode
+
+    Only the current row is held in memory, unlike pandas.read_excel which
+    materializes the whole sheet.
+
+    Args:
+        path: .xlsx file
+        sheet: Sheet name or 0-based index (defaults to the first sheet)
+        header_row: 1-based row number holding the column names
+
+    Raises:
+        ImportError: If openpyxl is not installed
+    """
+    if openpyxl is None:
+        raise ImportError("openpyxl is required for .xlsx imports. Install it with: pip install openpyxl")
+
+    workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        if sheet is None:
+            worksheet = workbook.worksheets[0]
+        elif isinstance(sheet, int):
+            worksheet = workbook.worksheets[sheet]
+        else:
+            worksheet = workbook[sheet]
+
+        rows = worksheet.iter_rows(min_row=header_row, values_only=True)
+        header = _normalize_header(next(rows, ()))
+        for values in rows:
+            if any(clean_text(value) is not None for value in values):
+                yield dict(zip(header, values))
+    finally:
+        workbook.close()  # Read-only workbooks keep the file handle open until closed
+
+
+# Reader per file extension
+READERS = {
+    ".csv": iter_csv_rows,
+    ".tsv": lambda path, **options: iter_csv_rows(path, delimiter="\t", **options),
+    ".jsonl": iter_jsonl_rows,
+    ".ndjson": iter_jsonl_rows,
+    ".xlsx": iter_xlsx_rows,
+    ".xlsm": iter_xlsx_rows
+}
+
+
+def iter_source_rows(path: str, **options) -> Iterator[Dict[str, Any]]:
+    """
+    Stream rows from a CSV/TSV, JSONL or XLSX file (picked by extension)
+
+    Args:
+        path: Source file
+        **options: Passed to the reader (encoding, delimiter, sheet, header_row)
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in READERS:
+        raise ValueError(f"Unsupported file type: {extension}. Available: {list(READERS)}")
+    return READERS[extension](path, **options)
+
+
+# =======================
+# Import
+# =======================
+
+def import_file(path: str, mappings: Union[MappingSpec, Sequence[MappingSpec]],
+                db_path: Optional[str] = None, batch_size: int = INGEST_BATCH_SIZE,
+                **reader_options) -> IngestReport:
+    """
+    Import a file in one streaming pass through the bulk ingest path
+
+    Several mappings can read the same file, e.g. one producing projects and
+    one producing units from each spreadsheet row. Records are buffered per
+    table and flushed together (projects first) whenever a buffer reaches
+    batch_size, so memory stays bounded by the batch size regardless of
+    file size.
+
+    Args:
+        path: CSV/TSV, JSONL or XLSX file
+        mappings: One mapping spec or a list of them
+        db_path: Database to load into (defaults to config)
+        batch_size: Records per transaction
+        **reader_options: Passed to the file reader (encoding, delimiter, sheet, header_row)
+
+    Returns:
+        IngestReport: Row counts, rejections and throughput
+    """
+    if isinstance(mappings, dict):
+        mappings = [mappings]
+    compiled = [(m["table"], compile_mapping(m), m.get("skip_unless", ())) for m in mappings]
+    tables = sorted({table for table, _, _ in compiled}, key=list(PRIMARY_KEYS).index)
+
+    started = time.perf_counter()
+    with BulkIngestor(db_path, batch_size) as ingestor:
+        buffers: Dict[str, List[dict]] = {table: [] for table in tables}
+
+        def flush():
+            for table in tables:
+                if buffers[table]:
+                    ingestor.write_batch(table, buffers[table])
+                    buffers[table] = []
+
+        for row in iter_source_rows(path, **reader_options):
+            for table, fields, skip_unless in compiled:
+                record = map_row(row, fields)
+                if any(record.get(field) is None for field in skip_unless):
+                    continue
+                buffers[table].append(record)
+                if len(buffers[table]) >= batch_size:
+                    flush()
+        flush()
+
+    return build_report(ingestor, time.perf_counter() - started)
+
+
+def load_mapping(path: str) -> List[MappingSpec]:
+    """Load one mapping spec or a list of them from a JSON file"""
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+    return spec if isinstance(spec, list) else [spec]
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 3:
+        print("Usage: python importers.py <source.csv|.jsonl|.xlsx> <mapping.json> [db_path]")
+        sys.exit(1)
+
+    report = import_file(sys.argv[1], load_mapping(sys.argv[2]),
+                         db_path=sys.argv[3] if len(sys.argv) > 3 else None)
+    for error in report["errors"]:
+        print(f"⚠️  Skipped {error}")
+    print(f"✅ Imported {format_report(report)}")
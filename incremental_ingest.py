@@ -0,0 +1,453 @@
+"""
+Incremental Ingest Module
+Content-hash change detection that applies only real inserts, updates and deletes
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, TypedDict
+from urllib.request import pathname2url
+
+from config import DB_PATH, INGEST_BATCH_SIZE, CHANGE_LOG_RETENTION_DAYS
+from ingest import BulkIngestor, PRIMARY_KEYS
+
+
+# Bookkeeping tables (not part of the schema shown to the LLM)
+HASH_TABLE = "ingest_hashes"
+CHANGE_TABLE = "ingest_changes"
+
+# Keep IN (...) lists well below SQLite's host parameter limit
+_IN_CHUNK = 500
+
+# Change log ops that leave a row behind, as reported by written_records
+_WRITE_OPS = {"insert": "inserted", "update": "updated"}
+
+
+class ChangeEvent(TypedDict):
+    """One row-level change recorded in the change log"""
+    seq: int                   # Monotonic sequence number (resume point for consumers)
+    table: str                 # "projects" or "project_units"
+    op: str                    # "insert", "update", "delete" or "reset" (whole table replaced)
+    record_id: str             # Primary key value ("*" for resets)
+    tenant_id: Optional[str]
+    project_id: Optional[str]  # The project itself, or the unit's parent project
+    columns: List[str]         # Changed columns (provided columns for inserts, [] for deletes)
+    changed_at: str
+
+
+class SyncReport(TypedDict):
+    """Outcome of one incremental sync run"""
+    inserted: Dict[str, int]   # Per table
+    updated: Dict[str, int]
+    deleted: Dict[str, int]
+    unchanged: Dict[str, int]
+    rejected: int
+    errors: List[str]
+    first_seq: Optional[int]   # Change log range written by this run (None if nothing changed)
+    last_seq: Optional[int]
+    elapsed_seconds: float
+
+
+def ensure_change_tables(conn: sqlite3.Connection) -> None:
+    """Create the content-hash and change-log tables if they do not exist"""
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {HASH_TABLE} (
+            table_name TEXT NOT NULL,
+            record_id TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            PRIMARY KEY (table_name, record_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS {CHANGE_TABLE} (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            op TEXT NOT NULL,
+            record_id TEXT NOT NULL,
+            tenant_id TEXT,
+            project_id TEXT,
+            columns TEXT,
+            changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{CHANGE_TABLE}_changed_at ON {CHANGE_TABLE}(changed_at)")
+
+
+def log_table_reset(conn: sqlite3.Connection) -> None:
+    """
+    Record that projects and project_units were rebuilt outside sync_records
+
+    Clears the content hashes (they describe rows that no longer exist) and
+    appends one "reset" event per table, so change-log consumers drop
+    everything they derived instead of missing the rebuild. Runs in the
+    caller's transaction.
+    """
+    ensure_change_tables(conn)
+    conn.execute(f"DELETE FROM {HASH_TABLE}")
+    conn.executemany(
+        f"INSERT INTO {CHANGE_TABLE} (table_name, op, record_id, columns) VALUES (?, 'reset', '*', '[]')",
+        [(table,) for table in PRIMARY_KEYS]
+    )
+
+
+def content_hash(row: Dict[str, Any]) -> str:
+    """Stable SHA-1 of a normalized record (column order does not matter)"""
+    payload = json.dumps(row, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _chunks(values: List[Any], size: int = _IN_CHUNK) -> Iterable[List[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _fetch_by_ids(conn: sqlite3.Connection, sql: str, ids: List[Any]) -> List[tuple]:
+    """Run a query with an IN (...) placeholder list, chunked"""
+    rows = []
+    for chunk in _chunks(ids):
+        rows += conn.execute(sql.format(placeholders=", ".join("?" * len(chunk))), chunk).fetchall()
+    return rows
+
+
+def _scope_clause(conn: sqlite3.Connection, scope: Dict[str, Any]) -> Tuple[str, list]:
+    """
+    WHERE clause selecting the projects a sync snapshot is authoritative for
+
+    Raises:
+        ValueError: If scope names a column that projects does not have
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(projects)")}
+    conditions, params = [], []
+    for column, value in scope.items():
+        if column not in columns:
+            raise ValueError(f"Unknown scope column: {column}. Available: {sorted(columns)}")
+        if isinstance(value, (list, tuple, set)):
+            values = list(value)
+            conditions.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params += values
+        else:
+            conditions.append(f"{column} = ?")
+            params.append(value)
+    return " AND ".join(conditions) or "1", params
+
+
+class IncrementalSync:
+    """
+    Applies a snapshot of records as the minimal set of row changes
+
+    Each record is normalized exactly like the bulk path, hashed, and compared
+    with the hash stored on the previous run. Unchanged records cost one
+    indexed lookup and no write. Changed records are upserted together with
+    their new hash and a change-log entry in one transaction per batch, so
+    the hashes never drift from the data.
+    """
+
+    def __init__(self, ingestor: BulkIngestor):
+        self.ingestor = ingestor
+        self.conn = ingestor.conn
+        self.seen: Dict[str, Set[str]] = {table: set() for table in PRIMARY_KEYS}
+        self.unkeyed_rejects = 0  # Rejected records without a primary key (block delete_missing)
+        self.counts = {op: {table: 0 for table in PRIMARY_KEYS}
+                       for op in ("inserted", "updated", "deleted", "unchanged")}
+        self._bumps_projects = "modified_at" in ingestor._schema("projects")
+        ensure_change_tables(self.conn)
+
+    def sync_batch(self, table: str, records: Iterable[Dict[str, Any]]) -> None:
+        """Diff one batch of records against stored hashes and apply the changes"""
+        primary_key = PRIMARY_KEYS[table]
+        records = list(records)
+        by_id = {row[primary_key]: row for row in self.ingestor.prepare_batch(table, records)}
+        ids = list(by_id)
+        self.seen[table].update(ids)
+        # Records rejected by validation are still part of the snapshot: their stored
+        # rows must not be deleted as missing
+        for record in records:
+            record_id = record.get(primary_key)
+            if record_id in (None, ""):
+                self.unkeyed_rejects += 1
+            else:
+                self.seen[table].update((record_id, str(record_id)))
+
+        stored = dict(_fetch_by_ids(
+            self.conn,
+            f"SELECT record_id, content_hash FROM {HASH_TABLE} WHERE table_name = '{table}' "
+            "AND record_id IN ({placeholders})",
+            ids
+        ))
+        hashes = {record_id: content_hash(row) for record_id, row in by_id.items()}
+        candidates = [record_id for record_id in ids if stored.get(record_id) != hashes[record_id]]
+        self.counts["unchanged"][table] += len(ids) - len(candidates)
+        if not candidates:
+            return
+
+        cursor = self.conn.execute(f"SELECT * FROM {table} LIMIT 0")
+        names = [column[0] for column in cursor.description]
+        key_index = names.index(primary_key)
+        existing = {
+            row[key_index]: dict(zip(names, row))
+            for row in _fetch_by_ids(self.conn, f"SELECT * FROM {table} WHERE {primary_key} IN ({{placeholders}})",
+                                     candidates)
+        }
+
+        writes, events = [], []
+        for record_id in candidates:
+            row = by_id[record_id]
+            old = existing.get(record_id)
+            if old is None:
+                op, columns = "insert", [column for column in row if column != primary_key]
+            else:
+                columns = [column for column, value in row.items() if column != primary_key and old.get(column) != value]
+                if not columns:
+                    # Same content, hash just unknown (first incremental run) - record it, write nothing
+                    self.counts["unchanged"][table] += 1
+                    continue
+                op = "update"
+            merged = old or {}
+            project_id = record_id if table == "projects" else row.get("project_id", merged.get("project_id"))
+            writes.append(row)
+            events.append((table, op, record_id, row.get("tenant_id", merged.get("tenant_id")),
+                           project_id, json.dumps(columns)))
+            self.counts["inserted" if op == "insert" else "updated"][table] += 1
+
+        self.conn.execute("BEGIN")
+        try:
+            self.ingestor.upsert_rows(table, writes)
+            self.conn.executemany(
+                f"INSERT INTO {HASH_TABLE} (table_name, record_id, content_hash) VALUES (?, ?, ?) "
+                "ON CONFLICT(table_name, record_id) DO UPDATE SET content_hash = excluded.content_hash",
+                [(table, record_id, hashes[record_id]) for record_id in candidates]
+            )
+            self._log(events)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def delete_missing(self, scope: Dict[str, Any]) -> None:
+        """
+        Delete in-scope rows that were not part of the snapshot
+
+        Projects matching scope that were not seen are deleted together with
+        all their units; units of in-scope projects that were not seen are
+        deleted too. Nothing is deleted when a rejected record had no primary
+        key, since any stored row could be the one it describes.
+        """
+        where, params = _scope_clause(self.conn, scope)
+        if self.unkeyed_rejects:
+            return
+        stale_projects = [
+            (project_id, tenant_id)
+            for project_id, tenant_id in self.conn.execute(f"SELECT project_id, tenant_id FROM projects WHERE {where}", params)
+            if project_id not in self.seen["projects"]
+        ]
+        stale_project_ids = {project_id for project_id, _ in stale_projects}
+        stale_units = [
+            (unit_id, project_id, tenant_id)
+            for unit_id, project_id, tenant_id in self.conn.execute(
+                "SELECT unit_id, project_id, tenant_id FROM project_units "
+                f"WHERE project_id IN (SELECT project_id FROM projects WHERE {where})", params
+            )
+            if unit_id not in self.seen["project_units"] or project_id in stale_project_ids
+        ]
+        if not stale_projects and not stale_units:
+            return
+
+        self.conn.execute("BEGIN")
+        try:
+            for table, rows in (("project_units", stale_units), ("projects", stale_projects)):
+                primary_key = PRIMARY_KEYS[table]
+                ids = [(row[0],) for row in rows]
+                self.conn.executemany(f"DELETE FROM {table} WHERE {primary_key} = ?", ids)
+                self.conn.executemany(f"DELETE FROM {HASH_TABLE} WHERE table_name = '{table}' AND record_id = ?", ids)
+                self.counts["deleted"][table] += len(rows)
+            self._log(
+                [("project_units", "delete", unit_id, tenant_id, project_id, "[]")
+                 for unit_id, project_id, tenant_id in stale_units]
+                + [("projects", "delete", project_id, tenant_id, project_id, "[]")
+                   for project_id, tenant_id in stale_projects]
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def _log(self, events: List[tuple]) -> None:
+        """Append change events and bump modified_at on projects whose units changed"""
+        self.conn.executemany(
+            f"INSERT INTO {CHANGE_TABLE} (table_name, op, record_id, tenant_id, project_id, columns) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            events
+        )
+        if self._bumps_projects:
+            parents = list({event[4] for event in events if event[0] == "project_units" and event[4]})
+            for chunk in _chunks(parents):
+                self.conn.execute(
+                    f"UPDATE projects SET modified_at = CURRENT_TIMESTAMP "
+                    f"WHERE project_id IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                )
+
+
+def _last_seq(conn: sqlite3.Connection) -> int:
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (CHANGE_TABLE,)).fetchone()
+    return row[0] if row else 0
+
+
+def sync_records(projects: Iterable[Dict[str, Any]] = (), units: Iterable[Dict[str, Any]] = (),
+                 scope: Optional[Dict[str, Any]] = None, db_path: Optional[str] = None,
+                 batch_size: int = INGEST_BATCH_SIZE) -> SyncReport:
+    """
+    Incrementally apply project and unit records
+
+    Args:
+        projects: Iterable of project dicts keyed by column name
+        units: Iterable of unit dicts keyed by column name
+        scope: Project column filter (e.g. {"tenant_id": "T1", "city": ["Chennai", "Kochi"]})
+               that the records fully describe. Rows in scope that are missing from the
+               records are deleted. Without a scope nothing is deleted.
+        db_path: Database to load into (defaults to config)
+        batch_size: Records per transaction
+
+    Returns:
+        SyncReport: Per-table change counts and the change log range written
+
+    Raises:
+        ValueError: If scope names an unknown column
+    """
+    started = time.perf_counter()
+    with BulkIngestor(db_path, batch_size) as ingestor:
+        sync = IncrementalSync(ingestor)
+        if scope is not None:
+            _scope_clause(sync.conn, scope)  # Fail before writing anything
+        seq_before = _last_seq(sync.conn)
+
+        for table, records in (("projects", projects), ("project_units", units)):
+            iterator = iter(records)
+            while True:
+                batch = list(islice(iterator, batch_size))
+                if not batch:
+                    break
+                sync.sync_batch(table, batch)
+
+        if scope is not None:
+            sync.delete_missing(scope)
+        prune_changes(sync.conn)
+        seq_after = _last_seq(sync.conn)
+
+    return {
+        **sync.counts,
+        "rejected": ingestor.rejected,
+        "errors": ingestor.errors,
+        "first_seq": seq_before + 1 if seq_after > seq_before else None,
+        "last_seq": seq_after if seq_after > seq_before else None,
+        "elapsed_seconds": time.perf_counter() - started
+    }
+
+
+def prune_changes(conn: sqlite3.Connection, retention_days: int = CHANGE_LOG_RETENTION_DAYS) -> int:
+    """
+    Drop change log entries older than the retention window
+
+    Returns:
+        int: Entries removed
+    """
+    cursor = conn.execute(
+        f"DELETE FROM {CHANGE_TABLE} WHERE changed_at < datetime('now', ?)", (f"-{int(retention_days)} days",)
+    )
+    return cursor.rowcount
+
+
+def read_changes(since_seq: int = 0, db_path: Optional[str] = None, limit: Optional[int] = None) -> List[ChangeEvent]:
+    """
+    Read change log entries after a sequence number (for cache invalidation)
+
+    Consumers remember the last seq they processed and pass it back in.
+
+    Args:
+        since_seq: Return entries with seq > since_seq
+        db_path: Database to read (defaults to config)
+        limit: Maximum entries to return
+
+    Returns:
+        list: ChangeEvent dicts in seq order (empty if no incremental sync has run)
+    """
+    conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(db_path or DB_PATH))}?mode=ro", uri=True)
+    try:
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (CHANGE_TABLE,)).fetchone()
+        if not exists:
+            return []
+        sql = (f"SELECT seq, table_name, op, record_id, tenant_id, project_id, columns, changed_at "
+               f"FROM {CHANGE_TABLE} WHERE seq > ? ORDER BY seq")
+        params: list = [since_seq]
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [
+            {"seq": seq, "table": table, "op": op, "record_id": record_id, "tenant_id": tenant_id,
+             "project_id": project_id, "columns": json.loads(columns or "[]"), "changed_at": changed_at}
+            for seq, table, op, record_id, tenant_id, project_id, columns, changed_at in conn.execute(sql, params)
+        ]
+    finally:
+        conn.close()
+
+
+def written_records(report: SyncReport, db_path: Optional[str] = None) -> Dict[str, Dict[str, str]]:
+    """
+    Records a sync run actually inserted or updated (from its change log range)
+
+    Rejected and unchanged records are not included.
+
+    Args:
+        report: SyncReport returned by sync_records
+        db_path: Database the run wrote to (defaults to config)
+
+    Returns:
+        dict: Table name -> {record_id: "inserted" | "updated"}
+    """
+    written: Dict[str, Dict[str, str]] = {table: {} for table in PRIMARY_KEYS}
+    if report["first_seq"] is None:
+        return written
+    events = read_changes(report["first_seq"] - 1, db_path, limit=report["last_seq"] - report["first_seq"] + 1)
+    for event in events:
+        if event["op"] in _WRITE_OPS:
+            written[event["table"]][event["record_id"]] = _WRITE_OPS[event["op"]]
+    return written
+
+
+def summarize_changes(events: Iterable[ChangeEvent]) -> Dict[str, Any]:
+    """
+    Collapse change events into what invalidation decisions need
+
+    Returns:
+        dict: tenants, projects (touched project ids), tables, columns per table
+              (deletes and inserts count as touching every column: "*"), and reset
+              (True if a table was rebuilt, which touches every tenant and project)
+    """
+    summary = {"tenants": set(), "projects": set(), "tables": set(), "columns": {}, "reset": False}
+    for event in events:
+        summary["tables"].add(event["table"])
+        if event["op"] == "reset":
+            summary["reset"] = True
+        if event["tenant_id"] is not None:
+            summary["tenants"].add(event["tenant_id"])
+        if event["project_id"] is not None:
+            summary["projects"].add(event["project_id"])
+        columns = summary["columns"].setdefault(event["table"], set())
+        columns.update(event["columns"] if event["op"] == "update" else ["*"])
+    return summary
+
+
+def format_sync_report(report: SyncReport) -> str:
+    """One-line human-readable summary of a sync run"""
+    parts = []
+    for op in ("inserted", "updated", "deleted", "unchanged"):
+        counts = report[op]
+        parts.append(f"{op} {counts['projects']}/{counts['project_units']}")
+    summary = f"projects/units {', '.join(parts)} in {report['elapsed_seconds']:.2f}s"
+    if report["rejected"]:
+        summary += f", {report['rejected']} rejected"
+    return summary
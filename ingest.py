@@ -0,0 +1,299 @@
+"""
+Bulk Ingest Module
+Validated, batched, transactional loading of project and unit records
+"""
+
+import json
+import sqlite3
+import time
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple, TypedDict
+
+from config import DB_PATH, INGEST_BATCH_SIZE
+
+
+# Primary key column per ingestible table
+PRIMARY_KEYS = {
+    "projects": "project_id",
+    "project_units": "unit_id"
+}
+
+# Keep at most this many validation error messages in a report
+MAX_REPORTED_ERRORS = 50
+
+
+class IngestReport(TypedDict):
+    """Outcome of one ingest run"""
+    projects: int             # Project rows written (inserted or updated)
+    units: int                # Unit rows written (inserted or updated)
+    rejected: int             # Records that failed validation
+    errors: List[str]         # First MAX_REPORTED_ERRORS validation messages
+    elapsed_seconds: float
+    rows_per_second: float
+
+
+def load_table_schema(conn: sqlite3.Connection, table: str) -> Dict[str, dict]:
+    """
+    Column metadata for a table
+
+    Returns:
+        dict: Column name -> {"type", "notnull", "has_default", "numeric"}
+    """
+    schema = {}
+    for _, name, col_type, notnull, default, _ in conn.execute(f"PRAGMA table_info({table})"):
+        schema[name] = {
+            "type": (col_type or "").upper(),
+            "notnull": bool(notnull),
+            "has_default": default is not None,
+            "numeric": _is_numeric_type((col_type or "").upper())
+        }
+    return schema
+
+
+def _is_numeric_type(col_type: str) -> bool:
+    """True for columns with INTEGER/NUMERIC affinity (incl. DECIMAL, BOOLEAN)"""
+    return any(word in col_type for word in ("INT", "DEC", "NUM", "REAL", "FLOA", "DOUB", "BOOL"))
+
+
+def validate_record(record: Dict[str, Any], schema: Dict[str, dict], table: str) -> Tuple[Optional[dict], Optional[str]]:
+    """
+    Validate one record against the table schema and normalize its values
+
+    - Unknown columns are rejected
+    - The primary key and NOT NULL columns without defaults are required
+    - Lists/dicts are JSON-encoded, dates become ISO strings, booleans become 0/1
+    - Numeric columns accept numbers or numeric strings
+
+    Args:
+        record: Column name -> value
+        schema: Output of load_table_schema()
+        table: Table name (for messages and primary key lookup)
+
+    Returns:
+        Tuple of (normalized_record, error_message) - exactly one is None
+    """
+    primary_key = PRIMARY_KEYS[table]
+    label = f"{table}[{record.get(primary_key)!r}]"
+
+    unknown = [column for column in record if column not in schema]
+    if unknown:
+        return None, f"{label}: unknown columns {unknown}"
+
+    if record.get(primary_key) in (None, ""):
+        return None, f"{label}: missing {primary_key}"
+
+    missing = [
+        column for column, info in schema.items()
+        if info["notnull"] and not info["has_default"] and record.get(column) in (None, "")
+    ]
+    if missing:
+        return None, f"{label}: missing required columns {missing}"
+
+    normalized = {}
+    for column, value in record.items():
+        if isinstance(value, (list, dict)):
+            value = json.dumps(value)
+        elif isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        elif isinstance(value, bool):
+            value = int(value)
+        elif isinstance(value, str) and schema[column]["numeric"]:
+            text = value.replace(",", "").strip()
+            if text == "":
+                value = None
+            else:
+                try:
+                    value = int(text) if text.lstrip("-").isdigit() else float(text)
+                except ValueError:
+                    return None, f"{label}: {column} is not numeric ({value!r})"
+        normalized[column] = value
+
+    return normalized, None
+
+
+def _upsert_sql(table: str, columns: Tuple[str, ...], schema: Dict[str, dict]) -> str:
+    """INSERT ... ON CONFLICT(pk) DO UPDATE for the given column set"""
+    primary_key = PRIMARY_KEYS[table]
+    placeholders = ", ".join("?" for _ in columns)
+    updates = [f"{column} = excluded.{column}" for column in columns if column != primary_key]
+    if "modified_at" in schema and "modified_at" not in columns:
+        updates.append("modified_at = CURRENT_TIMESTAMP")
+
+    conflict = f"DO UPDATE SET {', '.join(updates)}" if updates else "DO NOTHING"
+    return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders}) "
+            f"ON CONFLICT({primary_key}) {conflict}")
+
+
+class BulkIngestor:
+    """
+    Batched upsert writer for projects and project_units
+
+    Use as a context manager. On entry the database is switched to WAL
+    (which persists, and lets readers keep querying during a load) with
+    synchronous=NORMAL and a large page cache; the latter two are restored
+    on exit. Each batch is written with executemany inside its own
+    transaction. A process crash loses only the batch in flight; a power
+    loss or OS crash may also roll back the last few committed batches,
+    but never corrupts the database.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, batch_size: int = INGEST_BATCH_SIZE):
+        """
+        Args:
+            db_path: Database to load into (defaults to config)
+            batch_size: Records per transaction
+        """
+        self.db_path = db_path or DB_PATH
+        self.batch_size = batch_size
+        self.conn = None
+        self._schemas = {}
+        self._saved_pragmas = {}
+        self.written = {"projects": 0, "project_units": 0}
+        self.rejected = 0
+        self.errors: List[str] = []
+
+    def __enter__(self) -> "BulkIngestor":
+        self.conn = sqlite3.connect(self.db_path, isolation_level=None)
+        for pragma in ("synchronous", "cache_size", "temp_store"):
+            self._saved_pragmas[pragma] = self.conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("PRAGMA cache_size = -65536")  # 64 MB
+        self.conn.execute("PRAGMA temp_store = MEMORY")
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            for pragma, value in self._saved_pragmas.items():
+                self.conn.execute(f"PRAGMA {pragma} = {value}")
+        finally:
+            self.conn.close()
+            self.conn = None
+
+    def _schema(self, table: str) -> Dict[str, dict]:
+        if table not in self._schemas:
+            self._schemas[table] = load_table_schema(self.conn, table)
+        return self._schemas[table]
+
+    def reject(self, message: str) -> None:
+        """Count a rejected record, keeping the first MAX_REPORTED_ERRORS messages"""
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+    def prepare_batch(self, table: str, records: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Validate and normalize records, counting and dropping the invalid ones"""
+        schema = self._schema(table)
+        rows = []
+        for record in records:
+            row, error = validate_record(record, schema, table)
+            if error:
+                self.reject(error)
+            else:
+                rows.append(row)
+        return rows
+
+    def upsert_rows(self, table: str, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Upsert already-validated rows (no transaction handling - the caller owns it)
+
+        Rows are grouped by their column set so each group is one
+        executemany call; upserts only touch the columns a row provides.
+
+        Returns:
+            int: Rows written
+        """
+        schema = self._schema(table)
+        groups: Dict[Tuple[str, ...], List[tuple]] = {}
+        for row in rows:
+            groups.setdefault(tuple(row), []).append(tuple(row.values()))
+
+        written = 0
+        for columns, values in groups.items():
+            self.conn.executemany(_upsert_sql(table, columns, schema), values)
+            written += len(values)
+        self.written[table] += written
+        return written
+
+    def write_batch(self, table: str, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Validate and upsert one batch in a single transaction
+
+        Returns:
+            int: Rows written
+        """
+        rows = self.prepare_batch(table, records)
+        self.conn.execute("BEGIN")
+        try:
+            written = self.upsert_rows(table, rows)
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return written
+
+    def write(self, table: str, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Stream records into a table in batch_size transactions
+
+        Args:
+            table: "projects" or "project_units"
+            records: Any iterable (consumed lazily, so generators keep memory flat)
+
+        Returns:
+            int: Rows written
+        """
+        if table not in PRIMARY_KEYS:
+            raise ValueError(f"Unknown table: {table}. Available: {list(PRIMARY_KEYS)}")
+
+        written = 0
+        iterator = iter(records)
+        while True:
+            batch = list(islice(iterator, self.batch_size))
+            if not batch:
+                return written
+            written += self.write_batch(table, batch)
+
+
+def ingest_records(projects: Iterable[Dict[str, Any]] = (), units: Iterable[Dict[str, Any]] = (),
+                   db_path: Optional[str] = None, batch_size: int = INGEST_BATCH_SIZE) -> IngestReport:
+    """
+    Upsert project and unit records (projects first, so units can reference them)
+
+    Args:
+        projects: Iterable of project dicts keyed by column name
+        units: Iterable of unit dicts keyed by column name
+        db_path: Database to load into (defaults to config)
+        batch_size: Records per transaction
+
+    Returns:
+        IngestReport: Row counts, rejections and throughput
+    """
+    started = time.perf_counter()
+    with BulkIngestor(db_path, batch_size) as ingestor:
+        ingestor.write("projects", projects)
+        ingestor.write("project_units", units)
+    return build_report(ingestor, time.perf_counter() - started)
+
+
+def build_report(ingestor: BulkIngestor, elapsed: float) -> IngestReport:
+    """IngestReport for a finished BulkIngestor run"""
+    total = ingestor.written["projects"] + ingestor.written["project_units"]
+    return {
+        "projects": ingestor.written["projects"],
+        "units": ingestor.written["project_units"],
+        "rejected": ingestor.rejected,
+        "errors": ingestor.errors,
+        "elapsed_seconds": elapsed,
+        "rows_per_second": total / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def format_report(report: IngestReport) -> str:
+    """One-line human-readable summary of an ingest run"""
+    summary = (f"{report['projects']} projects, {report['units']} units in "
+               f"{report['elapsed_seconds']:.2f}s ({report['rows_per_second']:,.0f} rows/s)")
+    if report["rejected"]:
+        summary += f", {report['rejected']} rejected"
+    return summary
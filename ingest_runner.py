@@ -0,0 +1,280 @@
+"""
+Ingest Runner Module
+Parallel multi-source import: parser processes feeding one SQLite writer thread
+"""
+
+import json
+import multiprocessing
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, TypedDict
+from urllib.request import pathname2url
+
+from config import DB_PATH, INGEST_BATCH_SIZE, INGEST_WORKERS, INGEST_QUEUE_BATCHES, INGEST_TRANSACTION_ROWS
+from importers import MappingSpec, compile_mapping, iter_source_rows, load_mapping, map_row
+from ingest import (
+    BulkIngestor, IngestReport, MAX_REPORTED_ERRORS, PRIMARY_KEYS,
+    build_report, format_report, load_table_schema, validate_record
+)
+
+
+class IngestJob(TypedDict, total=False):
+    """One source file to import"""
+    path: str                        # CSV/TSV, JSONL or XLSX file
+    mappings: List[MappingSpec]      # Mapping specs applied to every row (see importers.py)
+    options: Dict[str, Any]          # Reader options (encoding, delimiter, sheet, header_row)
+
+
+class SourceStatus(TypedDict):
+    """Per-source outcome of a run"""
+    path: str
+    rows: int                        # Source rows read
+    records: int                     # Valid records sent to the writer
+    rejected: int                    # Records that failed validation
+    errors: List[str]                # First MAX_REPORTED_ERRORS validation messages
+    error: Optional[str]             # Set if the source could not be read to the end
+
+
+class RunReport(IngestReport):
+    """IngestReport plus per-source status"""
+    sources: List[SourceStatus]
+
+
+# =======================
+# Parser Processes
+# =======================
+
+# Set in each worker process by _init_worker (multiprocessing queues cannot be
+# passed as task arguments, only inherited at process start)
+_out_queue = None
+
+
+def _init_worker(out_queue) -> None:
+    global _out_queue
+    _out_queue = out_queue
+
+
+def _parse_source(index: int, job: IngestJob, db_path: str, batch_size: int) -> None:
+    """
+    Read, map and validate one source, streaming batches to the writer
+
+    Runs in a worker process, so spreadsheet parsing, value cleanup and JSON
+    encoding happen in parallel. Only validated rows cross the process
+    boundary; the writer just executes them. Queue messages:
+
+        ("rows", table, rows)     - validated rows for one table
+        ("done", index, status)   - SourceStatus, always sent last
+    """
+    status: SourceStatus = {"path": job["path"], "rows": 0, "records": 0, "rejected": 0, "errors": [], "error": None}
+    try:
+        compiled = [(m["table"], compile_mapping(m), m.get("skip_unless", ())) for m in job["mappings"]]
+        conn = sqlite3.connect(f"file:{pathname2url(os.path.abspath(db_path))}?mode=ro", uri=True)
+        try:
+            schemas = {table: load_table_schema(conn, table) for table, _, _ in compiled}
+        finally:
+            conn.close()
+
+        buffers: Dict[str, list] = {table: [] for table in schemas}
+
+        def flush(table: str) -> None:
+            if buffers[table]:
+                _out_queue.put(("rows", table, buffers[table]))
+                buffers[table] = []
+
+        for source_row in iter_source_rows(job["path"], **job.get("options", {})):
+            status["rows"] += 1
+            for table, fields, skip_unless in compiled:
+                record = map_row(source_row, fields)
+                if any(record.get(field) is None for field in skip_unless):
+                    continue
+                row, error = validate_record(record, schemas[table], table)
+                if error:
+                    status["rejected"] += 1
+                    if len(status["errors"]) < MAX_REPORTED_ERRORS:
+                        status["errors"].append(f"{job['path']}: {error}")
+                    continue
+                status["records"] += 1
+                buffers[table].append(row)
+                if len(buffers[table]) >= batch_size:
+                    flush(table)
+
+        for table in sorted(buffers, key=list(PRIMARY_KEYS).index):
+            flush(table)
+    except Exception as e:
+        status["error"] = f"{type(e).__name__}: {e}"
+    _out_queue.put(("done", index, status))
+
+
+# =======================
+# Writer Thread
+# =======================
+
+class _Writer(threading.Thread):
+    """
+    Sole SQLite writer: drains the queue and commits large transactions
+
+    Messages already waiting in the queue are merged into one transaction
+    (up to transaction_rows), so a fast producer pool results in few,
+    large commits. If a write fails the thread keeps draining (and
+    discarding) so producers blocked on the bounded queue can finish.
+    """
+
+    def __init__(self, ingestor_factory, in_queue, expected_sources: int, transaction_rows: int):
+        super().__init__(name="ingest-writer", daemon=True)
+        self.ingestor_factory = ingestor_factory
+        self.in_queue = in_queue
+        self.remaining = expected_sources
+        self.transaction_rows = transaction_rows
+        self.statuses: Dict[int, SourceStatus] = {}
+        self.ingestor: Optional[BulkIngestor] = None
+        self.error: Optional[BaseException] = None
+        self.transactions = 0
+
+    def _handle(self, message, pending: Dict[str, list]) -> int:
+        kind = message[0]
+        if kind == "rows":
+            _, table, rows = message
+            pending.setdefault(table, []).extend(rows)
+            return len(rows)
+        if kind == "done":
+            _, index, status = message
+            self.statuses[index] = status
+            self.remaining -= 1
+            if self.ingestor is not None:
+                for error in status["errors"]:
+                    self.ingestor.reject(error)
+                self.ingestor.rejected += status["rejected"] - len(status["errors"])
+        return 0
+
+    def _commit(self, pending: Dict[str, list]) -> None:
+        if self.error is not None or not any(pending.values()):
+            return
+        conn = self.ingestor.conn
+        conn.execute("BEGIN")
+        try:
+            for table in PRIMARY_KEYS:  # Projects before units
+                if pending.get(table):
+                    self.ingestor.upsert_rows(table, pending[table])
+            conn.execute("COMMIT")
+            self.transactions += 1
+        except BaseException as e:
+            conn.execute("ROLLBACK")
+            self.error = e
+
+    def _drain(self) -> None:
+        while self.remaining > 0:
+            pending: Dict[str, list] = {}
+            size = self._handle(self.in_queue.get(), pending)
+            while size < self.transaction_rows and self.remaining > 0:
+                try:
+                    size += self._handle(self.in_queue.get_nowait(), pending)
+                except queue.Empty:
+                    break
+            self._commit(pending)
+
+    def run(self) -> None:
+        try:
+            with self.ingestor_factory() as ingestor:
+                self.ingestor = ingestor
+                self._drain()
+        except BaseException as e:
+            self.error = self.error or e
+            self._drain()  # Discard the rest so blocked producers can finish
+
+
+# =======================
+# Runner
+# =======================
+
+def run_ingest(jobs: Sequence[IngestJob], db_path: Optional[str] = None,
+               workers: Optional[int] = INGEST_WORKERS, batch_size: int = INGEST_BATCH_SIZE,
+               queue_batches: int = INGEST_QUEUE_BATCHES,
+               transaction_rows: int = INGEST_TRANSACTION_ROWS) -> RunReport:
+    """
+    Import several sources in parallel with a single database writer
+
+    Sources are parsed in a process pool (one source per worker at a time)
+    and streamed as validated batches through a bounded queue to one writer
+    thread. Memory is bounded by queue_batches * batch_size rows plus one
+    in-flight batch per worker. A failing source is reported in its status
+    and does not stop the others.
+
+    Args:
+        jobs: Sources with their mapping specs
+        db_path: Database to load into (defaults to config)
+        workers: Parser processes (None = one per CPU)
+        batch_size: Rows per queued batch
+        queue_batches: Maximum batches waiting for the writer
+        transaction_rows: Rows merged into one write transaction
+
+    Returns:
+        RunReport: Row counts, rejections, throughput and per-source status
+
+    Raises:
+        Exception: Whatever the writer hit (the failed transaction is rolled back)
+    """
+    db_path = db_path or DB_PATH
+    started = time.perf_counter()
+
+    # Spawned (not forked) workers: forking while the writer thread holds
+    # queue and SQLite locks can deadlock the children
+    context = multiprocessing.get_context("spawn")
+    batches = context.Queue(maxsize=queue_batches)
+    writer = _Writer(lambda: BulkIngestor(db_path, batch_size), batches, len(jobs), transaction_rows)
+    writer.start()
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(batches,)) as pool:
+        futures = [pool.submit(_parse_source, i, job, db_path, batch_size) for i, job in enumerate(jobs)]
+        for i, future in enumerate(futures):
+            try:
+                future.result()
+            except Exception as e:  # Worker process died before reporting
+                batches.put(("done", i, {"path": jobs[i]["path"], "rows": 0, "records": 0, "rejected": 0,
+                                         "errors": [], "error": f"{type(e).__name__}: {e}"}))
+    writer.join()
+    batches.close()
+
+    if writer.error is not None:
+        raise writer.error
+
+    report = build_report(writer.ingestor, time.perf_counter() - started)
+    return {**report, "sources": [writer.statuses[i] for i in range(len(jobs))]}
+
+
+def load_jobs(path: str) -> List[IngestJob]:
+    """
+    Load jobs from a JSON file
+
+    Each job's "mappings" may be inline specs or the path of a mapping file.
+    """
+    with open(path, encoding="utf-8") as f:
+        jobs = json.load(f)
+    for job in jobs:
+        mappings = job.get("mappings")
+        if isinstance(mappings, str):
+            job["mappings"] = load_mapping(mappings)
+        elif isinstance(mappings, dict):
+            job["mappings"] = [mappings]
+    return jobs
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python ingest_runner.py <jobs.json> [db_path]")
+        sys.exit(1)
+
+    report = run_ingest(load_jobs(sys.argv[1]), db_path=sys.argv[2] if len(sys.argv) > 2 else None)
+    for source in report["sources"]:
+        if source["error"]:
+            print(f"❌ {source['path']}: {source['error']}")
+        else:
+            print(f"✅ {source['path']}: {source['rows']} rows, {source['records']} records, "
+                  f"{source['rejected']} rejected")
+    print(f"\n⏱️  {format_report(report)}")
@@ -3,12 +3,8 @@ Insert Bangalore Projects into Database
 Adds 8 Puravankara projects in Bangalore
 """
 
-import sqlite3
 import json
-
-# Connect to database
-conn = sqlite3.connect("real_estate_data.db")
-cursor = conn.cursor()
+from incremental_ingest import sync_records, format_sync_report, written_records
 
 # =====================
 # PURVA ZENIUM
@@ -513,18 +509,12 @@ purva_orient_grand = {
     "airport_distance": None
 }
 
-# Insert all projects
+# All projects
 projects = [
     purva_zenium, purva_atmosphere, purva_park_hill, smiling_willows,
     purva_tiara, purva_meraki, purva_blubelle, purva_orient_grand
 ]
 
-for project in projects:
-    columns = ", ".join(project.keys())
-    placeholders = ", ".join(["?" for _ in project])
-    query = f"INSERT INTO projects ({columns}) VALUES ({placeholders})"
-    cursor.execute(query, list(project.values()))
-    print(f"✅ Inserted project: {project['project_name']}")
 
 # =====================
 # UNITS DATA
@@ -594,25 +584,33 @@ orient_grand_units = [
 all_units = (zenium_units + atmosphere_units + park_hill_units + willows_units +
              tiara_units + meraki_units + blubelle_units + orient_grand_units)
 
-# Insert all units
-for unit in all_units:
-    columns = ", ".join(unit.keys())
-    placeholders = ", ".join(["?" for _ in unit])
-    query = f"INSERT INTO project_units ({columns}) VALUES ({placeholders})"
-    cursor.execute(query, list(unit.values()))
+# Apply only what changed since the last run; in-scope rows no longer listed here are deleted
+report = sync_records(projects=projects, units=all_units,
+                      scope={"tenant_id": "PURVA_DEFAULT", "city": "Bangalore"},
+                      db_path="real_estate_data.db")
+for error in report["errors"]:
+    print(f"⚠️  Skipped {error}")
+
+units_by_project = [
+    ("Purva Zenium", zenium_units), ("Purva Atmosphere", atmosphere_units),
+    ("Purva Park Hill", park_hill_units), ("Smiling Willows", willows_units),
+    ("Purva Tiara", tiara_units), ("Purva Meraki", meraki_units),
+    ("Purva Blubelle", blubelle_units), ("Purva Orient Grand", orient_grand_units)
+]
+
+# Only report rows this run wrote (rejected and unchanged rows are skipped)
+written = written_records(report, db_path="real_estate_data.db")
+for project in projects:
+    op = written["projects"].get(project["project_id"])
+    if op:
+        print(f"✅ {op.capitalize()} project: {project['project_name']}")
 
-print(f"\n✅ Inserted {len(zenium_units)} units for Purva Zenium")
-print(f"✅ Inserted {len(atmosphere_units)} units for Purva Atmosphere")
-print(f"✅ Inserted {len(park_hill_units)} units for Purva Park Hill")
-print(f"✅ Inserted {len(willows_units)} units for Smiling Willows")
-print(f"✅ Inserted {len(tiara_units)} units for Purva Tiara")
-print(f"✅ Inserted {len(meraki_units)} units for Purva Meraki")
-print(f"✅ Inserted {len(blubelle_units)} units for Purva Blubelle")
-print(f"✅ Inserted {len(orient_grand_units)} units for Purva Orient Grand")
+for name, units in units_by_project:
+    count = sum(1 for unit in units if unit["unit_id"] in written["project_units"])
+    if count:
+        print(f"✅ Wrote {count} units for {name}")
 
-# Commit and close
-conn.commit()
-conn.close()
+print(f"\n⏱️  {format_sync_report(report)}")
 
-print("\n🎉 Successfully inserted all 8 Bangalore projects and their units!")
+print("\n🎉 Bangalore projects are up to date!")
 print(f"\nTotal: 8 projects, {len(all_units)} units")
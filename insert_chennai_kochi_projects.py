@@ -3,12 +3,8 @@ Insert Chennai and Kochi Projects into Database
 Adds 2 Chennai projects and 1 Kochi project
 """
 
-import sqlite3
 import json
-
-# Connect to database
-conn = sqlite3.connect("real_estate_data.db")
-cursor = conn.cursor()
+from incremental_ingest import sync_records, format_sync_report, written_records
 
 # =====================
 # PURVA WINDERMERE (Chennai)
@@ -235,15 +231,9 @@ marina_one = {
     "airport_distance": None
 }
 
-# Insert all projects
+# All projects
 projects = [purva_windermere, purva_somerset_house, marina_one]
 
-for project in projects:
-    columns = ", ".join(project.keys())
-    placeholders = ", ".join(["?" for _ in project])
-    query = f"INSERT INTO projects ({columns}) VALUES ({placeholders})"
-    cursor.execute(query, list(project.values()))
-    print(f"✅ Inserted project: {project['project_name']} ({project['city']})")
 
 # =====================
 # UNITS DATA
@@ -277,20 +267,32 @@ marina_units = [
 # Combine all units
 all_units = windermere_units + somerset_units + marina_units
 
-# Insert all units
-for unit in all_units:
-    columns = ", ".join(unit.keys())
-    placeholders = ", ".join(["?" for _ in unit])
-    query = f"INSERT INTO project_units ({columns}) VALUES ({placeholders})"
-    cursor.execute(query, list(unit.values()))
+# Apply only what changed since the last run; in-scope rows no longer listed here are deleted
+report = sync_records(projects=projects, units=all_units,
+                      scope={"tenant_id": "PURVA_DEFAULT", "city": ["Chennai", "Kochi"]},
+                      db_path="real_estate_data.db")
+for error in report["errors"]:
+    print(f"⚠️  Skipped {error}")
+
+units_by_project = [
+    ("Purva Windermere", windermere_units),
+    ("Purva Somerset House", somerset_units),
+    ("Marina One", marina_units)
+]
+
+# Only report rows this run wrote (rejected and unchanged rows are skipped)
+written = written_records(report, db_path="real_estate_data.db")
+for project in projects:
+    op = written["projects"].get(project["project_id"])
+    if op:
+        print(f"✅ {op.capitalize()} project: {project['project_name']} ({project['city']})")
 
-print(f"\n✅ Inserted {len(windermere_units)} units for Purva Windermere")
-print(f"✅ Inserted {len(somerset_units)} units for Purva Somerset House")
-print(f"✅ Inserted {len(marina_units)} units for Marina One")
+for name, units in units_by_project:
+    count = sum(1 for unit in units if unit["unit_id"] in written["project_units"])
+    if count:
+        print(f"✅ Wrote {count} units for {name}")
 
-# Commit and close
-conn.commit()
-conn.close()
+print(f"\n⏱️  {format_sync_report(report)}")
 
-print("\n🎉 Successfully inserted all Chennai and Kochi projects!")
+print("\n🎉 Chennai and Kochi projects are up to date!")
 print(f"\nTotal: 3 projects (2 Chennai + 1 Kochi), {len(all_units)} units")
@@ -3,12 +3,8 @@ Insert Pune Projects into Database
 Adds Purva Silversands, Purva Emerald Bay Ph2, and Purva Aspire
 """
 
-import sqlite3
 import json
-
-# Connect to database
-conn = sqlite3.connect("real_estate_data.db")
-cursor = conn.cursor()
+from incremental_ingest import sync_records, format_sync_report, written_records
 
 # =====================
 # PURVA SILVERSANDS
@@ -219,14 +215,8 @@ purva_aspire = {
     "airport_distance": "Pune International Airport - 22 Kms (50 mins drive)"
 }
 
-# Insert projects
+# All projects
 projects = [purva_silversands, purva_emerald_bay, purva_aspire]
-for project in projects:
-    columns = ", ".join(project.keys())
-    placeholders = ", ".join(["?" for _ in project])
-    query = f"INSERT INTO projects ({columns}) VALUES ({placeholders})"
-    cursor.execute(query, list(project.values()))
-    print(f"✅ Inserted project: {project['project_name']}")
 
 # =====================
 # UNITS DATA
@@ -415,21 +405,33 @@ aspire_units = [
     }
 ]
 
-# Insert all units
+# Apply only what changed since the last run; in-scope rows no longer listed here are deleted
 all_units = silversands_units + emerald_bay_units + aspire_units
-for unit in all_units:
-    columns = ", ".join(unit.keys())
-    placeholders = ", ".join(["?" for _ in unit])
-    query = f"INSERT INTO project_units ({columns}) VALUES ({placeholders})"
-    cursor.execute(query, list(unit.values()))
+report = sync_records(projects=projects, units=all_units,
+                      scope={"tenant_id": "PURVA_DEFAULT", "city": "Pune"},
+                      db_path="real_estate_data.db")
+for error in report["errors"]:
+    print(f"⚠️  Skipped {error}")
+
+units_by_project = [
+    ("Purva Silversands", silversands_units),
+    ("Purva Emerald Bay - Ph2", emerald_bay_units),
+    ("Purva Aspire", aspire_units)
+]
+
+# Only report rows this run wrote (rejected and unchanged rows are skipped)
+written = written_records(report, db_path="real_estate_data.db")
+for project in projects:
+    op = written["projects"].get(project["project_id"])
+    if op:
+        print(f"✅ {op.capitalize()} project: {project['project_name']}")
 
-print(f"✅ Inserted {len(silversands_units)} units for Purva Silversands")
-print(f"✅ Inserted {len(emerald_bay_units)} units for Purva Emerald Bay - Ph2")
-print(f"✅ Inserted {len(aspire_units)} units for Purva Aspire")
+for name, units in units_by_project:
+    count = sum(1 for unit in units if unit["unit_id"] in written["project_units"])
+    if count:
+        print(f"✅ Wrote {count} units for {name}")
 
-# Commit and close
-conn.commit()
-conn.close()
+print(f"\n⏱️  {format_sync_report(report)}")
 
-print("\n🎉 Successfully inserted all 3 Pune projects and their units!")
+print("\n🎉 Pune projects are up to date!")
 print(f"\nTotal: 3 projects, {len(all_units)} units")
@@ -3,15 +3,76 @@ LLM Client Module
 Handles all interactions with the OpenRouter API
 """
 
+import contextvars
+import email.utils
+import json
+import math
+import random
+import threading
+import time
 import requests
-from typing import Optional
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+from circuit_breaker import CircuitBreaker, breaker_for
+from metrics import record_hedge, record_llm_call
+from rate_limiter import LimiterRejected, Permit, limiter_for
+from tracing import KIND_CLIENT, annotate, mark_error, traced
 from config import (
     OPENROUTER_API_URL,
     OPENROUTER_API_KEY,
     API_TIMEOUT,
-    ERROR_MESSAGES
+    ERROR_MESSAGES,
+    LLM_MAX_RETRIES,
+    LLM_BACKOFF_BASE,
+    LLM_BACKOFF_CAP,
+    LLM_RETRY_BUDGET_RATIO,
+    LLM_RETRY_BUDGET_BURST,
+    LLM_REQUEST_DEADLINE,
+    LLM_QUEUE_TIMEOUT,
+    LLM_COMPLETION_TOKEN_ESTIMATE,
+    LLM_FAILOVER_CHAINS,
+    get_model_config,
+    get_stage_config,
+    LLM_HEDGE_ENABLED,
+    LLM_HEDGE_PERCENTILE,
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_HEDGE_WINDOW,
+    LLM_HEDGE_TARGET,
+    LLM_HEDGE_BUDGET_RATIO,
+    LLM_HEDGE_BUDGET_BURST,
+    AVAILABLE_MODELS
 )
 
+T = TypeVar("T")
+
+
+class LLMError(Exception):
+    """
+    Failed model call
+
+    str() is the user-facing message; kind is the failure kind reported to
+    metrics ("timeout", "connection", the HTTP status, "bad_response",
+    "deadline" or "other").
+    """
+
+    def __init__(self, message: str, kind: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.kind = kind
+        self.retry_after = retry_after  # Seconds from the server's Retry-After header
+
+    @property
+    def retryable(self) -> bool:
+        """Transient failures: rate limits, server errors, timeouts and dropped connections"""
+        return self.kind in ("timeout", "connection", "408", "429") or self.kind.startswith("5")
+
+    @property
+    def model_fault(self) -> bool:
+        """Failures of the model/provider (counted by circuit breakers), as opposed to client-side refusals"""
+        return self.kind not in ("queue_full", "queue_timeout", "deadline", "circuit_open")
+
 
 class OpenRouterLLM:
     """OpenRouter API client with error handling"""
@@ -29,24 +90,118 @@ class OpenRouterLLM:
         self.api_key = api_key or OPENROUTER_API_KEY
         self.temperature = temperature
         self.base_url = OPENROUTER_API_URL
+        self.last_usage: Dict[str, int] = {}  # usage field of the last response (prompt/completion tokens)
 
         if not self.api_key:
             raise ValueError("API key is required. Set OPENROUTER_API_KEY in environment.")
 
-    def invoke(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+    @traced("llm.chat", KIND_CLIENT)
+    def invoke(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: Optional[int] = None,
+               stop: Optional[List[str]] = None, timeout: float = API_TIMEOUT) -> str:
         """
-        Call the OpenRouter API with error handling
+        Call the OpenRouter API, retrying transient failures (see RetryPolicy)
 
         Args:
             prompt: User prompt/question
             system_prompt: Optional system instructions
+            max_tokens: Completion token cap (None: provider default)
+            stop: Stop sequences; generation ends before the first one the model emits
+            timeout: Seconds per attempt (less if the request deadline is closer)
 
         Returns:
             str: The model's response
 
         Raises:
-            Exception: For API errors with user-friendly messages
+            LLMError: With a user-friendly message once retries are exhausted
         """
+        return call_with_retries(
+            lambda attempt_timeout: self._attempt(prompt, system_prompt, max_tokens, stop, attempt_timeout),
+            self.model_id, timeout
+        )
+
+    def stream(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: Optional[int] = None,
+               stop: Optional[List[str]] = None, timeout: float = API_TIMEOUT) -> Iterator[str]:
+        """
+        Yield the completion as the model generates it (server-sent events)
+
+        Same arguments as invoke(). Retries happen before the first chunk.
+        Closing the generator early closes the connection, which stops the
+        generation; usage is then estimated from the chunks received.
+
+        Raises:
+            LLMError: Once retries are exhausted, or when the stream breaks off
+        """
+        response, started, permit = call_with_retries(
+            lambda attempt_timeout: self._open(prompt, system_prompt, max_tokens, stop, attempt_timeout, True),
+            self.model_id, timeout
+        )
+        usage = None
+        chunks = 0
+        error = None
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data: "):
+                    continue  # Event separators and keep-alive comments
+                if line == "data: [DONE]":
+                    break
+                chunk = json.loads(line[6:])
+                if "error" in chunk:
+                    error = "other"
+                    raise LLMError(f"API error: {chunk['error'].get('message', 'stream failed')}", error)
+                usage = chunk.get("usage") or usage
+                for choice in chunk.get("choices", []):
+                    content = (choice.get("delta") or {}).get("content")
+                    if content:
+                        chunks += 1
+                        yield content
+        except requests.exceptions.RequestException:
+            error = "connection"
+            raise LLMError(ERROR_MESSAGES["api_connection"], error)
+        except ValueError:
+            error = "bad_response"
+            raise LLMError("Unexpected API response format.", error)
+        finally:
+            response.close()
+            if usage is None:  # Stopped early (or the provider sent none): one token per chunk
+                prompt_tokens = estimate_tokens(prompt, system_prompt, 0)
+                usage = {"prompt_tokens": prompt_tokens, "completion_tokens": chunks,
+                         "total_tokens": prompt_tokens + chunks}
+            self.last_usage = usage
+            permit.release(usage.get("total_tokens"))
+            record_llm_call((time.perf_counter() - started) * 1000, usage, error)
+
+    def _attempt(self, prompt: str, system_prompt: Optional[str], max_tokens: Optional[int],
+                 stop: Optional[List[str]], timeout: float) -> str:
+        """One non-streaming request; every attempt is recorded in metrics and on the span"""
+        response, started, permit = self._open(prompt, system_prompt, max_tokens, stop, timeout)
+        usage = None
+        error = None
+        try:
+            result = response.json()
+            usage = result.get("usage")
+            self.last_usage = usage or {}
+            return result["choices"][0]["message"]["content"]
+
+        except (KeyError, IndexError, TypeError, ValueError):
+            error = "bad_response"
+            raise LLMError("Unexpected API response format.", error)
+        finally:
+            permit.release((usage or {}).get("total_tokens"))
+            record_llm_call((time.perf_counter() - started) * 1000, usage, error)
+            annotate_llm_span(self.model_id, usage, error)
+
+    def _open(self, prompt: str, system_prompt: Optional[str], max_tokens: Optional[int], stop: Optional[List[str]],
+              timeout: float, stream: bool = False) -> Tuple[requests.Response, float, Permit]:
+        """
+        Send one request once the model's limiter admits it; returns (response, start time, permit)
+
+        Failed requests are recorded and released here, successful ones by
+        the caller once the response has been read.
+        """
+        permit = acquire_permit(self.model_id, prompt, system_prompt, timeout, max_tokens)
+        started = time.perf_counter()
+        error = None  # "timeout", "connection", HTTP status or "other" (for metrics)
+        retry_after = None
         try:
             messages = []
 
@@ -65,44 +220,507 @@ class OpenRouterLLM:
                 "messages": messages,
                 "temperature": self.temperature
             }
+            if max_tokens is not None:
+                payload["max_tokens"] = max_tokens
+            if stop:
+                payload["stop"] = stop
+            if stream:
+                payload["stream"] = True
 
             response = requests.post(
                 self.base_url,
                 headers=headers,
                 json=payload,
-                timeout=API_TIMEOUT
+                timeout=max(0.001, timeout - permit.waited),
+                stream=stream
             )
             response.raise_for_status()
-
-            result = response.json()
-            return result["choices"][0]["message"]["content"]
+            return response, started, permit
 
         except requests.exceptions.Timeout:
-            raise Exception(ERROR_MESSAGES["api_timeout"])
+            error = "timeout"
+            raise LLMError(ERROR_MESSAGES["api_timeout"], error)
         except requests.exceptions.ConnectionError:
-            raise Exception(ERROR_MESSAGES["api_connection"])
+            error = "connection"
+            raise LLMError(ERROR_MESSAGES["api_connection"], error)
         except requests.exceptions.HTTPError as e:
+            error = str(e.response.status_code)
+            retry_after = parse_retry_after(e.response.headers.get("Retry-After"))  # Also pauses the limiter
             if e.response.status_code == 401:
-                raise Exception(ERROR_MESSAGES["invalid_api_key"])
+                raise LLMError(ERROR_MESSAGES["invalid_api_key"], error)
             elif e.response.status_code == 429:
-                raise Exception(ERROR_MESSAGES["rate_limit"])
+                raise LLMError(ERROR_MESSAGES["rate_limit"], error, retry_after)
             else:
-                raise Exception(f"API error: {str(e)}")
-        except KeyError:
-            raise Exception("Unexpected API response format.")
+                raise LLMError(f"API error: {str(e)}", error, retry_after)
         except Exception as e:
-            raise Exception(ERROR_MESSAGES["unexpected"].format(error=str(e)))
+            error = "other"
+            raise LLMError(ERROR_MESSAGES["unexpected"].format(error=str(e)), error)
+        finally:
+            if error is not None:
+                permit.release(None, retry_after)
+                record_llm_call((time.perf_counter() - started) * 1000, None, error)
+                annotate_llm_span(self.model_id, None, error)
+
+
+def estimate_tokens(prompt: str, system_prompt: Optional[str] = None, max_tokens: Optional[int] = None) -> int:
+    """Total tokens a call is expected to use (~4 characters per prompt token plus a typical completion)"""
+    completion = LLM_COMPLETION_TOKEN_ESTIMATE if max_tokens is None else min(max_tokens, LLM_COMPLETION_TOKEN_ESTIMATE)
+    return (len(prompt) + len(system_prompt or "")) // 4 + completion
+
+
+def acquire_permit(model_id: str, prompt: str, system_prompt: Optional[str], timeout: float,
+                   max_tokens: Optional[int] = None) -> Permit:
+    """
+    Wait for admission by the model's shared rate limiter (see rate_limiter.py)
+
+    Args:
+        model_id: Limiter to use
+        prompt: User prompt (for the token estimate)
+        system_prompt: System prompt (for the token estimate)
+        timeout: Seconds left for the attempt; queueing takes at most LLM_QUEUE_TIMEOUT of them
+        max_tokens: Completion token cap of the call (for the token estimate)
+
+    Raises:
+        LLMError: Kind "queue_full" or "queue_timeout" (not retried: the model is saturated)
+    """
+    try:
+        permit = limiter_for(model_id).acquire(estimate_tokens(prompt, system_prompt, max_tokens),
+                                               min(LLM_QUEUE_TIMEOUT, timeout))
+    except LimiterRejected as e:
+        record_llm_call(e.waited * 1000, None, e.kind)
+        annotate_llm_span(model_id, None, e.kind)
+        raise LLMError(ERROR_MESSAGES["overloaded"], e.kind)
+    annotate(**{"llm.queue_wait_ms": round(permit.waited * 1000, 3)})
+    return permit
+
+
+def annotate_llm_span(model_id: str, usage: Optional[Dict[str, int]], error: Optional[str]) -> None:
+    """Record model, token usage and failure kind on the current llm.chat span (no-op when not tracing)"""
+    usage = usage or {}
+    annotate(**{
+        "gen_ai.system": "openrouter",
+        "gen_ai.request.model": model_id,
+        "gen_ai.usage.input_tokens": usage.get("prompt_tokens"),
+        "gen_ai.usage.output_tokens": usage.get("completion_tokens"),
+        "error.type": error
+    })
+    if error:
+        mark_error(error)
+
+
+# =======================
+# Retries
+# =======================
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delay-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RatioBudget:
+    """
+    Allows extra calls (retries, hedges) up to a fraction of all calls
+
+    Every call deposits ratio of a token (up to burst) and every extra
+    call withdraws a whole one.
+    """
+
+    def __init__(self, ratio: float, burst: float):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = float(burst)
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        """Take one token if available"""
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, Retry-After and a retry budget
+
+    Retry n waits uniform(0, min(cap, base * 2**n)) seconds, on top of the
+    server's Retry-After when it sent one. Retries stop at max_retries,
+    when the wait would run past the request deadline, or when the
+    process-wide budget is spent: every call deposits budget_ratio of a
+    token and every retry withdraws one, so a provider outage adds at most
+    budget_ratio extra load instead of multiplying it (no retry storms).
+    """
+
+    def __init__(self, max_retries: int = LLM_MAX_RETRIES, backoff_base: float = LLM_BACKOFF_BASE,
+                 backoff_cap: float = LLM_BACKOFF_CAP, budget_ratio: float = LLM_RETRY_BUDGET_RATIO,
+                 budget_burst: float = LLM_RETRY_BUDGET_BURST):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.budget = RatioBudget(budget_ratio, budget_burst)
+
+    def backoff(self, retry: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number retry (0-based)"""
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** retry))
+        return delay + retry_after if retry_after is not None else delay
+
+    def call(self, attempt: Callable[[float], T], breaker: Optional[CircuitBreaker] = None,
+             timeout: float = API_TIMEOUT) -> T:
+        """
+        Run attempt until it succeeds or fails with a non-retryable LLMError
+
+        Args:
+            attempt: One model call, given its timeout (timeout, less if the deadline is closer)
+            breaker: The model's circuit breaker; consulted before and fed after every attempt
+            timeout: Seconds per attempt
+
+        Returns:
+            Whatever the successful attempt returned
+
+        Raises:
+            LLMError: The last attempt's error, kind "deadline" if none could start, or
+                kind "circuit_open" if the breaker refused the model
+        """
+        deadline = _deadline.get() or time.monotonic() + LLM_REQUEST_DEADLINE
+        self.budget.deposit()
+        retry = 0
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    record_llm_call(0.0, None, "deadline")
+                    raise LLMError(ERROR_MESSAGES["api_timeout"], "deadline")
+                if breaker is not None and not breaker.allow():
+                    record_llm_call(0.0, None, "circuit_open")
+                    raise LLMError(ERROR_MESSAGES["model_unavailable"], "circuit_open")
+                started = time.monotonic()
+                failed = None  # Breaker outcome; stays None if the call never reached the model
+                try:
+                    result = attempt(min(timeout, remaining))
+                    failed = False
+                    return result
+                except LLMError as e:
+                    failed = True if e.model_fault else None
+                    if not e.retryable or retry >= self.max_retries:
+                        raise
+                    delay = self.backoff(retry, e.retry_after)
+                    if time.monotonic() + delay >= deadline or not self.budget.withdraw():
+                        raise
+                finally:
+                    if breaker is not None:
+                        breaker.record(failed, time.monotonic() - started)
+                retry += 1
+                time.sleep(delay)
+        finally:
+            if retry:
+                annotate(**{"llm.retries": retry})
+
+
+_deadline: ContextVar[Optional[float]] = ContextVar("llm_deadline", default=None)
+_retry_policy = RetryPolicy()
+
+
+@contextmanager
+def llm_deadline(seconds: float) -> Iterator[None]:
+    """Share one time budget across every model call (attempts and backoff waits) in the with block"""
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def set_retry_policy(policy: Optional[RetryPolicy]) -> None:
+    """Replace the retry policy of all clients; None restores the config defaults"""
+    global _retry_policy
+    _retry_policy = policy or RetryPolicy()
+
+
+def call_with_retries(attempt: Callable[[float], T], model_id: Optional[str] = None,
+                      timeout: float = API_TIMEOUT) -> T:
+    """Run attempt(timeout) under the current retry policy and model_id's circuit breaker (used by every client)"""
+    return _retry_policy.call(attempt, breaker_for(model_id) if model_id else None, timeout)
+
+
+# =======================
+# Failover
+# =======================
+
+class FailoverLLM:
+    """
+    Tries a chain of models in order for one graph stage
+
+    A model is skipped at once when its circuit breaker is open and
+    abandoned when its call still fails after retries; the next model in
+    the chain then gets the call. Only the request deadline and
+    client-side overload ("queue_full") stop the chain early. With a hedge
+    policy set, slow calls are hedged (see HedgePolicy). Every model gets
+    the stage's max_tokens and per-attempt timeout.
+    """
+
+    def __init__(self, model_ids: List[str], temperature: float = 0.3, stage: str = "default",
+                 max_tokens: Optional[int] = None, timeout: float = API_TIMEOUT):
+        self.model_ids = model_ids
+        self.model_id = model_ids[0]
+        self.temperature = temperature
+        self.stage = stage
+        self.max_tokens = max_tokens
+        self.timeout = timeout
+        self.last_usage: Dict[str, int] = {}
+        self.model_used: Optional[str] = None  # Model that answered the last call
+
+    def invoke(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
+        """Same contract as OpenRouterLLM.invoke, answered by the first healthy model"""
+        policy = _hedge_policy
+        run = lambda model_ids: self._invoke_chain(model_ids, policy, prompt, system_prompt, kwargs)
+        if policy is None:
+            result, self.model_used, self.last_usage = run(self.model_ids)
+        else:
+            result, self.model_used, self.last_usage = policy.run(self, run)
+        if self.model_used != self.model_id:
+            annotate(**{"llm.failover.stage": self.stage, "llm.failover.model": self.model_used})
+        return result
+
+    def stream(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> Iterator[str]:
+        """
+        Same contract as OpenRouterLLM.stream; fails over until a model sends its first chunk
+
+        Streams are not hedged. Closing the generator closes the answering
+        model's stream.
+        """
+        kwargs = {"max_tokens": self.max_tokens, "timeout": self.timeout, **kwargs}
+        last_error = None
+        for model_id in self.model_ids:
+            client = create_llm_client(model_id, self.temperature)
+            chunks = client.stream(prompt, system_prompt, **kwargs)
+            try:
+                first = next(chunks, None)
+            except LLMError as e:
+                last_error = e
+                if e.kind in ("deadline", "queue_full"):
+                    raise
+                continue
+            self.model_used = model_id
+            if model_id != self.model_id:
+                annotate(**{"llm.failover.stage": self.stage, "llm.failover.model": model_id})
+            try:
+                if first is not None:
+                    yield first
+                    yield from chunks
+            finally:
+                chunks.close()
+                self.last_usage = client.last_usage
+            return
+        raise last_error
+
+    def _invoke_chain(self, model_ids: List[str], policy: Optional["HedgePolicy"], prompt: str,
+                      system_prompt: Optional[str], kwargs: dict) -> Tuple[str, str, Dict[str, int]]:
+        """(completion, answering model, its usage); may run on a hedge thread, so it leaves self alone"""
+        last_error = None
+        kwargs = {"max_tokens": self.max_tokens, "timeout": self.timeout, **kwargs}
+        for model_id in model_ids:
+            client = create_llm_client(model_id, self.temperature)
+            started = time.monotonic()
+            try:
+                result = client.invoke(prompt, system_prompt, **kwargs)
+            except LLMError as e:
+                last_error = e
+                if e.kind in ("deadline", "queue_full"):
+                    raise
+                continue
+            if policy is not None:
+                policy.observe(model_id, self.stage, time.monotonic() - started)
+            return result, model_id, client.last_usage
+        raise last_error
+
+
+def stage_model(model_id: str, stage: str, tenant_id: Optional[str] = None) -> str:
+    """The model heading a stage's chain: its configured model (see get_stage_config), else model_id"""
+    model_key = get_stage_config(stage, tenant_id)["model"]
+    return get_model_config(model_key)["id"] if model_key else model_id
+
+
+def failover_chain(model_id: str, stage: str) -> List[str]:
+    """model_id followed by the stage's LLM_FAILOVER_CHAINS models (without duplicates)"""
+    chain = [model_id]
+    for key in LLM_FAILOVER_CHAINS.get(stage, LLM_FAILOVER_CHAINS["default"]):
+        fallback = AVAILABLE_MODELS[key]["id"]
+        if fallback not in chain:
+            chain.append(fallback)
+    return chain
+
+
+# =======================
+# Hedging
+# =======================
+
+def _in_thread(fn: Callable[..., T], *args) -> "Future[T]":
+    """Run fn on a new daemon thread in a copy of the current context (metrics node, span, deadline)"""
+    future: Future = Future()
+    context = contextvars.copy_context()
+
+    def run() -> None:
+        try:
+            future.set_result(context.run(fn, *args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="llm-hedge", daemon=True).start()
+    return future
+
+
+class HedgePolicy:
+    """
+    Sends a second request when a call is slower than usual
+
+    Successful latencies are kept per (model, stage). Once min_samples are
+    known, a call still unanswered at their percentile gets a hedge: the
+    same failover chain again (target "same") or the chain without its
+    first model ("fallback"). The first answer wins; the other request is
+    abandoned (a blocking HTTP call cannot be interrupted), so its result
+    is discarded when it arrives. Hedges draw on a RatioBudget, which caps
+    the extra spend at budget_ratio of all calls.
+    """
+
+    def __init__(self, percentile: float = LLM_HEDGE_PERCENTILE, min_samples: int = LLM_HEDGE_MIN_SAMPLES,
+                 window: int = LLM_HEDGE_WINDOW, target: str = LLM_HEDGE_TARGET,
+                 budget_ratio: float = LLM_HEDGE_BUDGET_RATIO, budget_burst: float = LLM_HEDGE_BUDGET_BURST):
+        if target not in ("same", "fallback"):
+            raise ValueError(f"Unknown hedge target: {target}. Use 'same' or 'fallback'.")
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.target = target
+        self.budget = RatioBudget(budget_ratio, budget_burst)
+        self.stats = {"sent": 0, "won": 0, "denied": 0}
+        self._latencies: Dict[Tuple[str, str], deque] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model_id: str, stage: str, seconds: float) -> None:
+        """Add a successful call's latency"""
+        with self._lock:
+            latencies = self._latencies.get((model_id, stage))
+            if latencies is None:
+                latencies = self._latencies[(model_id, stage)] = deque(maxlen=self.window)
+            latencies.append(seconds)
+
+    def threshold(self, model_id: str, stage: str) -> Optional[float]:
+        """Seconds after which a call is hedged (nearest-rank percentile); None until min_samples are known"""
+        with self._lock:
+            latencies = sorted(self._latencies.get((model_id, stage), ()))
+        if len(latencies) < self.min_samples:
+            return None
+        return latencies[max(0, math.ceil(self.percentile / 100 * len(latencies)) - 1)]
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def run(self, llm: FailoverLLM, run: Callable[[List[str]], T]) -> T:
+        """
+        run(llm.model_ids), hedged with run(hedge chain) if it is slow
+
+        Args:
+            llm: The client being called (chain and stage)
+            run: Calls a chain and returns its answer
+
+        Returns:
+            The first successful answer
+
+        Raises:
+            LLMError: The original request's error when neither succeeds
+        """
+        self.budget.deposit()
+        delay = self.threshold(llm.model_id, llm.stage)
+        if delay is None:
+            return run(llm.model_ids)
+
+        original = _in_thread(run, llm.model_ids)
+        done, _ = wait([original], timeout=delay)
+        if done or not self.budget.withdraw():
+            if not done:
+                self._count("denied")
+            return original.result()
+
+        chain = llm.model_ids if self.target == "same" else (llm.model_ids[1:] or llm.model_ids)
+        hedge = _in_thread(run, chain)
+        self._count("sent")
+        pending = {original, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    won = future is hedge
+                    if won:
+                        self._count("won")
+                    record_hedge(won)
+                    annotate(**{"llm.hedge": "won" if won else "lost", "llm.hedge.after_ms": round(delay * 1000, 3)})
+                    return future.result()
+        record_hedge(False)
+        raise original.exception()
+
+
+_hedge_policy: Optional[HedgePolicy] = HedgePolicy() if LLM_HEDGE_ENABLED else None
+
+
+def set_hedge_policy(policy: Optional[HedgePolicy]) -> None:
+    """Hedge stage calls under policy; None turns hedging off"""
+    global _hedge_policy
+    _hedge_policy = policy
+
+
+# =======================
+# Client Factory
+# =======================
+
+# Replaces OpenRouterLLM in create_llm_client when set (e.g. mock_llm.FakeLLM for offline runs)
+_client_factory: Optional[Callable[..., OpenRouterLLM]] = None
+
+
+def set_llm_client_factory(factory: Optional[Callable[..., OpenRouterLLM]]) -> None:
+    """
+    Route create_llm_client() through another client class
+
+    Args:
+        factory: Called as factory(model_id=..., temperature=...); None restores OpenRouterLLM
+    """
+    global _client_factory
+    _client_factory = factory
 
 
-def create_llm_client(model_id: str, temperature: float = 0.3) -> OpenRouterLLM:
+def create_llm_client(model_id: str, temperature: float = 0.3, stage: Optional[str] = None,
+                      tenant_id: Optional[str] = None) -> OpenRouterLLM:
     """
     Factory function to create LLM client
 
     Args:
-        model_id: Model identifier
-        temperature: Generation temperature
+        model_id: Model identifier (for a stage: used unless the stage configures its own model)
+        temperature: Generation temperature (for a stage: taken from the stage settings instead)
+        stage: Graph stage ("router", "sql_gen", "response", "city_normalization"); when given, the
+            client uses the stage's settings and fails over along its chain (see FailoverLLM)
+        tenant_id: Tenant whose LLM_TENANT_STAGE_OVERRIDES apply to the stage
 
     Returns:
         OpenRouterLLM: Configured LLM client
     """
+    if stage is not None:
+        settings = get_stage_config(stage, tenant_id)
+        return FailoverLLM(failover_chain(stage_model(model_id, stage, tenant_id), stage), settings["temperature"],
+                           stage, settings["max_tokens"], settings["timeout"])
+    if _client_factory is not None:
+        return _client_factory(model_id=model_id, temperature=temperature)
     return OpenRouterLLM(model_id=model_id, temperature=temperature)
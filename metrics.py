@@ -0,0 +1,200 @@
+"""
+Metrics Module
+Per-request pipeline timings (node wall time, LLM latency, tokens, rows, cache hits) and pluggable sinks
+"""
+
+import functools
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, TypedDict
+
+
+class NodeTiming(TypedDict):
+    """Measurements of one graph node run (a retried node appears once per run)"""
+    node: str
+    wall_ms: float
+    llm_ms: float               # Time spent waiting on the model
+    llm_calls: int
+    prompt_tokens: int          # From the provider's usage field
+    completion_tokens: int
+    llm_errors: List[str]       # Failed calls: "timeout", "connection", HTTP status ("401", "429", "503"), ...
+    hedges: int                 # Hedge requests sent (see llm_client.HedgePolicy)
+    hedge_wins: int             # Hedges that answered before the original request
+    retry_count: int            # state retry_count after the node ran
+    db_ms: float                # SQLite execute + fetch (execute_sql only)
+    rows: Optional[int]         # Rows returned (execute_sql only)
+    result_cache_hit: Optional[bool]
+
+
+class RequestTimings(TypedDict):
+    """Everything measured for one ask() call"""
+    total_ms: float
+    answer_cache_hit: bool
+    llm_ms: float
+    llm_calls: int
+    prompt_tokens: int
+    completion_tokens: int
+    llm_errors: List[str]       # All nodes' failed LLM calls in order
+    hedges: int
+    hedge_wins: int
+    retries: int                # SQL attempts beyond the first
+    rows: Optional[int]         # Rows returned by the last successful query
+    result_cache_hits: int
+    nodes: List[NodeTiming]
+
+
+# Sink signature: sink(timings, labels) where labels holds model_id, tenant_id,
+# query_type and error. Sinks run synchronously after every request, so they
+# should only aggregate or enqueue.
+MetricsSink = Callable[[RequestTimings, Dict[str, Optional[str]]], None]
+
+
+# =======================
+# Collection
+# =======================
+
+class PipelineTimer:
+    """Collects NodeTimings for one request; activated with start_request()"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.nodes: List[NodeTiming] = []
+
+    def finish(self, answer_cache_hit: bool = False) -> RequestTimings:
+        """Totals over all nodes"""
+        queries = [n for n in self.nodes if n["rows"] is not None]
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "answer_cache_hit": answer_cache_hit,
+            "llm_ms": round(sum(n["llm_ms"] for n in self.nodes), 3),
+            "llm_calls": sum(n["llm_calls"] for n in self.nodes),
+            "prompt_tokens": sum(n["prompt_tokens"] for n in self.nodes),
+            "completion_tokens": sum(n["completion_tokens"] for n in self.nodes),
+            "llm_errors": [error for n in self.nodes for error in n["llm_errors"]],
+            "hedges": sum(n["hedges"] for n in self.nodes),
+            "hedge_wins": sum(n["hedge_wins"] for n in self.nodes),
+            "retries": max(0, sum(1 for n in self.nodes if n["node"] == "sql_gen") - 1),
+            "rows": queries[-1]["rows"] if queries else None,
+            "result_cache_hits": sum(1 for n in queries if n["result_cache_hit"]),
+            "nodes": self.nodes
+        }
+
+
+_active_timer: ContextVar[Optional[PipelineTimer]] = ContextVar("pipeline_timer", default=None)
+# The running node's entry; a context variable so LLM calls made on helper threads (hedges) that
+# copied the context still record to the node that issued them
+_current_node: ContextVar[Optional[NodeTiming]] = ContextVar("current_node", default=None)
+
+
+def start_request() -> PipelineTimer:
+    """Start collecting for the request running in the current context"""
+    timer = PipelineTimer()
+    _active_timer.set(timer)
+    return timer
+
+
+def end_request() -> None:
+    """Stop collecting in the current context"""
+    _active_timer.set(None)
+
+
+def timed_node(name: str, node: Callable[[dict], dict]) -> Callable[[dict], dict]:
+    """
+    Wrap a graph node so each run is recorded as a NodeTiming
+
+    Outside a request (no active timer) the node runs unmeasured.
+    """
+    @functools.wraps(node)
+    def run(state: dict) -> dict:
+        timer = _active_timer.get()
+        if timer is None:
+            return node(state)
+        entry: NodeTiming = {"node": name, "wall_ms": 0.0, "llm_ms": 0.0, "llm_calls": 0, "prompt_tokens": 0,
+                             "completion_tokens": 0, "llm_errors": [], "hedges": 0, "hedge_wins": 0, "retry_count": 0,
+                             "db_ms": 0.0, "rows": None, "result_cache_hit": None}
+        timer.nodes.append(entry)
+        token = _current_node.set(entry)
+        started = time.perf_counter()
+        try:
+            update = node(state)
+        finally:
+            entry["wall_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            _current_node.reset(token)
+        entry["retry_count"] = update.get("retry_count", state.get("retry_count", 0))
+        return update
+
+    return run
+
+
+def record_llm_call(elapsed_ms: float, usage: Optional[Dict[str, int]], error: Optional[str] = None) -> None:
+    """Add one model call (its usage field if the provider sent one, its error kind if it failed) to the running node"""
+    entry = _current_node.get()
+    if entry is None:
+        return
+    entry["llm_ms"] = round(entry["llm_ms"] + elapsed_ms, 3)
+    entry["llm_calls"] += 1
+    entry["prompt_tokens"] += (usage or {}).get("prompt_tokens", 0)
+    entry["completion_tokens"] += (usage or {}).get("completion_tokens", 0)
+    if error:
+        entry["llm_errors"].append(error)
+
+
+def record_query(rows: int, elapsed_ms: float, cached: bool) -> None:
+    """Record an executed query's row count, SQLite time and result-cache hit on the running node"""
+    entry = _current_node.get()
+    if entry is None:
+        return
+    entry["rows"] = rows
+    entry["db_ms"] = round(elapsed_ms, 3)
+    entry["result_cache_hit"] = cached
+
+
+def record_hedge(won: bool) -> None:
+    """Record a hedge request sent by the running node, and whether it answered first"""
+    entry = _current_node.get()
+    if entry is None:
+        return
+    entry["hedges"] += 1
+    entry["hedge_wins"] += int(won)
+
+
+# =======================
+# Sinks
+# =======================
+
+_sinks: List[MetricsSink] = []
+sink_errors = 0  # Exceptions raised by sinks (they never fail a request)
+
+
+def add_metrics_sink(sink: MetricsSink) -> None:
+    """Send every request's RequestTimings to sink"""
+    if sink not in _sinks:
+        _sinks.append(sink)
+
+
+def remove_metrics_sink(sink: MetricsSink) -> None:
+    """Stop sending timings to sink (no-op if it was not added)"""
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def emit(timings: RequestTimings, labels: Dict[str, Optional[str]]) -> None:
+    """Hand timings to every registered sink"""
+    global sink_errors
+    for sink in list(_sinks):
+        try:
+            sink(timings, labels)
+        except Exception:
+            sink_errors += 1
+
+
+class InMemorySink:
+    """Keeps the last max_entries (timings, labels) pairs, e.g. for tests or a debug page"""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self.entries: List[tuple] = []
+
+    def __call__(self, timings: RequestTimings, labels: Dict[str, Optional[str]]) -> None:
+        self.entries.append((timings, labels))
+        del self.entries[:-self.max_entries]
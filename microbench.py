@@ -0,0 +1,206 @@
+"""
+Micro-Benchmark Module
+Per-request database and fuzzy-matching hot paths timed at several synthetic data sizes
+"""
+
+import json
+import os
+import subprocess
+import sys
+import timeit
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, TypedDict
+
+from config import DB_PATH, MICROBENCH_SIZES, MICROBENCH_DATA_DIR, BENCHMARK_SEED
+from synthetic_data import generate_database
+
+
+class CaseStats(TypedDict):
+    """Timing of one micro-benchmark case"""
+    best_us: float       # Fastest per-call time over the repeats
+    median_us: float     # Median per-call time over the repeats
+    calls: int           # Calls per repeat (auto-ranged to MIN_REPEAT_SECONDS)
+    output_size: int     # len() of the result (rows, list items or characters)
+
+
+MIN_REPEAT_SECONDS = 0.2
+REPEATS = 5
+
+
+def time_call(fn: Callable[[], object], repeats: int = REPEATS, min_seconds: float = MIN_REPEAT_SECONDS) -> CaseStats:
+    """
+    Time fn like timeit's CLI: auto-range the call count, then repeat
+
+    Args:
+        fn: Zero-argument callable to time
+        repeats: Timed repeats (best and median are reported)
+        min_seconds: Minimum duration of one repeat
+
+    Returns:
+        CaseStats: Per-call times in microseconds
+    """
+    timer = timeit.Timer(fn)
+    calls, elapsed = timer.autorange()
+    if elapsed < min_seconds:
+        calls = max(1, int(calls * min_seconds / max(elapsed, 1e-9)))
+    times = sorted(t / calls * 1e6 for t in timer.repeat(repeat=repeats, number=calls))
+    output = fn()
+    return {
+        "best_us": round(times[0], 2),
+        "median_us": round(times[len(times) // 2], 2),
+        "calls": calls,
+        "output_size": len(output) if hasattr(output, "__len__") else 0
+    }
+
+
+# =======================
+# Cases
+# =======================
+
+# Generated-SQL shapes seen in production: a count, a filtered join
+# aggregate, a short sorted listing and a wide row fetch
+_QUERIES = {
+    "count_units": "SELECT COUNT(*) FROM project_units",
+    "avg_price_join": "SELECT AVG(u.base_price) FROM project_units u JOIN projects p ON p.project_id = u.project_id "
+                      "WHERE UPPER(REPLACE(u.configuration_type, ' ', '')) LIKE '%3BHK%' AND UPPER(p.city) LIKE '%BANGALORE%'",
+    "cheapest_listing": "SELECT p.project_name, u.configuration_type, u.base_price FROM project_units u "
+                        "JOIN projects p ON p.project_id = u.project_id ORDER BY u.base_price LIMIT 5",
+    "wide_projects": "SELECT * FROM projects LIMIT 200"
+}
+
+
+def _cases(tenant_id: str) -> List[Tuple[str, Callable[[], object]]]:
+    """(name, callable) pairs against config.DB_PATH; tenant_id is a real tenant in that database"""
+    from database import DatabaseInterface, db_interface
+    from fuzzy_matching import find_matching_developers, find_matching_projects, get_fuzzy_matching_context
+
+    # Uncached: every call executes; the shared instance shows the cache-hit path
+    uncached = DatabaseInterface(DB_PATH)
+    uncached.result_cache = None
+
+    cases = [(f"execute_query.{name}", lambda sql=sql: uncached.execute_query(sql)[0]) for name, sql in _QUERIES.items()]
+    cases += [
+        ("execute_query.cached", lambda: db_interface.execute_query(_QUERIES["avg_price_join"])[0]),
+        ("get_distinct_cities", db_interface.get_distinct_cities),
+        ("get_distinct_developers", db_interface.get_distinct_developers),
+        ("get_distinct_developers.tenant", lambda: db_interface.get_distinct_developers(tenant_id)),
+        ("get_distinct_project_names", db_interface.get_distinct_project_names),
+        ("get_distinct_project_names.tenant", lambda: db_interface.get_distinct_project_names(tenant_id)),
+        ("get_fuzzy_matching_context", get_fuzzy_matching_context),
+        ("get_fuzzy_matching_context.tenant", lambda: get_fuzzy_matching_context(tenant_id)),
+        ("find_matching_projects", lambda: find_matching_projects("zenium")),
+        ("find_matching_developers", lambda: find_matching_developers("prestige")),
+        ("get_schema", db_interface.get_schema),
+        ("get_schema.tenant", lambda: db_interface.get_schema(tenant_id))
+    ]
+
+    wide, _ = uncached.execute_query(_QUERIES["wide_projects"])
+    cases += [
+        ("json_dumps.rows", lambda: json.dumps(wide.rows, default=str)),
+        ("json_dumps.dicts", lambda: json.dumps([dict(row) for row in wide.as_dicts()], default=str))
+    ]
+    return cases
+
+
+def measure_database(only: Optional[Sequence[str]] = None) -> Dict[str, CaseStats]:
+    """
+    Run every case against config.DB_PATH in this process
+
+    Args:
+        only: Optional case-name prefixes to run (default all)
+
+    Returns:
+        dict: Case name -> CaseStats
+    """
+    import sqlite3
+
+    conn = sqlite3.connect(DB_PATH)
+    tenant_id = conn.execute(
+        "SELECT tenant_id FROM projects GROUP BY tenant_id ORDER BY COUNT(*) DESC LIMIT 1"
+    ).fetchone()[0]
+    conn.close()
+
+    results = {}
+    for name, fn in _cases(tenant_id):
+        if only and not name.startswith(tuple(only)):
+            continue
+        results[name] = time_call(fn)
+    return results
+
+
+# =======================
+# Runner
+# =======================
+
+def dataset_path(units: int, seed: int = BENCHMARK_SEED, data_dir: str = MICROBENCH_DATA_DIR) -> str:
+    """Synthetic database for a size, generated on first use and reused afterwards"""
+    path = os.path.join(data_dir, f"synthetic_{units}_{seed}.db")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        building_path = f"{path}.building"
+        if os.path.exists(building_path):
+            os.remove(building_path)
+        generate_database(building_path, units, seed=seed)
+        os.replace(building_path, path)
+    return path
+
+
+def run_micro_benchmarks(sizes: Sequence[int] = MICROBENCH_SIZES, seed: int = BENCHMARK_SEED,
+                         data_dir: str = MICROBENCH_DATA_DIR, only: Optional[Sequence[str]] = None) -> dict:
+    """
+    Time every case at each data size
+
+    Each size runs in a fresh interpreter with REAL_ESTATE_DB_PATH pointing
+    at its synthetic database, because the module-level db_interface (used
+    by fuzzy_matching) is bound to config.DB_PATH at import.
+
+    Args:
+        sizes: Unit counts to generate and measure
+        seed: Synthetic data seed
+        data_dir: Where generated databases are kept between runs
+        only: Optional case-name prefixes to run
+
+    Returns:
+        dict: {"sizes": {units: {case: CaseStats}}, "scaling": {case: largest/smallest median}}
+    """
+    script = os.path.abspath(__file__)
+    results = {}
+    for units in sizes:
+        env = dict(os.environ, REAL_ESTATE_DB_PATH=dataset_path(units, seed, data_dir))
+        completed = subprocess.run(
+            [sys.executable, script, "--measure", *(only or ())],
+            env=env, cwd=os.path.dirname(script), capture_output=True, text=True, check=True
+        )
+        results[units] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    scaling = {}
+    if len(sizes) > 1:
+        smallest, largest = results[min(sizes)], results[max(sizes)]
+        scaling = {case: round(largest[case]["median_us"] / max(smallest[case]["median_us"], 0.01), 2)
+                   for case in smallest if case in largest}
+    return {"seed": seed, "sizes": results, "scaling": scaling}
+
+
+def format_results(report: dict) -> str:
+    """Table of median per-call microseconds, one column per size"""
+    sizes = list(report["sizes"])
+    cases = list(report["sizes"][sizes[0]])
+    lines = [f"{'case':<36}" + "".join(f"{f'{units:,} units':>16}" for units in sizes) + f"{'scaling':>10}"]
+    for case in cases:
+        row = "".join(f"{report['sizes'][units][case]['median_us']:>13.1f} µs" for units in sizes)
+        lines.append(f"{case:<36}{row}{report['scaling'].get(case, 1.0):>9.1f}x")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--measure":
+        print(json.dumps(measure_database(sys.argv[2:])))
+        sys.exit(0)
+
+    # Usage: python microbench.py [size1,size2,...] [output.json]
+    sizes = [int(s.replace("_", "")) for s in sys.argv[1].split(",")] if len(sys.argv) > 1 else MICROBENCH_SIZES
+    report = run_micro_benchmarks(sizes)
+    print(format_results(report))
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Results written to {sys.argv[2]}")
@@ -0,0 +1,627 @@
+"""
+Mock LLM Module
+Offline OpenRouter stand-in: rule-based and recorded completions with injected latency and faults
+"""
+
+import difflib
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple, TypedDict
+
+from config import (
+    ROUTER_SYSTEM_PROMPT,
+    SQL_GENERATOR_SYSTEM_PROMPT,
+    RESPONSE_SYSTEM_PROMPT,
+    GENERAL_CONVERSATION_PROMPT,
+    ERROR_MESSAGES,
+    API_TIMEOUT,
+    MOCK_LLM_PORT,
+    MOCK_LLM_LATENCY_MS,
+    MOCK_LLM_MS_PER_TOKEN,
+    MOCK_LLM_JITTER
+)
+import llm_client
+from metrics import record_llm_call
+from rate_limiter import Permit
+from tracing import KIND_CLIENT, traced
+
+
+class FaultProfile(TypedDict, total=False):
+    """Latency and failure behaviour of the stand-in (missing keys use the defaults)"""
+    latency_ms: float         # Median time to first token
+    ms_per_token: float       # Generation time per completion token
+    jitter: float             # Sigma of a log-normal multiplier on latency_ms (0 = constant)
+    error_429: float          # Fraction of calls answered with 429 Too Many Requests
+    error_5xx: float          # Fraction answered with 500/502/503
+    timeout: float            # Fraction that hang for timeout_seconds and then fail
+    timeout_seconds: float    # How long a timed-out call hangs
+    retry_after: float        # Retry-After seconds sent with 429s
+    preamble: bool            # Wrap SQL in prose and a ```sql fence, like chatty/reasoning models
+    seed: int                 # Makes latencies and fault sequence reproducible
+
+
+DEFAULT_PROFILE: FaultProfile = {
+    "latency_ms": MOCK_LLM_LATENCY_MS,
+    "ms_per_token": MOCK_LLM_MS_PER_TOKEN,
+    "jitter": MOCK_LLM_JITTER,
+    "error_429": 0.0,
+    "error_5xx": 0.0,
+    "timeout": 0.0,
+    "timeout_seconds": API_TIMEOUT,
+    "retry_after": 1.0,
+    "preamble": False,
+    "seed": 0
+}
+
+
+def approx_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token, like English BPE vocabularies)"""
+    return max(1, len(text) // 4)
+
+
+def split_tokens(text: str) -> List[str]:
+    """Token-sized pieces for streaming (joined they give back text)"""
+    return re.findall(r"\S{1,4}\s*|\s+", text)
+
+
+# =======================
+# Completions
+# =======================
+
+_GREETING_RE = re.compile(r"^\s*(hi|hello|hey|bye|good (morning|evening|afternoon)|thanks?( you)?)\b[\s!.?]*$", re.I)
+_CONFIG = r"(?P<config>\d(?:\.\d)?\s*bhk)"
+_CITY = r"(?:in|at)\s+(?P<city>[a-z][a-z ]*?)"
+_END = r"\s*[?.!]*\s*$"
+
+# (pattern, SQL builder) for known question templates; first match wins
+_SQL_TEMPLATES = [
+    (re.compile(rf"how many (?:projects|properties)(?: are there)?(?: {_CITY})?{_END}", re.I),
+     lambda m: "SELECT COUNT(*) FROM projects" + _where(city=m["city"])),
+    (re.compile(rf"how many projects are (?P<status>under construction|nearing possession|ready to move|rtmi|new launch){_END}", re.I),
+     lambda m: f"SELECT COUNT(*) FROM projects WHERE UPPER(construction_status) LIKE '%{_status(m['status'])}%'"),
+    (re.compile(rf"(?:what is the )?(?:average|avg) (?:price|cost) of (?:a )?{_CONFIG}(?: units| apartments| flats)?(?: {_CITY})?{_END}", re.I),
+     lambda m: "SELECT AVG(u.base_price) FROM project_units u JOIN projects p ON p.project_id = u.project_id"
+               + _where(config=m["config"], city=m["city"], units="u", projects="p")),
+    (re.compile(rf"(?:show|list|find) (?:me )?(?:the )?cheapest {_CONFIG}(?: units| apartments| flats)?(?: {_CITY})?{_END}", re.I),
+     lambda m: "SELECT p.project_name, u.configuration_type, u.base_price FROM project_units u "
+               "JOIN projects p ON p.project_id = u.project_id"
+               + _where(config=m["config"], city=m["city"], units="u", projects="p")
+               + " ORDER BY u.base_price LIMIT 5"),
+    (re.compile(rf"(?:show|list)(?: me)?(?: all)? projects (?:by|from) (?P<developer>[a-z][a-z ]*?){_END}", re.I),
+     lambda m: "SELECT project_name, city, construction_status FROM projects "
+               f"WHERE UPPER(developer_name) LIKE '%{_literal(m['developer'])}%'"),
+    (re.compile(rf"which projects have (?:a |an )?(?P<amenity>[a-z][a-z ]*?){_END}", re.I),
+     lambda m: f"SELECT project_name, city FROM projects WHERE UPPER(amenities) LIKE '%{_literal(m['amenity'])}%'"),
+    (re.compile(rf"(?:show|list)(?: me)?(?: all)? projects {_CITY}{_END}", re.I),
+     lambda m: "SELECT project_name, developer_name, construction_status FROM projects" + _where(city=m["city"])),
+    (re.compile(rf"how many units does (?P<project>.+?) have{_END}", re.I),
+     lambda m: "SELECT COUNT(*) FROM project_units u JOIN projects p ON p.project_id = u.project_id "
+               f"WHERE UPPER(p.project_name) LIKE '%{_literal(m['project'])}%'")
+]
+
+_FALLBACK_SQL = "SELECT project_name, developer_name, city FROM projects LIMIT 10"
+
+
+def _literal(text: str) -> str:
+    """Upper-cased text safe inside a single-quoted LIKE pattern"""
+    return re.sub(r"[^A-Z0-9 .-]", "", text.strip().upper())
+
+
+def _status(text: str) -> str:
+    status = _literal(text)
+    return "RTMI" if status == "READY TO MOVE" else status
+
+
+def _where(config: Optional[str] = None, city: Optional[str] = None,
+           units: Optional[str] = None, projects: Optional[str] = None) -> str:
+    conditions = []
+    if config:
+        column = f"{units}.configuration_type" if units else "configuration_type"
+        conditions.append(f"UPPER(REPLACE({column}, ' ', '')) LIKE '%{_literal(config).replace(' ', '')}%'")
+    if city:
+        column = f"{projects}.city" if projects else "city"
+        conditions.append(f"UPPER({column}) LIKE '%{_literal(city)}%'")
+    return " WHERE " + " AND ".join(conditions) if conditions else ""
+
+
+def _field(prompt: str, label: str) -> str:
+    """Value after 'label:' on its own line in a pipeline prompt"""
+    match = re.search(rf"^{re.escape(label)}:[ \t]*(.*)$", prompt, re.M)
+    return match.group(1).strip() if match else prompt.strip()
+
+
+def recording_key(system_prompt: Optional[str], prompt: str) -> str:
+    """Lookup key of a recorded completion"""
+    return hashlib.sha1(f"{system_prompt or ''}\x00{prompt}".encode("utf-8")).hexdigest()
+
+
+def load_recordings(path: str) -> Dict[str, str]:
+    """
+    Load completions captured by RecordingLLM
+
+    Returns:
+        dict: recording_key -> completion
+    """
+    recordings = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                recordings[recording_key(entry.get("system"), entry["prompt"])] = entry["completion"]
+    return recordings
+
+
+class MockResponder:
+    """
+    Produces completions for the chatbot's prompts without a model
+
+    Recorded completions win; otherwise the pipeline stage is recognized
+    from its system prompt and answered by rules: greetings vs data for the
+    router, template-matched SQL for sql_gen, a summary of the result table
+    for the response stage and difflib for city normalization.
+    """
+
+    def __init__(self, recordings: Optional[Dict[str, str]] = None, preamble: bool = False):
+        """
+        Args:
+            recordings: Output of load_recordings()
+            preamble: Wrap generated SQL in prose and a code fence
+        """
+        self.recordings = recordings or {}
+        self.preamble = preamble
+
+    @staticmethod
+    def stage(system_prompt: Optional[str]) -> str:
+        """Pipeline stage a system prompt belongs to"""
+        system_prompt = system_prompt or ""
+        if system_prompt.startswith(SQL_GENERATOR_SYSTEM_PROMPT):
+            return "sql_gen"
+        if system_prompt == ROUTER_SYSTEM_PROMPT:
+            return "router"
+        if system_prompt == RESPONSE_SYSTEM_PROMPT:
+            return "response"
+        if system_prompt == GENERAL_CONVERSATION_PROMPT:
+            return "general"
+        if "city name normalizer" in system_prompt:
+            return "city_normalization"
+        return "unknown"
+
+    def complete(self, prompt: str, system_prompt: Optional[str] = None) -> str:
+        """Completion text for one chat request"""
+        recorded = self.recordings.get(recording_key(system_prompt, prompt))
+        if recorded is not None:
+            return recorded
+
+        stage = self.stage(system_prompt)
+        if stage == "router":
+            return "general" if _GREETING_RE.match(_field(prompt, "Current question")) else "data"
+        if stage == "sql_gen":
+            sql = generate_sql(_field(prompt, "User question"))
+            if self.preamble:
+                return (f"Let me think about which tables are needed.\n\nHere is the query:\n```sql\n{sql};\n```\n"
+                        "This query filters case-insensitively as required.")
+            return sql
+        if stage == "response":
+            return _summarize_results(prompt)
+        if stage == "city_normalization":
+            city = _field(prompt, "Input city name")
+            valid = [c.strip() for c in _field(prompt, "Valid cities").split(",") if c.strip()]
+            lowered = {c.lower(): c for c in valid}
+            match = difflib.get_close_matches(city.lower(), list(lowered), n=1, cutoff=0.6)
+            return lowered[match[0]] if match else city
+        return "Hello! I can help you explore projects, units, prices and amenities. What would you like to know?"
+
+
+def generate_sql(question: str) -> str:
+    """SQL for a question matching one of the known templates (a generic listing otherwise)"""
+    question = question.strip()
+    for pattern, build in _SQL_TEMPLATES:
+        match = pattern.match(question)
+        if match:
+            return build(match)
+    return _FALLBACK_SQL
+
+
+def _summarize_results(prompt: str) -> str:
+    """Short natural-language answer built from the compacted result table"""
+    results = prompt.split("Results:", 1)[1] if "Results:" in prompt else ""
+    results = results.split("Provide a clear", 1)[0].strip()
+    lines = [line for line in results.splitlines() if line.strip()]
+    if not lines or lines[0] == "0 rows":
+        return "I couldn't find any matching records."
+    # Skip the compactor's summary lines, then the header
+    table = [line for line in lines[1:] if not line.startswith(("empty in all rows:", "all rows:", "... "))]
+    if lines[0] == "1 row" and len(table) == 2 and "|" not in table[0]:
+        return f"The answer is {table[1]}."
+    shown = "; ".join(line.replace("|", ", ") for line in table[1:4])
+    return f"I found {lines[0]}. {shown}".strip()
+
+
+# =======================
+# Latency and Faults
+# =======================
+
+class FaultInjector:
+    """Seeded, thread-safe source of latencies and failures for one profile"""
+
+    def __init__(self, profile: Optional[FaultProfile] = None):
+        self.profile: FaultProfile = {**DEFAULT_PROFILE, **(profile or {})}
+        self._rng = random.Random(self.profile["seed"])
+        self._lock = threading.Lock()
+
+    def draw_fault(self) -> Optional[str]:
+        """None, "429", "5xx" or "timeout" for the next call"""
+        with self._lock:
+            roll = self._rng.random()
+        for fault in ("error_429", "error_5xx", "timeout"):
+            roll -= self.profile[fault]
+            if roll < 0:
+                return fault.replace("error_", "")
+        return None
+
+    def first_token_delay(self) -> float:
+        """Seconds until the first token"""
+        with self._lock:
+            multiplier = self._rng.lognormvariate(0, self.profile["jitter"]) if self.profile["jitter"] else 1.0
+        return self.profile["latency_ms"] * multiplier / 1000
+
+    def token_delay(self) -> float:
+        """Seconds per generated token"""
+        return self.profile["ms_per_token"] / 1000
+
+    def status_5xx(self) -> int:
+        with self._lock:
+            return self._rng.choice((500, 502, 503))
+
+
+def _apply_limits(text: str, max_tokens: Optional[int], stop: Optional[List[str]]) -> Tuple[str, str]:
+    """Apply stop sequences and max_tokens like the provider does; returns (text, finish_reason)"""
+    finish_reason = "stop"
+    for sequence in stop or ():
+        position = text.find(sequence)
+        if position != -1:
+            text = text[:position]
+    if max_tokens is not None:
+        tokens = split_tokens(text)
+        if len(tokens) > max_tokens:
+            text, finish_reason = "".join(tokens[:max_tokens]), "length"
+    return text, finish_reason
+
+
+# =======================
+# In-Process Client
+# =======================
+
+class FakeLLM:
+    """
+    Drop-in replacement for OpenRouterLLM that never touches the network
+
+    Sleeps for the profile's latency and raises the same LLMErrors as the
+    real client for injected faults (retried under the same policy), so the
+    graph's error handling runs as it would in production. Install with install_fake_llm().
+    """
+
+    def __init__(self, model_id: str, temperature: float = 0.3, responder: Optional[MockResponder] = None,
+                 injector: Optional[FaultInjector] = None):
+        self.model_id = model_id
+        self.temperature = temperature
+        self.injector = injector or FaultInjector()
+        self.responder = responder or MockResponder(preamble=self.injector.profile["preamble"])
+        self.last_usage: Dict[str, int] = {}
+        self.last_error: Optional[str] = None  # Injected fault of the last call, as OpenRouterLLM reports it
+
+    def _start(self, prompt: str, system_prompt: Optional[str], max_tokens: Optional[int],
+               stop: Optional[List[str]], timeout: float = API_TIMEOUT) -> Tuple[str, float, Permit]:
+        """
+        One attempt up to the first token, admitted by the model's limiter; returns (text, start time, permit)
+
+        Failed attempts are recorded and released here, successful ones by
+        the caller once generation ends.
+        """
+        permit = llm_client.acquire_permit(self.model_id, prompt, system_prompt, timeout, max_tokens)
+        started = time.perf_counter()
+        self.last_usage = {}
+        self.last_error = None
+        try:
+            fault = self.injector.draw_fault()
+            if fault == "timeout":
+                time.sleep(min(self.injector.profile["timeout_seconds"], timeout - permit.waited))
+                raise llm_client.LLMError(ERROR_MESSAGES["api_timeout"], "timeout")
+            time.sleep(self.injector.first_token_delay())
+            if fault == "429":
+                raise llm_client.LLMError(ERROR_MESSAGES["rate_limit"], "429", self.injector.profile["retry_after"])
+            if fault == "5xx":
+                status = self.injector.status_5xx()
+                raise llm_client.LLMError(f"API error: {status} Server Error (mock)", str(status))
+        except llm_client.LLMError as e:
+            self.last_error = e.kind
+            permit.release(retry_after=e.retry_after)
+            record_llm_call((time.perf_counter() - started) * 1000, None, e.kind)
+            llm_client.annotate_llm_span(self.model_id, None, e.kind)
+            raise
+
+        text, finish_reason = _apply_limits(self.responder.complete(prompt, system_prompt), max_tokens, stop)
+        prompt_tokens = approx_tokens((system_prompt or "") + prompt)
+        completion_tokens = len(split_tokens(text))
+        self.last_usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                           "total_tokens": prompt_tokens + completion_tokens}
+        return text, started, permit
+
+    @traced("llm.chat", KIND_CLIENT)
+    def invoke(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: Optional[int] = None,
+               stop: Optional[List[str]] = None, timeout: float = API_TIMEOUT) -> str:
+        """Same contract as OpenRouterLLM.invoke (including its retries)"""
+        text, started, permit = llm_client.call_with_retries(
+            lambda attempt_timeout: self._start(prompt, system_prompt, max_tokens, stop, attempt_timeout),
+            self.model_id, timeout
+        )
+        try:
+            time.sleep(self.injector.token_delay() * self.last_usage["completion_tokens"])
+            return text
+        finally:
+            permit.release(self.last_usage["total_tokens"])
+            record_llm_call((time.perf_counter() - started) * 1000, self.last_usage)
+            llm_client.annotate_llm_span(self.model_id, self.last_usage, None)
+
+    def stream(self, prompt: str, system_prompt: Optional[str] = None, max_tokens: Optional[int] = None,
+               stop: Optional[List[str]] = None, timeout: float = API_TIMEOUT) -> Iterator[str]:
+        """
+        Yield the completion token by token at the profile's generation speed (retries happen before the first)
+
+        Closing the generator early stops the generation; only the tokens
+        generated so far are counted.
+        """
+        text, started, permit = llm_client.call_with_retries(
+            lambda attempt_timeout: self._start(prompt, system_prompt, max_tokens, stop, attempt_timeout),
+            self.model_id, timeout
+        )
+        generated = 0
+        try:
+            for token in split_tokens(text):
+                time.sleep(self.injector.token_delay())
+                generated += 1
+                yield token
+        finally:
+            if generated < self.last_usage["completion_tokens"]:
+                self.last_usage = {**self.last_usage, "completion_tokens": generated,
+                                   "total_tokens": self.last_usage["prompt_tokens"] + generated}
+            permit.release(self.last_usage["total_tokens"])
+            record_llm_call((time.perf_counter() - started) * 1000, self.last_usage)
+
+
+class RecordingLLM:
+    """Wraps a real client and appends every completion to a JSONL file for later replay"""
+
+    _lock = threading.Lock()
+
+    def __init__(self, inner, path: str):
+        self.inner = inner
+        self.path = path
+        self.model_id = inner.model_id
+
+    def invoke(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
+        completion = self.inner.invoke(prompt, system_prompt, **kwargs)
+        self._record(system_prompt, prompt, completion)
+        return completion
+
+    def stream(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> Iterator[str]:
+        """Pass the inner client's chunks through; records what was read once the stream ends or is closed"""
+        inner = self.inner.stream(prompt, system_prompt, **kwargs)
+        chunks = []
+        try:
+            for chunk in inner:
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            inner.close()
+            self._record(system_prompt, prompt, "".join(chunks))
+
+    @property
+    def last_usage(self) -> Dict[str, int]:
+        """Usage of the inner client's last call"""
+        return self.inner.last_usage
+
+    def _record(self, system_prompt: Optional[str], prompt: str, completion: str) -> None:
+        entry = {"model": self.model_id, "system": system_prompt, "prompt": prompt, "completion": completion}
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+def install_fake_llm(profile: Optional[FaultProfile] = None, recordings: Optional[Dict[str, str]] = None) -> FaultInjector:
+    """
+    Make create_llm_client() return FakeLLM instances sharing one profile
+
+    Args:
+        profile: Latency/fault settings (merged over DEFAULT_PROFILE)
+        recordings: Recorded completions to replay (see load_recordings)
+
+    Returns:
+        FaultInjector: The shared injector (its profile can be changed between runs)
+    """
+    injector = FaultInjector(profile)
+    responder = MockResponder(recordings, preamble=injector.profile["preamble"])
+    llm_client.set_llm_client_factory(
+        lambda model_id, temperature=0.3: FakeLLM(model_id, temperature, responder, injector)
+    )
+    return injector
+
+
+def uninstall_fake_llm() -> None:
+    """Restore the real OpenRouter client"""
+    llm_client.set_llm_client_factory(None)
+
+
+# =======================
+# HTTP Server
+# =======================
+
+class _Handler(BaseHTTPRequestHandler):
+    """OpenAI/OpenRouter chat-completions endpoint"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args) -> None:
+        pass  # Keep load tests quiet
+
+    def _send_json(self, status: int, body: dict, headers: Optional[Dict[str, str]] = None) -> None:
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self) -> None:
+        mock: MockOpenRouterServer = self.server.mock
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found"}})
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.headers.get("Authorization", "").startswith("Bearer "):
+            mock.count("401")
+            self._send_json(401, {"error": {"code": 401, "message": "No auth credentials found"}})
+            return
+
+        messages = body.get("messages", [])
+        system_prompt = next((m["content"] for m in messages if m.get("role") == "system"), None)
+        prompt = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+
+        fault = mock.injector.draw_fault()
+        if fault == "timeout":
+            mock.count("timeout")
+            time.sleep(mock.injector.profile["timeout_seconds"])
+            self.close_connection = True
+            return
+        time.sleep(mock.injector.first_token_delay())
+        if fault == "429":
+            mock.count("429")
+            self._send_json(429, {"error": {"code": 429, "message": "Rate limit exceeded"}},
+                            {"Retry-After": f"{mock.injector.profile['retry_after']:g}"})
+            return
+        if fault == "5xx":
+            status = mock.injector.status_5xx()
+            mock.count(str(status))
+            self._send_json(status, {"error": {"code": status, "message": "Upstream error (mock)"}})
+            return
+
+        text, finish_reason = _apply_limits(mock.responder.complete(prompt, system_prompt),
+                                            body.get("max_tokens"), body.get("stop"))
+        tokens = split_tokens(text)
+        prompt_tokens = approx_tokens((system_prompt or "") + prompt)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens),
+                 "total_tokens": prompt_tokens + len(tokens)}
+        base = {"id": f"mock-{mock.count('ok')}", "created": int(time.time()), "model": body.get("model", "mock")}
+
+        if not body.get("stream"):
+            time.sleep(mock.injector.token_delay() * len(tokens))
+            self._send_json(200, {**base, "object": "chat.completion", "usage": usage, "choices": [
+                {"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": finish_reason}
+            ]})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.close_connection = True  # No Content-Length: the stream ends when the connection does
+        self.end_headers()
+        try:
+            for i, token in enumerate(tokens):
+                time.sleep(mock.injector.token_delay())
+                chunk = {**base, "object": "chat.completion.chunk", "choices": [
+                    {"index": 0, "delta": {"content": token}, "finish_reason": None}
+                ]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            final = {**base, "object": "chat.completion.chunk", "usage": usage,
+                     "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}]}
+            self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            mock.count("cancelled")  # Client stopped reading (early termination)
+
+
+class MockOpenRouterServer:
+    """
+    Local OpenRouter-compatible HTTP server
+
+    Point the real client at it with OPENROUTER_API_URL=<server.url> (any
+    API key is accepted). Supports max_tokens, stop and stream=true (SSE).
+    Use as a context manager or call start()/stop().
+    """
+
+    def __init__(self, profile: Optional[FaultProfile] = None, host: str = "127.0.0.1", port: int = MOCK_LLM_PORT,
+                 recordings: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            profile: Latency/fault settings (merged over DEFAULT_PROFILE)
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+            recordings: Recorded completions to replay (see load_recordings)
+        """
+        self.injector = FaultInjector(profile)
+        self.responder = MockResponder(recordings, preamble=self.injector.profile["preamble"])
+        self.stats: Dict[str, int] = {}
+        self._stats_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/api/v1/chat/completions"
+
+    def count(self, outcome: str) -> int:
+        """Increment an outcome counter and return its new value"""
+        with self._stats_lock:
+            self.stats[outcome] = self.stats.get(outcome, 0) + 1
+            return self.stats[outcome]
+
+    def start(self) -> "MockOpenRouterServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-openrouter", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockOpenRouterServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+
+if __name__ == "__main__":
+    import sys
+
+    # python mock_llm.py [port] [key=value ...]   e.g. error_429=0.05 latency_ms=800
+    port = int(sys.argv[1]) if len(sys.argv) > 1 and sys.argv[1].isdigit() else MOCK_LLM_PORT
+    profile: FaultProfile = {}
+    for argument in sys.argv[1:]:
+        if "=" in argument:
+            key, value = argument.split("=", 1)
+            if key not in DEFAULT_PROFILE:
+                print(f"Unknown setting: {key}. Available: {list(DEFAULT_PROFILE)}")
+                sys.exit(1)
+            if key == "preamble":
+                profile[key] = value.lower() in ("1", "true", "yes")
+            else:
+                profile[key] = int(value) if key == "seed" else float(value)
+
+    server = MockOpenRouterServer(profile, port=port)
+    print(f"🤖 Mock OpenRouter listening on {server.url}")
+    print(f"   export OPENROUTER_API_URL={server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 {server.stats}")
@@ -13,11 +13,20 @@ Install: pip install fastapi uvicorn
 Run: uvicorn production_example:app --reload
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Optional
 from chatbot_core import create_chatbot
 from config import AVAILABLE_MODELS
+from database import db_interface
+from metrics import add_metrics_sink
+from prometheus_metrics import (
+    CONTENT_TYPE, IN_FLIGHT, LLM_CIRCUIT_STATE, LLM_IN_FLIGHT, LLM_QUEUE_DEPTH, REGISTRY, RESULT_CACHE_HIT_RATIO,
+    prometheus_sink
+)
+from circuit_breaker import STATE_VALUES, breaker_states
+from rate_limiter import in_flight_calls, queue_depths
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -29,6 +38,14 @@ app = FastAPI(
 # Initialize chatbot (do this once at startup)
 chatbot_instances = {}
 
+# Every ask() feeds the /metrics registry
+add_metrics_sink(prometheus_sink)
+if db_interface.result_cache is not None:
+    RESULT_CACHE_HIT_RATIO.set_function(lambda: db_interface.result_cache.stats()["hit_ratio"])
+LLM_QUEUE_DEPTH.set_function(lambda: {(model,): depth for model, depth in queue_depths().items()})
+LLM_IN_FLIGHT.set_function(lambda: {(model,): calls for model, calls in in_flight_calls().items()})
+LLM_CIRCUIT_STATE.set_function(lambda: {(model,): STATE_VALUES[state] for model, state in breaker_states().items()})
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize chatbots on startup"""
@@ -76,11 +93,14 @@ async def chat_endpoint(request: ChatRequest):
         # Get chatbot instance
         chatbot = chatbot_instances[request.model]
 
-        # Get response
-        response = chatbot.ask(
-            question=request.question,
-            preserve_history=request.preserve_history
-        )
+        # Get response (ask() blocks, so it runs in the threadpool and the event
+        # loop keeps serving other requests and /metrics meanwhile)
+        with IN_FLIGHT.track_in_progress():
+            response = await run_in_threadpool(
+                chatbot.ask,
+                question=request.question,
+                preserve_history=request.preserve_history
+            )
 
         # Return formatted response
         return ChatResponse(
@@ -129,6 +149,12 @@ async def health_check():
     }
 
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus scrape endpoint (latency histograms, LLM errors, retries, cache hits, in-flight)"""
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 # ============================================================================
 # EXAMPLE 2: Flask REST API
 # ============================================================================
@@ -0,0 +1,223 @@
+"""
+Profiler Module
+Opt-in wall-clock stack sampling of ask() requests, stored per trace id and folded for flame graphs
+"""
+
+import glob
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, TypedDict
+
+from config import PROFILE_SAMPLE_RATE, PROFILE_INTERVAL_MS, PROFILE_DIR, PROFILE_MAX_FILES
+
+
+class RequestProfile(TypedDict):
+    """One profiled request as stored in PROFILE_DIR/<trace_id>.json"""
+    trace_id: str
+    started_at: str
+    wall_ms: float
+    cpu_ms: float                 # CPU time of the request thread (wall - cpu = waiting: network, locks, sleep)
+    interval_ms: float
+    samples: int
+    stacks: Dict[str, int]        # Folded stack (root;...;leaf) -> samples
+    metadata: Dict[str, Optional[str]]
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Samples one thread's Python stack every interval from a background thread
+
+    Wall-clock sampling: a request blocked on a socket is sampled inside
+    the socket call, so time waiting on the LLM shows up as such instead of
+    disappearing as it does with CPU profilers. Stacks are cut at root_frame
+    so only frames below ask() are kept.
+    """
+
+    def __init__(self, thread_id: int, root_frame, interval_ms: float = PROFILE_INTERVAL_MS):
+        self.thread_id = thread_id
+        self.root_frame = root_frame
+        self.interval = interval_ms / 1000
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                if frame is self.root_frame:
+                    break
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+
+# =======================
+# Request Profiling
+# =======================
+
+_sample_rate = PROFILE_SAMPLE_RATE
+_directory = PROFILE_DIR
+
+
+def configure_profiling(sample_rate: Optional[float] = None, directory: Optional[str] = None) -> None:
+    """
+    Change the profiling rate and/or where profiles are written
+
+    Args:
+        sample_rate: Fraction of questions profiled (0 disables, 1 profiles all)
+        directory: Destination directory (defaults to PROFILE_DIR)
+    """
+    global _sample_rate, _directory
+    if sample_rate is not None:
+        _sample_rate = sample_rate
+    if directory is not None:
+        _directory = directory
+
+
+def should_profile(force: Optional[bool] = None) -> bool:
+    """force if given, else a draw at the configured sample rate"""
+    if force is not None:
+        return force
+    return _sample_rate > 0 and random.random() < _sample_rate
+
+
+@contextmanager
+def profile_request(trace_id: str, interval_ms: float = PROFILE_INTERVAL_MS,
+                    **metadata: Optional[str]) -> Iterator[Dict[str, Optional[str]]]:
+    """
+    Sample the calling thread for the duration of the with block
+
+    Yields a dict whose "path" is set to the written profile on exit.
+    Stacks start at the function containing the with statement. Writing
+    errors are swallowed: profiling never fails a request.
+
+    Args:
+        trace_id: Names the file (same id as the question's trace)
+        interval_ms: Sampling interval
+        **metadata: Stored with the profile (question, model, tenant, ...)
+    """
+    result: Dict[str, Optional[str]] = {"path": None}
+    # Frames: this generator <- contextmanager.__enter__ <- the with statement's function
+    sampler = StackSampler(threading.get_ident(), sys._getframe(2), interval_ms).start()
+    started_at = datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+    wall_started, cpu_started = time.perf_counter(), time.thread_time()
+    try:
+        yield result
+    finally:
+        cpu_ms = (time.thread_time() - cpu_started) * 1000
+        wall_ms = (time.perf_counter() - wall_started) * 1000
+        stacks = sampler.stop()
+        profile: RequestProfile = {
+            "trace_id": trace_id,
+            "started_at": started_at,
+            "wall_ms": round(wall_ms, 3),
+            "cpu_ms": round(cpu_ms, 3),
+            "interval_ms": interval_ms,
+            "samples": sum(stacks.values()),
+            "stacks": dict(stacks),
+            "metadata": metadata
+        }
+        try:
+            result["path"] = save_profile(profile, _directory)
+        except OSError:
+            pass
+
+
+def save_profile(profile: RequestProfile, directory: str = PROFILE_DIR) -> str:
+    """Write a profile as <trace_id>.json and prune the oldest beyond PROFILE_MAX_FILES"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{profile['trace_id']}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f)
+
+    existing = glob.glob(os.path.join(directory, "*.json"))
+    if len(existing) > PROFILE_MAX_FILES:
+        existing.sort(key=os.path.getmtime)
+        for old in existing[:len(existing) - PROFILE_MAX_FILES]:
+            os.remove(old)
+    return path
+
+
+# =======================
+# Aggregation
+# =======================
+
+def load_profiles(paths: Iterable[str]) -> List[RequestProfile]:
+    """Profiles from files and/or directories of profile files"""
+    profiles = []
+    for path in paths:
+        files = sorted(glob.glob(os.path.join(path, "*.json"))) if os.path.isdir(path) else [path]
+        for file in files:
+            with open(file, encoding="utf-8") as f:
+                profiles.append(json.load(f))
+    return profiles
+
+
+def aggregate(profiles: Iterable[RequestProfile], min_wall_ms: float = 0.0) -> Counter:
+    """
+    Merge folded stacks across profiles
+
+    Counts are converted to milliseconds (samples x interval), so profiles
+    taken at different intervals add up correctly.
+
+    Args:
+        profiles: Loaded profiles
+        min_wall_ms: Only include requests at least this slow
+
+    Returns:
+        Counter: Folded stack -> milliseconds
+    """
+    merged: Counter = Counter()
+    for profile in profiles:
+        if profile["wall_ms"] < min_wall_ms:
+            continue
+        for stack, count in profile["stacks"].items():
+            merged[stack] += count * profile["interval_ms"]
+    return merged
+
+
+def format_folded(stacks: Counter) -> str:
+    """Brendan Gregg's folded format (flamegraph.pl, speedscope, inferno): "a;b;c 42" per line"""
+    return "".join(f"{stack} {round(value)}\n" for stack, value in sorted(stacks.items()) if round(value) > 0)
+
+
+if __name__ == "__main__":
+    # Usage: python profiler.py [profile files or directories...] [--min-ms N] > requests.folded
+    args = sys.argv[1:]
+    min_ms = 0.0
+    if "--min-ms" in args:
+        index = args.index("--min-ms")
+        min_ms = float(args[index + 1])
+        del args[index:index + 2]
+
+    profiles = [p for p in load_profiles(args or [PROFILE_DIR]) if p["wall_ms"] >= min_ms]
+    sys.stdout.write(format_folded(aggregate(profiles)))
+
+    wall = sum(p["wall_ms"] for p in profiles)
+    cpu = sum(p["cpu_ms"] for p in profiles)
+    print(f"📊 {len(profiles)} profiles, {wall / 1000:.1f}s wall, {cpu / 1000:.1f}s CPU in the request thread "
+          f"({(wall - cpu) / wall * 100 if wall else 0:.0f}% waiting)", file=sys.stderr)
@@ -0,0 +1,277 @@
+"""
+Prometheus Metrics Module
+Dependency-free in-process counters, gauges and histograms in the Prometheus text format
+"""
+
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from config import METRICS_LATENCY_BUCKETS, METRICS_SQL_BUCKETS
+from metrics import RequestTimings
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Shared label handling; each labelled child is created on first use"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    """Monotonic count, optionally per label set"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self._header() + [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                                 for key, value in values]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down; may instead be read from a function at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._function: Optional[Callable[[], Union[float, Dict[Tuple[str, ...], float]]]] = None
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], Union[float, Dict[Tuple[str, ...], float]]]) -> None:
+        """Report function() at every scrape: a number, or {label values tuple: number} for labelled gauges"""
+        self._function = function
+
+    @contextmanager
+    def track_in_progress(self, **labels: str) -> Iterator[None]:
+        """Increment for the duration of the with block"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def value(self, **labels: str) -> float:
+        if self._function is not None:
+            result = self._function()
+            return result.get(self._key(labels), 0) if isinstance(result, dict) else result
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        if self._function is not None:
+            try:
+                result = self._function()
+                values = sorted(result.items()) if isinstance(result, dict) else [((), result)]
+            except Exception:
+                values = []
+        else:
+            with self._lock:
+                values = sorted(self._values.items())
+        return self._header() + [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                                 for key, value in values]
+
+
+class Histogram(_Metric):
+    """
+    Fixed-bucket histogram
+
+    observe() is a bisect plus two additions under a lock; cumulative
+    bucket counts are only computed when the registry is scraped.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = METRICS_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], list] = {}  # key -> [per-bucket counts (+Inf last), sum]
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            snapshot = sorted((key, list(counts), total) for key, (counts, total) in self._series.items())
+        lines = self._header()
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Ordered collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# =======================
+# Chatbot Metrics
+# =======================
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    "chatbot_request_duration_seconds", "Time to answer one question", ["model"]))
+NODE_LATENCY = REGISTRY.register(Histogram(
+    "chatbot_node_duration_seconds", "Wall time of one graph node run", ["node"]))
+LLM_LATENCY = REGISTRY.register(Histogram(
+    "chatbot_llm_duration_seconds", "Time spent waiting on the model per node run", ["node"]))
+SQL_EXECUTION = REGISTRY.register(Histogram(
+    "chatbot_sql_execution_seconds", "SQLite execute + fetch time of generated queries (cache misses)",
+    buckets=METRICS_SQL_BUCKETS))
+REQUESTS = REGISTRY.register(Counter(
+    "chatbot_requests_total", "Questions answered", ["model", "query_type", "outcome"]))
+LLM_ERRORS = REGISTRY.register(Counter(
+    "chatbot_llm_errors_total", "Failed LLM calls by HTTP status or failure kind", ["status"]))
+LLM_HEDGES = REGISTRY.register(Counter(
+    "chatbot_llm_hedges_total", "Hedge requests sent for slow LLM calls, by whether they answered first", ["result"]))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "chatbot_llm_tokens_total", "Tokens reported by the provider", ["model", "kind"]))
+SQL_ATTEMPTS = REGISTRY.register(Counter(
+    "chatbot_sql_attempts_total", "SQL generations (first attempts plus retries)"))
+SQL_RETRIES = REGISTRY.register(Counter(
+    "chatbot_sql_retries_total", "SQL generations that were retries (retry rate = retries / attempts)"))
+RESULT_CACHE_LOOKUPS = REGISTRY.register(Counter(
+    "chatbot_result_cache_lookups_total", "Executed-result cache lookups by generated queries", ["result"]))
+RESULT_CACHE_HIT_RATIO = REGISTRY.register(Gauge(
+    "chatbot_result_cache_hit_ratio", "Lifetime hit ratio of the executed-result cache"))
+ANSWER_CACHE_HITS = REGISTRY.register(Counter(
+    "chatbot_answer_cache_hits_total", "Questions answered from the final-answer cache"))
+IN_FLIGHT = REGISTRY.register(Gauge(
+    "chatbot_in_flight_requests", "Questions currently being answered"))
+LLM_QUEUE_DEPTH = REGISTRY.register(Gauge(
+    "chatbot_llm_queue_depth", "LLM calls waiting for the model's rate limiter", ["model"]))
+LLM_IN_FLIGHT = REGISTRY.register(Gauge(
+    "chatbot_llm_in_flight_calls", "LLM calls admitted by the model's rate limiter and not finished", ["model"]))
+LLM_CIRCUIT_STATE = REGISTRY.register(Gauge(
+    "chatbot_llm_circuit_state", "Circuit breaker per model (0 closed, 1 half-open, 2 open)", ["model"]))
+
+
+def prometheus_sink(timings: RequestTimings, labels: Dict[str, Optional[str]]) -> None:
+    """
+    Metrics sink feeding REGISTRY (register with metrics.add_metrics_sink)
+
+    Costs a few microseconds per request: one histogram observation per
+    node run plus a handful of counter increments.
+    """
+    model = labels.get("model_id") or "unknown"
+    outcome = "cached" if timings["answer_cache_hit"] else ("error" if labels.get("error") else "ok")
+    REQUEST_LATENCY.observe(timings["total_ms"] / 1000, model=model)
+    REQUESTS.inc(model=model, query_type=labels.get("query_type") or "unknown", outcome=outcome)
+    if timings["answer_cache_hit"]:
+        ANSWER_CACHE_HITS.inc()
+
+    for node in timings["nodes"]:
+        NODE_LATENCY.observe(node["wall_ms"] / 1000, node=node["node"])
+        if node["llm_calls"]:
+            LLM_LATENCY.observe(node["llm_ms"] / 1000, node=node["node"])
+        if node["node"] == "sql_gen":
+            SQL_ATTEMPTS.inc()
+        if node["result_cache_hit"] is not None:
+            RESULT_CACHE_LOOKUPS.inc(result="hit" if node["result_cache_hit"] else "miss")
+            if not node["result_cache_hit"]:
+                SQL_EXECUTION.observe(node["db_ms"] / 1000)
+
+    if timings["retries"]:
+        SQL_RETRIES.inc(timings["retries"])
+    for error in timings["llm_errors"]:
+        LLM_ERRORS.inc(status=error)
+    if timings["hedges"]:
+        LLM_HEDGES.inc(timings["hedge_wins"], result="won")
+        LLM_HEDGES.inc(timings["hedges"] - timings["hedge_wins"], result="lost")
+    if timings["prompt_tokens"]:
+        LLM_TOKENS.inc(timings["prompt_tokens"], model=model, kind="prompt")
+    if timings["completion_tokens"]:
+        LLM_TOKENS.inc(timings["completion_tokens"], model=model, kind="completion")
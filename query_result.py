@@ -0,0 +1,173 @@
+"""
+Query Result Module
+Column-aware result type returned by DatabaseInterface.execute_query
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from collections.abc import Mapping
+
+try:
+    import numpy as np
+except ImportError:  # Optional - only needed for to_columns(numpy=True)
+    np = None
+
+try:
+    import pyarrow as pa
+except ImportError:  # Optional - only needed for to_arrow()
+    pa = None
+
+
+class RowView(Mapping):
+    """Read-only dict view over one result row (no copy of the row values)"""
+
+    __slots__ = ("_index", "_row")
+
+    def __init__(self, index: Dict[str, int], row: Tuple):
+        self._index = index
+        self._row = row
+
+    def __getitem__(self, column: str) -> Any:
+        return self._row[self._index[column]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class QueryResult:
+    """
+    Rows plus column metadata for one executed query
+
+    Behaves like the list of tuples execute_query used to return
+    (len(), iteration, indexing, truthiness), so existing callers keep working.
+    """
+
+    __slots__ = ("description", "rows", "row_count", "truncated", "elapsed_ms", "cached", "_index")
+
+    def __init__(self, description: Optional[Sequence[tuple]] = None, rows: Optional[List[Tuple]] = None,
+                 truncated: bool = False, elapsed_ms: float = 0.0, cached: bool = False):
+        """
+        Args:
+            description: cursor.description (7-tuples whose first item is the column name)
+            rows: Result rows as returned by fetchall()/fetchmany()
+            truncated: True if more rows were available than were fetched
+            elapsed_ms: Time spent executing and fetching
+            cached: True if the result was served from the result cache
+        """
+        self.description = tuple(description or ())
+        self.rows = rows if rows is not None else []
+        self.row_count = len(self.rows)
+        self.truncated = truncated
+        self.elapsed_ms = elapsed_ms
+        self.cached = cached
+        self._index = None
+
+    def as_cached(self) -> "QueryResult":
+        """Shallow copy marked as served from cache (rows are shared, not copied)"""
+        return QueryResult(self.description, self.rows, self.truncated, self.elapsed_ms, cached=True)
+
+    # -- list-of-tuples compatibility --
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def __iter__(self) -> Iterator[Tuple]:
+        return iter(self.rows)
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+    def __bool__(self) -> bool:
+        return self.row_count > 0
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, QueryResult):
+            return self.columns == other.columns and self.rows == other.rows
+        return self.rows == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"QueryResult(columns={self.columns}, row_count={self.row_count}, truncated={self.truncated})"
+
+    # -- column metadata --
+
+    @property
+    def columns(self) -> List[str]:
+        """Column names in select order"""
+        return [column[0] for column in self.description]
+
+    def column_index(self) -> Dict[str, int]:
+        """Column name -> position (built once, shared by all row views)"""
+        if self._index is None:
+            self._index = {name: i for i, name in enumerate(self.columns)}
+        return self._index
+
+    def column_types(self) -> Dict[str, str]:
+        """
+        Infer a type per column from its non-null values
+
+        Returns:
+            dict: Column names mapped to "integer", "real", "text", "blob" or "null"
+        """
+        types = {}
+        for i, name in enumerate(self.columns):
+            kinds = {type(row[i]) for row in self.rows if row[i] is not None}
+            if not kinds:
+                types[name] = "null"
+            elif kinds <= {int, bool}:
+                types[name] = "integer"
+            elif kinds <= {int, bool, float}:
+                types[name] = "real"
+            elif kinds <= {bytes}:
+                types[name] = "blob"
+            else:
+                types[name] = "text"
+        return types
+
+    # -- alternative layouts --
+
+    def as_dicts(self) -> Iterator[RowView]:
+        """Iterate rows as read-only dict views without copying row values"""
+        index = self.column_index()
+        return (RowView(index, row) for row in self.rows)
+
+    def to_columns(self, numpy: bool = True) -> Dict[str, Any]:
+        """
+        Columnar layout of the result
+
+        Args:
+            numpy: Use NumPy arrays for numeric columns when NumPy is installed
+                   (integer columns with NULLs become float64 with NaN)
+
+        Returns:
+            dict: Column names mapped to lists (or NumPy arrays)
+        """
+        columns = dict(zip(self.columns, (list(values) for values in zip(*self.rows)))) if self.rows \
+            else {name: [] for name in self.columns}
+
+        if numpy and np is not None:
+            for name, kind in self.column_types().items():
+                values = columns[name]
+                if kind == "integer" and None not in values:
+                    columns[name] = np.array(values, dtype=np.int64)
+                elif kind in ("integer", "real"):
+                    columns[name] = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+        return columns
+
+    def to_arrow(self):
+        """
+        Export as a pyarrow.Table
+
+        Raises:
+            ImportError: If pyarrow is not installed
+        """
+        if pa is None:
+            raise ImportError("pyarrow is required for to_arrow(). Install it with: pip install pyarrow")
+        return pa.Table.from_pydict(self.to_columns(numpy=False))
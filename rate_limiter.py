@@ -0,0 +1,211 @@
+"""
+Rate Limiter Module
+Per-model token buckets (requests/s, tokens/min), in-flight caps and a bounded wait queue shared by all LLM clients
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from config import LLM_RATE_LIMITS, LLM_QUEUE_MAX, LLM_QUEUE_TIMEOUT
+
+
+class LimiterRejected(Exception):
+    """A call was not admitted: kind is "queue_full" (fast fail) or "queue_timeout" """
+
+    def __init__(self, kind: str, waited: float = 0.0):
+        super().__init__(f"LLM call rejected by the rate limiter ({kind})")
+        self.kind = kind
+        self.waited = waited
+
+
+class TokenBucket:
+    """
+    Refills at rate tokens per second up to capacity
+
+    Not locked: ModelLimiter guards every bucket with its own condition.
+    The balance may go negative when a call turns out to use more tokens
+    than estimated; later calls then wait for the debt to refill.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount tokens are available (0 if they are now)"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        missing = min(amount, self.capacity) - self.tokens
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        self.tokens -= amount
+
+
+class Permit:
+    """Admission of one call; release() exactly once when the call ends"""
+
+    def __init__(self, limiter: "ModelLimiter", tokens: int, waited: float):
+        self.limiter = limiter
+        self.tokens = tokens
+        self.waited = waited  # Seconds spent queued
+        self._released = False
+
+    def release(self, used_tokens: Optional[int] = None, retry_after: Optional[float] = None) -> None:
+        """
+        Free the in-flight slot
+
+        Args:
+            used_tokens: Actual total tokens (corrects the tokens-per-minute estimate)
+            retry_after: The provider asked to back off; pauses the whole model for that long
+        """
+        if not self._released:
+            self._released = True
+            self.limiter._release(self, used_tokens, retry_after)
+
+
+class ModelLimiter:
+    """
+    Admission control for one model id
+
+    A call is admitted when an in-flight slot is free and both buckets hold
+    enough tokens; otherwise it waits in a FIFO queue of at most max_queue
+    callers. A full queue fails immediately and a caller still waiting at
+    its timeout gives up, so overload turns into fast, clear errors instead
+    of piles of 429s.
+    """
+
+    def __init__(self, requests_per_second: Optional[float] = None, tokens_per_minute: Optional[float] = None,
+                 max_in_flight: Optional[int] = None, max_queue: int = LLM_QUEUE_MAX):
+        """
+        Args:
+            requests_per_second: Request rate (bursts up to one second's worth); None disables
+            tokens_per_minute: Estimated token rate (bursts up to one minute's worth); None disables
+            max_in_flight: Concurrent calls; None disables
+            max_queue: Callers allowed to wait; further callers are rejected at once
+        """
+        self.requests = TokenBucket(requests_per_second, max(1.0, requests_per_second)) if requests_per_second else None
+        self.tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute) if tokens_per_minute else None
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self.blocked_until = 0.0
+        self.rejected: Dict[str, int] = {"queue_full": 0, "queue_timeout": 0}
+        self._waiters: deque = deque()
+        self._condition = threading.Condition()
+
+    @property
+    def queued(self) -> int:
+        """Callers currently waiting for admission"""
+        return len(self._waiters)
+
+    def _wait_time(self, tokens: int, now: float) -> Optional[float]:
+        """Seconds until a call could be admitted; None while every in-flight slot is taken"""
+        if self.max_in_flight is not None and self.in_flight >= self.max_in_flight:
+            return None
+        wait = self.blocked_until - now
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(tokens, now))
+        return wait
+
+    def _admit(self, tokens: int, started: float) -> Permit:
+        self.in_flight += 1
+        if self.requests is not None:
+            self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(tokens)
+        return Permit(self, tokens, time.monotonic() - started)
+
+    def acquire(self, tokens: int = 0, timeout: float = LLM_QUEUE_TIMEOUT) -> Permit:
+        """
+        Wait for admission
+
+        Args:
+            tokens: Estimated total tokens of the call
+            timeout: Longest time to wait in the queue
+
+        Returns:
+            Permit: Release it when the call ends
+
+        Raises:
+            LimiterRejected: Queue full, or still queued after timeout
+        """
+        started = time.monotonic()
+        with self._condition:
+            wait = self._wait_time(tokens, started)
+            if not self._waiters and wait is not None and wait <= 0:
+                return self._admit(tokens, started)
+            if len(self._waiters) >= self.max_queue:
+                self.rejected["queue_full"] += 1
+                raise LimiterRejected("queue_full")
+
+            ticket = object()
+            self._waiters.append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = self._wait_time(tokens, now) if self._waiters[0] is ticket else None
+                    if wait is not None and wait <= 0:
+                        return self._admit(tokens, started)
+                    remaining = started + timeout - now
+                    if remaining <= 0:
+                        self.rejected["queue_timeout"] += 1
+                        raise LimiterRejected("queue_timeout", now - started)
+                    self._condition.wait(remaining if wait is None else min(wait, remaining))
+            finally:
+                self._waiters.remove(ticket)
+                self._condition.notify_all()
+
+    def _release(self, permit: Permit, used_tokens: Optional[int], retry_after: Optional[float]) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            if used_tokens is not None and self.tokens is not None:
+                self.tokens.take(used_tokens - permit.tokens)
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            self._condition.notify_all()
+
+
+# =======================
+# Shared Limiters
+# =======================
+
+_limiters: Dict[str, ModelLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter_for(model_id: str) -> ModelLimiter:
+    """The process-wide limiter of a model, created from LLM_RATE_LIMITS on first use"""
+    limiter = _limiters.get(model_id)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(model_id)
+            if limiter is None:
+                limits = LLM_RATE_LIMITS.get(model_id, LLM_RATE_LIMITS["default"])
+                limiter = _limiters[model_id] = ModelLimiter(**limits)
+    return limiter
+
+
+def set_limiter(model_id: str, limiter: Optional[ModelLimiter]) -> None:
+    """Replace a model's limiter; None recreates it from LLM_RATE_LIMITS on next use"""
+    with _limiters_lock:
+        if limiter is None:
+            _limiters.pop(model_id, None)
+        else:
+            _limiters[model_id] = limiter
+
+
+def queue_depths() -> Dict[str, int]:
+    """Callers waiting per model id"""
+    return {model_id: limiter.queued for model_id, limiter in list(_limiters.items())}
+
+
+def in_flight_calls() -> Dict[str, int]:
+    """Admitted, unfinished calls per model id"""
+    return {model_id: limiter.in_flight for model_id, limiter in list(_limiters.items())}
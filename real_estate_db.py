@@ -6,10 +6,12 @@ Creates a SQLite database with projects schema and sample data
 import sqlite3
 from datetime import datetime, date
 
-def create_real_estate_db():
+from incremental_ingest import log_table_reset
+
+def create_real_estate_db(db_path: str = "real_estate_data.db"):
     """Create real estate database with projects table and sample data"""
 
-    conn = sqlite3.connect("real_estate_data.db")
+    conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
 
     # Drop existing tables if they exist (reverse order due to foreign keys)
@@ -143,6 +145,9 @@ def create_real_estate_db():
         query = f"INSERT INTO project_units ({columns}) VALUES ({placeholders})"
         cursor.execute(query, list(unit.values()))
 
+    # Tell incremental sync and change-log consumers the tables were replaced
+    log_table_reset(conn)
+
     conn.commit()
     conn.close()
 
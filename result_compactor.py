@@ -0,0 +1,135 @@
+"""
+Result Compactor Module
+Turns SQL result sets into a small, token-efficient table for the response LLM
+"""
+
+import json
+from typing import Any, Sequence
+
+from config import RESULT_MAX_ROWS, RESULT_MAX_LIST_ITEMS, RESULT_MAX_TEXT_CHARS
+
+
+def _is_empty(value: Any) -> bool:
+    """True for values that carry no information for the answer"""
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return value.strip() in ("", "[]", "{}", "null", "None")
+    return False
+
+
+def _format_list(items: list, max_items: int) -> str:
+    """Render a JSON array as 'a; b; c (+N more)'"""
+    rendered = [item if isinstance(item, str) else json.dumps(item, separators=(",", ":")) for item in items]
+    text = "; ".join(rendered[:max_items])
+    if len(rendered) > max_items:
+        text += f" (+{len(rendered) - max_items} more)"
+    return text
+
+
+def _format_value(value: Any, max_list_items: int, max_text_chars: int) -> str:
+    """Render one cell compactly"""
+    if value is None:
+        return ""
+
+    if isinstance(value, float):
+        # Two decimals for amounts; small values keep six significant digits so they don't round to 0
+        text = f"{value:.2f}".rstrip("0").rstrip(".") if abs(value) >= 1 else f"{value:.6g}"
+    elif isinstance(value, bytes):
+        text = f"<{len(value)} bytes>"
+    elif isinstance(value, str):
+        text = value.strip()
+        if text[:1] in ("[", "{"):
+            try:
+                parsed = json.loads(text)
+            except ValueError:
+                parsed = None
+            if isinstance(parsed, list):
+                text = _format_list(parsed, max_list_items)
+            elif isinstance(parsed, dict):
+                text = json.dumps(parsed, separators=(",", ":"), ensure_ascii=False)
+    else:
+        text = str(value)
+
+    text = " ".join(text.split()).replace("|", "/")
+    if len(text) > max_text_chars:
+        text = text[:max_text_chars - 1] + "…"
+    return text
+
+
+def compact_results(columns: Sequence[str], rows: Sequence[Sequence[Any]],
+                    truncated: bool = False,
+                    max_rows: int = RESULT_MAX_ROWS,
+                    max_list_items: int = RESULT_MAX_LIST_ITEMS,
+                    max_text_chars: int = RESULT_MAX_TEXT_CHARS) -> str:
+    """
+    Compact a result set into a pipe-separated table
+
+    - Keeps column names as a header line
+    - Drops columns that are empty/null in every row
+    - Hoists columns with the same value in every row into a single line
+    - Summarizes long JSON arrays and truncates long text
+    - Merges identical rows with an (xN) marker
+    - Caps the number of rows with an "N more rows" summary
+
+    Args:
+        columns: Column names (from cursor.description)
+        rows: Result rows
+        truncated: True if the query produced more rows than were fetched
+        max_rows: Maximum rows to include
+        max_list_items: Maximum items shown per JSON array
+        max_text_chars: Maximum characters per cell
+
+    Returns:
+        str: Compact textual representation of the results
+    """
+    if not rows:
+        return "0 rows"
+
+    columns = list(columns) or [f"col{i + 1}" for i in range(len(rows[0]))]
+    lines = [f"{len(rows)}+ rows" if truncated else f"{len(rows)} row{'' if len(rows) == 1 else 's'}"]
+
+    keep = [i for i in range(len(columns)) if not all(_is_empty(row[i]) for row in rows)]
+    empty = [columns[i] for i in range(len(columns)) if i not in keep]
+    if empty:
+        lines.append("empty in all rows: " + ", ".join(empty))
+
+    # Columns with one repeated value are stated once instead of per row
+    constants = []
+    if len(rows) > 1:
+        for i in keep:
+            first = rows[0][i]
+            if all(row[i] == first for row in rows):
+                constants.append(i)
+        if len(constants) == len(keep):
+            constants = []  # Every row is identical - keep it as a table row
+    if constants:
+        lines.append("all rows: " + ", ".join(
+            f"{columns[i]}={_format_value(rows[0][i], max_list_items, max_text_chars)}" for i in constants
+        ))
+    keep = [i for i in keep if i not in constants]
+
+    if not keep:
+        return "\n".join(lines)
+
+    lines.append("|".join(columns[i] for i in keep))
+
+    # Merge identical rows, preserving first-seen order; only shown rows get formatted
+    merged = {}
+    for row in rows:
+        key = tuple(row[i] for i in keep)
+        merged[key] = merged.get(key, 0) + 1
+
+    shown = 0
+    for key, count in merged.items():
+        if shown == max_rows:
+            break
+        line = "|".join(_format_value(value, max_list_items, max_text_chars) for value in key)
+        lines.append(f"{line} (x{count})" if count > 1 else line)
+        shown += 1
+
+    hidden = len(merged) - shown
+    if hidden > 0:
+        lines.append(f"... {hidden} more rows")
+
+    return "\n".join(lines)
@@ -0,0 +1,93 @@
+"""
+SQL Extraction Module
+Pulls the SQL statement out of a model completion and stops streamed completions once the statement is complete
+"""
+
+import re
+import sqlite3
+from contextlib import closing
+from typing import Iterator, Optional, Tuple
+
+from tracing import annotate
+
+# Opening code fence, with or without a language tag
+_FENCE_RE = re.compile(r"```[ \t]*(?:sqlite|sql)?[ \t]*\n?", re.IGNORECASE)
+# First line starting a query, for completions that skip the fence but talk before the SQL. Keywords
+# in upper case only, so prose such as "Select the projects..." is not taken for the query
+_STATEMENT_RE = re.compile(r"^[ \t]*(?:SELECT|WITH)\b", re.MULTILINE)
+
+
+def _candidate(text: str) -> Tuple[Optional[str], bool]:
+    """(SQL part of the completion so far or None, whether a closing fence ended it)"""
+    opening = _FENCE_RE.search(text)
+    if opening:
+        body = text[opening.end():]
+        closing_fence = body.find("```")
+        return (body, False) if closing_fence == -1 else (body[:closing_fence], True)
+    start = _STATEMENT_RE.search(text)
+    return (text[start.start():], False) if start else (None, False)
+
+
+def _clean(sql: str) -> str:
+    """Strip whitespace, stray backticks and the terminating semicolon"""
+    return sql.replace("`", "").strip().rstrip(";").strip()
+
+
+def complete_sql(text: str) -> Optional[str]:
+    """
+    The first complete SQL statement of a (partial) completion
+
+    A statement is complete at its terminating semicolon (semicolons inside
+    string literals and comments do not count) or at the closing code fence.
+
+    Args:
+        text: Completion received so far
+
+    Returns:
+        Optional[str]: The statement without fence or semicolon; None while it is still incomplete
+    """
+    sql, fenced = _candidate(text)
+    if sql is None:
+        return None
+    for position, char in enumerate(sql):
+        if char == ";" and sqlite3.complete_statement(sql[:position + 1]):
+            return _clean(sql[:position + 1])
+    return _clean(sql) if fenced and sql.strip() else None
+
+
+def extract_sql(text: str) -> str:
+    """
+    The SQL statement of a finished completion
+
+    Falls back to the whole (cleaned) completion when it holds no recognizable
+    statement, so the validator reports what the model actually said.
+    """
+    sql = complete_sql(text)
+    if sql is not None:
+        return sql
+    candidate, _ = _candidate(text)
+    return _clean(candidate if candidate is not None else text)
+
+
+def stream_sql(tokens: Iterator[str]) -> str:
+    """
+    Read a streamed completion until it holds a complete statement
+
+    The stream is closed at that point, so the model stops generating (no
+    trailing explanation is paid for).
+
+    Args:
+        tokens: Completion chunks (e.g. FailoverLLM.stream()); closed when done
+
+    Returns:
+        str: The SQL statement (see extract_sql)
+    """
+    text = ""
+    with closing(tokens):
+        for token in tokens:
+            text += token
+            sql = complete_sql(text)
+            if sql is not None:
+                annotate(**{"llm.early_stop": True, "llm.early_stop.chars": len(text)})
+                return sql
+    return extract_sql(text)
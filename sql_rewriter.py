@@ -0,0 +1,484 @@
+"""
+SQL Rewriter Module
+Injects tenant predicates into LLM-generated SQL so tenant isolation never depends on the prompt
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+
+# Tables that carry a tenant_id column and must always be tenant-scoped
+TENANT_SCOPED_TABLES = ("projects", "project_units")
+
+
+# =======================
+# TOKENIZER
+# =======================
+
+_TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<comment>--[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^']|'')*')
+  | (?P<quoted>"(?:[^"]|"")*"|`(?:[^`]|``)*`|\[[^\]]*\])
+  | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+  | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)
+  | (?P<param>\?\d*|[:@$][A-Za-z_][A-Za-z0-9_]*)
+  | (?P<op><>|<=|>=|!=|==|\|\||<<|>>|[-+*/%=<>&|~.,;()])
+""", re.VERBOSE | re.DOTALL)
+
+# Keywords that end the FROM clause of a select core
+_FROM_CLAUSE_END = {"WHERE", "GROUP", "HAVING", "ORDER", "LIMIT", "WINDOW"}
+
+# Keywords that end the WHERE clause of a select core
+_WHERE_CLAUSE_END = {"GROUP", "HAVING", "ORDER", "LIMIT", "WINDOW"}
+
+# Keywords that may start a join operator
+_JOIN_WORDS = {"JOIN", "LEFT", "RIGHT", "FULL", "OUTER", "INNER", "CROSS", "NATURAL"}
+
+# Join words that make a side of the join nullable
+_OUTER_JOIN_WORDS = {"LEFT", "RIGHT", "FULL", "OUTER"}
+
+# Compound select operators that separate select cores
+_COMPOUND_WORDS = {"UNION", "INTERSECT", "EXCEPT"}
+
+# Words that can never be a table alias
+_NOT_ALIAS = _FROM_CLAUSE_END | _JOIN_WORDS | _COMPOUND_WORDS | {"ON", "USING", "INDEXED", "NOT"}
+
+
+class _Token:
+    """A single lexical token"""
+
+    __slots__ = ("kind", "text")
+
+    def __init__(self, kind: str, text: str):
+        self.kind = kind
+        self.text = text
+
+    @property
+    def upper(self) -> str:
+        return self.text.upper() if self.kind == "word" else ""
+
+    @property
+    def significant(self) -> bool:
+        return self.kind not in ("ws", "comment")
+
+
+class _Group(list):
+    """A parenthesized token group (first item is '(' and last item is ')')"""
+
+    kind = "group"
+    significant = True
+    upper = ""
+
+
+def _tokenize(sql: str) -> List[_Token]:
+    """Split SQL text into tokens, raising ValueError on unrecognized input"""
+    tokens = []
+    pos = 0
+    while pos < len(sql):
+        match = _TOKEN_RE.match(sql, pos)
+        if not match:
+            raise ValueError(f"Unable to parse SQL near: {sql[pos:pos + 20]!r}")
+        tokens.append(_Token(match.lastgroup, match.group()))
+        pos = match.end()
+    return tokens
+
+
+def _build_tree(tokens: List[_Token]) -> list:
+    """Nest tokens into _Group lists on parentheses"""
+    root = []
+    stack = [root]
+    for token in tokens:
+        if token.kind == "op" and token.text == "(":
+            group = _Group([token])
+            stack[-1].append(group)
+            stack.append(group)
+        elif token.kind == "op" and token.text == ")":
+            if len(stack) == 1:
+                raise ValueError("Unbalanced parentheses in SQL")
+            stack.pop().append(token)
+        else:
+            stack[-1].append(token)
+    if len(stack) != 1:
+        raise ValueError("Unbalanced parentheses in SQL")
+    return root
+
+
+def _flatten(items: list) -> str:
+    """Serialize a token tree back into SQL text"""
+    parts = []
+    for item in items:
+        if isinstance(item, _Group):
+            parts.append(_flatten(item))
+        else:
+            parts.append(item.text)
+    return "".join(parts)
+
+
+def canonicalize_sql(sql_query: str) -> str:
+    """
+    Normalize SQL text for use as a cache key
+
+    Drops comments and a trailing semicolon, collapses whitespace and
+    lowercases keywords and bare identifiers, so formatting-only differences
+    map to the same key. String literals and quoted tokens are kept verbatim:
+    SQLite treats an unresolvable "Pune" as the string 'Pune', so case there
+    can change the result. Unparseable SQL is returned stripped.
+
+    Args:
+        sql_query: SQL query string
+
+    Returns:
+        str: Canonical SQL text
+    """
+    try:
+        tokens = _tokenize(sql_query)
+    except ValueError:
+        return sql_query.strip()
+
+    parts = []
+    for token in tokens:
+        if token.kind in ("ws", "comment"):
+            if parts and parts[-1] != " ":
+                parts.append(" ")
+        elif token.kind in ("string", "quoted"):
+            parts.append(token.text)
+        else:
+            parts.append(token.text.lower())
+
+    text = "".join(parts).strip()
+    while text.endswith(";"):
+        text = text[:-1].rstrip()
+    return text
+
+
+# =======================
+# REWRITING
+# =======================
+
+def _unquote(text: str) -> str:
+    """Strip identifier quoting and lowercase for comparison"""
+    if text[:1] in ('"', '`', '[') and len(text) >= 2:
+        text = text[1:-1]
+    return text.lower()
+
+
+def _next_significant(items: list, index: int) -> int:
+    """Index of the next significant item at or after index (len(items) if none)"""
+    while index < len(items) and not items[index].significant:
+        index += 1
+    return index
+
+
+def _last_significant_before(items: list, index: int, floor: int) -> int:
+    """Index of the last significant item before index and after floor"""
+    index -= 1
+    while index > floor and not items[index].significant:
+        index -= 1
+    return index
+
+
+def _find_word(items: list, words: set, start: int, end: int) -> int:
+    """Index of the first word in `words` within [start, end), or end if absent"""
+    for index in range(start, end):
+        if items[index].upper in words:
+            return index
+    return end
+
+
+def _predicate(qualifier: str) -> List[_Token]:
+    """Tokens for `<qualifier>.tenant_id = ?`"""
+    return [
+        _Token("word", qualifier), _Token("op", "."), _Token("word", "tenant_id"),
+        _Token("ws", " "), _Token("op", "="), _Token("ws", " "), _Token("param", "?")
+    ]
+
+
+def _scoped_subquery_open() -> List[_Token]:
+    """Tokens opening `(SELECT * FROM `"""
+    return [_Token("op", "("), _Token("word", "SELECT"), _Token("ws", " "), _Token("op", "*"),
+            _Token("ws", " "), _Token("word", "FROM"), _Token("ws", " ")]
+
+
+def _scoped_subquery_close(alias: Optional[str]) -> List[_Token]:
+    """Tokens closing ` WHERE tenant_id = ?)`, plus ` AS <alias>` when the table had no alias"""
+    tokens = [_Token("ws", " "), _Token("word", "WHERE"), _Token("ws", " "), _Token("word", "tenant_id"),
+              _Token("ws", " "), _Token("op", "="), _Token("ws", " "), _Token("param", "?"), _Token("op", ")")]
+    if alias:
+        tokens += [_Token("ws", " "), _Token("word", "AS"), _Token("ws", " "), _Token("word", alias)]
+    return tokens
+
+
+def _joined_predicates(qualifiers: List[str]) -> List[_Token]:
+    """Tokens for `q1.tenant_id = ? AND q2.tenant_id = ? ...`"""
+    tokens = []
+    for qualifier in qualifiers:
+        if tokens:
+            tokens += [_Token("ws", " "), _Token("word", "AND"), _Token("ws", " ")]
+        tokens += _predicate(qualifier)
+    return tokens
+
+
+def _is_subquery(group: _Group) -> bool:
+    """Whether a parenthesized FROM item is a subquery (scoped by _scope_level) rather than a table list"""
+    first = _next_significant(group, 1)
+    return first < len(group) - 1 and group[first].upper in ("SELECT", "WITH", "VALUES")
+
+
+def _table_ref(items: list, index: int, end: int) -> Tuple[_Token, int, str, bool, int]:
+    """
+    Parse `[schema.]table [[AS] alias]` starting at items[index]
+
+    Returns:
+        Tuple of (name_token, name_end, qualifier, has_alias, ref_end)
+        - name_end: Index just past the table name
+        - qualifier: Alias, or the table name when there is none
+        - ref_end: Index just past the whole reference
+    """
+    name_token = items[index]
+    ref_end = index + 1
+    dot = _next_significant(items, ref_end)
+    if dot < end and items[dot].kind == "op" and items[dot].text == ".":
+        name_index = _next_significant(items, dot + 1)
+        if name_index < end:
+            name_token = items[name_index]
+            ref_end = name_index + 1
+
+    name_end = ref_end
+    qualifier = name_token.text
+    has_alias = False
+    alias_index = _next_significant(items, ref_end)
+    if alias_index < end and items[alias_index].upper == "AS":
+        alias_index = _next_significant(items, alias_index + 1)
+    if (alias_index < end
+            and items[alias_index].kind in ("word", "quoted")
+            and items[alias_index].upper not in _NOT_ALIAS):
+        qualifier = items[alias_index].text
+        has_alias = True
+        ref_end = alias_index + 1
+    return name_token, name_end, qualifier, has_alias, ref_end
+
+
+def _scope_parenthesized(group: _Group) -> int:
+    """
+    Wrap every tenant-scoped table of a parenthesized FROM item in place
+
+    Covers `(projects)` and `(projects p JOIN project_units u ON ...)`: each
+    scoped table becomes a pre-filtered subquery, which keeps any join
+    semantics inside the parentheses.
+
+    Returns:
+        int: Number of tenant predicates injected
+
+    Raises:
+        ValueError: If the parentheses hold something other than tables and joins
+    """
+    edits = []
+    count = 0
+    end = len(group) - 1
+    index = _next_significant(group, 1)
+    expect_table = True
+    while index < end:
+        item = group[index]
+        if (item.kind == "op" and item.text == ",") or item.upper == "JOIN":
+            expect_table = True
+        elif expect_table:
+            expect_table = False
+            if isinstance(item, _Group):
+                if not _is_subquery(item):
+                    count += _scope_parenthesized(item)
+            elif item.kind in ("word", "quoted"):
+                name_token, name_end, _, has_alias, ref_end = _table_ref(group, index, end)
+                if _unquote(name_token.text) in TENANT_SCOPED_TABLES:
+                    edits.append((index, _scoped_subquery_open()))
+                    edits.append((name_end, _scoped_subquery_close(None if has_alias else name_token.text)))
+                    count += 1
+                index = _next_significant(group, ref_end)
+                continue
+            else:
+                raise ValueError(f"Unsupported FROM item: {_flatten(group)!r}")
+        index = _next_significant(group, index + 1)
+
+    for index, tokens in sorted(edits, key=lambda edit: edit[0], reverse=True):
+        group[index:index] = tokens
+    return count
+
+
+def _scope_core(items: list, start: int, end: int) -> Tuple[list, int]:
+    """
+    Rewrite a single select core (items[start:end]) with tenant predicates
+
+    Returns:
+        Tuple of (edits, predicate_count)
+        - edits: List of (index, tokens) insertions, applied right-to-left by the caller
+    """
+    from_index = _find_word(items, {"FROM"}, start, end)
+    if from_index == end:
+        return [], 0
+
+    from_end = _find_word(items, _FROM_CLAUSE_END | _COMPOUND_WORDS, from_index + 1, end)
+
+    edits = []
+    where_qualifiers = []
+    count = 0
+
+    # RIGHT/FULL joins make earlier tables nullable too, so a WHERE filter
+    # would drop their NULL-extended rows - every scoped table is wrapped instead
+    wrap_all = _find_word(items, {"RIGHT", "FULL"}, from_index + 1, from_end) < from_end
+
+    # Walk the FROM clause collecting table references
+    index = _next_significant(items, from_index + 1)
+    expect_table = True
+    via_join = False
+    outer = pending_outer = False
+    while index < from_end:
+        item = items[index]
+
+        if item.kind == "op" and item.text == ",":
+            expect_table, via_join, outer, pending_outer = True, False, False, False
+            index = _next_significant(items, index + 1)
+            continue
+
+        if item.upper in _JOIN_WORDS:
+            pending_outer = pending_outer or item.upper in _OUTER_JOIN_WORDS
+            if item.upper == "JOIN":
+                expect_table, via_join = True, True
+                outer, pending_outer = pending_outer, False
+            index = _next_significant(items, index + 1)
+            continue
+
+        if not expect_table:
+            index = _next_significant(items, index + 1)
+            continue
+
+        expect_table = False
+
+        if isinstance(item, _Group):
+            # Subqueries were scoped by _scope_level; parenthesized tables and
+            # joins have their scoped tables wrapped in pre-filtered subqueries
+            if not _is_subquery(item):
+                count += _scope_parenthesized(item)
+            index = _next_significant(items, index + 1)
+            continue
+        if item.kind not in ("word", "quoted"):
+            raise ValueError(f"Unsupported FROM item: {item.text!r}")
+
+        table_index = index
+        name_token, name_end, qualifier, has_alias, ref_end = _table_ref(items, index, from_end)
+        index = _next_significant(items, ref_end)
+
+        if _unquote(name_token.text) not in TENANT_SCOPED_TABLES:
+            continue
+
+        has_on = via_join and index < from_end and items[index].upper == "ON"
+
+        # Nullable sides without an ON clause to carry the predicate (USING,
+        # NATURAL, RIGHT/FULL joins) are replaced by a pre-filtered subquery,
+        # so the join keeps its outer semantics
+        if wrap_all or (outer and not has_on):
+            edits.append((table_index, _scoped_subquery_open()))
+            edits.append((name_end, _scoped_subquery_close(None if has_alias else name_token.text)))
+        # Joined tables with an ON clause get the predicate inside ON, which keeps
+        # LEFT joins intact; everything else is filtered in WHERE
+        elif has_on:
+            on_end = _find_word(items, _JOIN_WORDS, index + 1, from_end)
+            for comma in range(index + 1, on_end):
+                if items[comma].kind == "op" and items[comma].text == ",":
+                    on_end = comma
+                    break
+            last = _last_significant_before(items, on_end, index)
+            edits.append((_next_significant(items, index + 1), _predicate(qualifier) + [
+                _Token("ws", " "), _Token("word", "AND"), _Token("ws", " "), _Token("op", "(")
+            ]))
+            edits.append((last + 1, [_Token("op", ")")]))
+        else:
+            where_qualifiers.append(qualifier)
+        count += 1
+
+    if where_qualifiers:
+        where_index = from_end if from_end < end and items[from_end].upper == "WHERE" else end
+        if where_index < end:
+            where_end = _find_word(items, _WHERE_CLAUSE_END | _COMPOUND_WORDS, where_index + 1, end)
+            last = _last_significant_before(items, where_end, where_index)
+            edits.append((_next_significant(items, where_index + 1), _joined_predicates(where_qualifiers) + [
+                _Token("ws", " "), _Token("word", "AND"), _Token("ws", " "), _Token("op", "(")
+            ]))
+            edits.append((last + 1, [_Token("op", ")")]))
+        else:
+            last = _last_significant_before(items, from_end, from_index)
+            edits.append((last + 1, [_Token("ws", " "), _Token("word", "WHERE"), _Token("ws", " ")]
+                          + _joined_predicates(where_qualifiers)))
+
+    return edits, count
+
+
+def _scope_level(items: list) -> int:
+    """
+    Rewrite every select core at this nesting level (and below) in place
+
+    Returns:
+        int: Number of tenant predicates injected
+    """
+    count = 0
+
+    # Subqueries, CTE bodies and IN (...) lists first
+    for index, item in enumerate(items):
+        if isinstance(item, _Group):
+            inner = item[1:-1]
+            count += _scope_level(inner)
+            items[index] = _Group([item[0]] + inner + [item[-1]])
+
+    # Split into select cores on ';' and compound operators
+    boundaries = [-1]
+    for index, item in enumerate(items):
+        if item.upper in _COMPOUND_WORDS or (item.kind == "op" and item.text == ";"):
+            boundaries.append(index)
+    boundaries.append(len(items))
+
+    edits = []
+    for core_start, core_end in zip(boundaries, boundaries[1:]):
+        core_edits, core_count = _scope_core(items, core_start + 1, core_end)
+        edits.extend(core_edits)
+        count += core_count
+
+    # Apply insertions right-to-left so earlier indices stay valid; insertions
+    # sharing an index keep the order in which they were recorded
+    ordered = sorted(enumerate(edits), key=lambda edit: (edit[1][0], edit[0]), reverse=True)
+    for _, (index, tokens) in ordered:
+        items[index:index] = tokens
+
+    return count
+
+
+def inject_tenant_predicates(sql_query: str, tenant_id: Optional[str]) -> Tuple[str, tuple]:
+    """
+    Add `tenant_id = ?` predicates to every projects / project_units reference
+
+    Predicates are qualified with the table alias (or name) and use bound
+    parameters, so each scoped table can use idx_projects_tenant /
+    idx_units_tenant regardless of what the LLM wrote. The nullable side of
+    an outer join without an ON clause (USING, NATURAL, RIGHT/FULL joins) is
+    replaced by a pre-filtered subquery instead, so unmatched rows survive.
+
+    Args:
+        sql_query: SQL generated by the LLM
+        tenant_id: Tenant to scope to (None means no filtering)
+
+    Returns:
+        Tuple of (scoped_sql, params)
+        - scoped_sql: Rewritten SQL (unchanged if tenant_id is None)
+        - params: Bound parameters for the injected placeholders
+
+    Raises:
+        ValueError: If the SQL cannot be parsed
+    """
+    if not tenant_id:
+        return sql_query, ()
+
+    tokens = _tokenize(sql_query)
+    if any(token.kind == "param" for token in tokens):
+        raise ValueError("Generated SQL must not contain bound parameters")
+
+    tree = _build_tree(tokens)
+    count = _scope_level(tree)
+    return _flatten(tree), (tenant_id,) * count
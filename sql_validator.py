@@ -0,0 +1,178 @@
+"""
+SQL Validator Module
+Cheap pre-execution checks for LLM-generated SQL using EXPLAIN / EXPLAIN QUERY PLAN
+"""
+
+import re
+import sqlite3
+from typing import Dict, List, Optional, Sequence, TypedDict
+
+from config import SQL_MAX_ESTIMATED_COST
+from database import db_interface, DatabaseInterface
+
+
+class ValidationReport(TypedDict):
+    """Outcome of validating one SQL statement"""
+    ok: bool                 # False means the query must not be executed
+    errors: List[str]        # Reasons for rejection
+    warnings: List[str]      # Non-fatal findings (full scans, cartesian joins, ...)
+    estimated_cost: int      # Rough estimate of rows visited
+    plan: List[str]          # EXPLAIN QUERY PLAN detail lines
+
+
+# Authorizer actions a read-only query may need
+_ALLOWED_ACTIONS = {
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_FUNCTION,
+    getattr(sqlite3, "SQLITE_RECURSIVE", 33)
+}
+
+_LEADING_NOISE_RE = re.compile(r"^(?:\s+|--[^\n]*\n?|/\*.*?\*/|\()*", re.DOTALL)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_TABLE_REF_RE = re.compile(
+    r"""(?:\bFROM|\bJOIN|,)\s+(?:\w+\.)?["`\[]?(\w+)["`\]]?(?:\s+(?:AS\s+)?(?!(?:ON|USING|WHERE|JOIN|LEFT|RIGHT|INNER|CROSS|NATURAL|FULL|GROUP|ORDER|LIMIT|HAVING|UNION|INTERSECT|EXCEPT|WINDOW)\b)(\w+))?""",
+    re.IGNORECASE
+)
+_PLAN_RE = re.compile(r"^(SCAN|SEARCH) (\S+)(.*)$")
+
+# Tables whose unbounded full scans are worth flagging
+_LARGE_TABLES = ("project_units",)
+
+
+def _alias_map(sql_query: str) -> Dict[str, str]:
+    """Map table aliases (and names) used in the query to table names"""
+    aliases = {}
+    for table, alias in _TABLE_REF_RE.findall(_STRING_RE.sub("''", sql_query)):
+        aliases[table.lower()] = table.lower()
+        if alias:
+            aliases[alias.lower()] = table.lower()
+    return aliases
+
+
+def _table_rows(conn: sqlite3.Connection, table: str, cache: Dict[str, int]) -> int:
+    """Approximate row count via MAX(rowid), which is O(log n) unlike COUNT(*)"""
+    if table not in cache:
+        try:
+            cache[table] = conn.execute(f"SELECT MAX(rowid) FROM main.{table}").fetchone()[0] or 0
+        except sqlite3.Error:
+            cache[table] = 1
+    return cache[table]
+
+
+def _loop_cost(detail: str, aliases: Dict[str, str], conn: sqlite3.Connection, cache: Dict[str, int]) -> int:
+    """Rough number of rows visited by one plan loop"""
+    match = _PLAN_RE.match(detail)
+    if not match:
+        return 1
+    kind, name, rest = match.groups()
+    table = aliases.get(name.split(".")[-1].lower())
+    if table is None:
+        return 1  # Subquery, CTE or constant row
+    rows = _table_rows(conn, table, cache)
+    if kind == "SCAN":
+        return max(rows, 1)
+    if "PRIMARY KEY" in rest or "sqlite_autoindex" in rest or "rowid=?" in rest:
+        return 1
+    if "AUTOMATIC" in rest:
+        return max(rows, 1)  # Index is built from a full scan
+    return max(rows // 10, 1)
+
+
+def validate_sql(sql_query: str, params: Sequence = (), tenant_id: Optional[str] = None,
+                 db: Optional[DatabaseInterface] = None) -> ValidationReport:
+    """
+    Validate a SQL statement without executing it
+
+    Compiles the statement with EXPLAIN on the same pooled connection that
+    would execute it (so tenant views resolve identically) under an
+    authorizer that only permits reads, then inspects the query plan.
+
+    Args:
+        sql_query: SQL to validate
+        params: Bound parameters for the statement
+        tenant_id: Optional tenant (selects the tenant-scoped connection)
+        db: Optional DatabaseInterface (defaults to the shared instance)
+
+    Returns:
+        ValidationReport: Errors, warnings, plan and cost estimate
+    """
+    db = db or db_interface
+    report: ValidationReport = {"ok": True, "errors": [], "warnings": [], "estimated_cost": 0, "plan": []}
+
+    statement = _LEADING_NOISE_RE.sub("", sql_query)
+    first_word = statement.split(None, 1)[0].upper() if statement else ""
+    if first_word not in ("SELECT", "WITH", "VALUES"):
+        report["ok"] = False
+        report["errors"].append(f"Only SELECT statements are allowed (got {first_word or 'an empty query'}).")
+        return report
+
+    conn = db.get_connection(tenant_id)
+    base_authorizer = db.get_authorizer(tenant_id)
+
+    def authorizer(action, *args):
+        if action not in _ALLOWED_ACTIONS:
+            return sqlite3.SQLITE_DENY
+        return base_authorizer(action, *args) if base_authorizer else sqlite3.SQLITE_OK
+
+    conn.set_authorizer(authorizer)
+    try:
+        conn.execute(f"EXPLAIN {sql_query}", params).fetchall()
+        plan = conn.execute(f"EXPLAIN QUERY PLAN {sql_query}", params).fetchall()
+    except sqlite3.Error as e:
+        report["ok"] = False
+        message = str(e)
+        if "not authorized" in message:
+            message = "Only read-only SELECT statements are allowed."
+        elif "prohibited" in message:
+            message = "Query projects / project_units by their plain names (no schema prefix)."
+        report["errors"].append(message)
+        return report
+    finally:
+        conn.set_authorizer(base_authorizer)  # Keep tenant isolation on the pooled connection
+
+    # Table sizes come from the shared tables, which tenant connections cannot read directly
+    stats_conn = db.get_connection()
+    aliases = _alias_map(sql_query)
+    has_limit = re.search(r"\bLIMIT\b", _STRING_RE.sub("''", sql_query), re.IGNORECASE) is not None
+    row_cache: Dict[str, int] = {}
+
+    # Rows sharing a parent are nested loops of one select core
+    loops_by_parent: Dict[int, List[str]] = {}
+    for _, parent_id, _, detail in plan:
+        report["plan"].append(detail)
+        if _PLAN_RE.match(detail):
+            loops_by_parent.setdefault(parent_id, []).append(detail)
+
+    for loops in loops_by_parent.values():
+        cost = 1
+        full_scans = []
+        for detail in loops:
+            cost *= _loop_cost(detail, aliases, stats_conn, row_cache)
+            kind, name, _ = _PLAN_RE.match(detail).groups()
+            table = aliases.get(name.split(".")[-1].lower())
+            if kind == "SCAN" and table:
+                full_scans.append(table)
+                if table in _LARGE_TABLES and not has_limit:
+                    report["warnings"].append(f"Full scan of {table} without LIMIT.")
+        if len(full_scans) > 1:
+            report["warnings"].append(
+                f"Cartesian join between {', '.join(full_scans)} - add a join condition."
+            )
+        report["estimated_cost"] += cost
+
+    if report["estimated_cost"] > SQL_MAX_ESTIMATED_COST:
+        report["ok"] = False
+        report["errors"].append(
+            f"Query would visit about {report['estimated_cost']:,} rows "
+            f"(limit {SQL_MAX_ESTIMATED_COST:,}). Add filters, a join condition or a LIMIT."
+        )
+
+    return report
+
+
+def format_findings(report: ValidationReport) -> str:
+    """Render validator errors and warnings for the SQL retry prompt"""
+    lines = [f"- ERROR: {error}" for error in report["errors"]]
+    lines += [f"- WARNING: {warning}" for warning in report["warnings"]]
+    return "\n".join(lines)
@@ -0,0 +1,304 @@
+"""
+Synthetic Data Module
+Seeded, realistic tenants, projects and units for scale testing
+"""
+
+import os
+import random
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List, Tuple, TypedDict
+
+from config import INGEST_BATCH_SIZE, SYNTHETIC_SEED, SYNTHETIC_TENANTS, SYNTHETIC_UNITS_PER_PROJECT
+from ingest import IngestReport, format_report, ingest_records
+from real_estate_db import create_real_estate_db
+
+
+class SyntheticSpec(TypedDict):
+    """Sizes and seed of a synthetic dataset (the same spec always yields the same rows)"""
+    units: int
+    tenants: int
+    units_per_project: int
+    seed: int
+
+
+# =======================
+# Distributions
+# =======================
+
+# (city, share of projects, base price per sq.ft)
+CITIES = [
+    ("Bangalore", 0.28, 9000), ("Chennai", 0.16, 7500), ("Pune", 0.14, 8500),
+    ("Hyderabad", 0.13, 8000), ("Mumbai", 0.11, 22000), ("Kochi", 0.05, 6500),
+    ("Coimbatore", 0.05, 5500), ("Kolkata", 0.04, 6000), ("Goa", 0.02, 11000),
+    ("Mysore", 0.02, 5000)
+]
+
+# State code used in RERA registration numbers
+CITY_STATE_CODES = {
+    "Bangalore": "KA", "Chennai": "TN", "Pune": "MH", "Hyderabad": "TG", "Mumbai": "MH", "Kochi": "KL",
+    "Coimbatore": "TN", "Kolkata": "WB", "Goa": "GA", "Mysore": "KA"
+}
+
+DEVELOPERS = [
+    "Puravankara Limited", "Provident Housing Limited", "Casagrand Builder Private Limited",
+    "Brigade Enterprises", "Prestige Estates Projects", "Sobha Limited", "Godrej Properties",
+    "Mahindra Lifespaces", "Tata Housing", "Shriram Properties", "Lodha Group",
+    "Kolte Patil Developers", "Salarpuria Sattva", "Embassy Group", "Assetz Property Group",
+    "Mantri Developers", "Total Environment", "Adarsh Developers", "Arvind SmartSpaces",
+    "DLF Limited"
+]
+
+NAME_STEMS = [
+    "Zenium", "Atmosphere", "Park Hill", "Willows", "Tiara", "Meraki", "Blubelle", "Orient",
+    "Silversands", "Emerald Bay", "Aspire", "Windermere", "Somerset", "Marina", "Serenity",
+    "Lakevista", "Sunflower", "Skydale", "Palm Grove", "Amber", "Cedar", "Horizon", "Azure",
+    "Meadows", "Riverstone", "Orchid", "Cascade", "Summit", "Harmony", "Sapphire", "Elysium",
+    "Aurora", "Bellmont", "Greenfield", "Kingsbury", "Lotus", "Moonstone", "Northwind",
+    "Oakwood", "Pinnacle"
+]
+
+NAME_SUFFIXES = ["", "Heights", "Gardens", "Residences", "Enclave", "Towers", "Park",
+                 "Estates", "Greens", "Square", "Grand", "Elite"]
+
+# (configuration_type, property_type, share of units, carpet area range in sq.ft)
+CONFIGURATIONS = [
+    ("1 BHK", "Apartment", 0.12, (450, 700)),
+    ("2 BHK", "Apartment", 0.34, (750, 1150)),
+    ("2.5 BHK", "Apartment", 0.08, (1050, 1300)),
+    ("3 BHK", "Apartment", 0.28, (1200, 1900)),
+    ("3 BHK Elite", "Apartment", 0.06, (1600, 2200)),
+    ("4 BHK", "Apartment", 0.06, (2000, 3200)),
+    ("4 BHK Duplex", "Duplex", 0.02, (2600, 3800)),
+    ("Villa", "Villa", 0.03, (2400, 5000)),
+    ("Duplex Penthouse", "Penthouse", 0.01, (2800, 5500))
+]
+
+CONSTRUCTION_STATUSES = [
+    ("Under Construction", 0.55), ("New Launch", 0.12), ("Nearing Possession", 0.10),
+    ("RTMI", 0.15), ("RTMI - CC Received", 0.08)
+]
+
+AMENITIES = [
+    "Swimming Pool", "Gym", "Clubhouse", "Jogging track", "Kids play area", "Kids pool",
+    "Amphitheatre", "Basketball court", "Badminton court", "Tennis court", "Yoga deck",
+    "Indoor games room", "Co-working space", "Party hall", "Pet zone", "Barbeque deck",
+    "Library", "Mini theatre", "Spa", "Squash court", "Cricket pitch", "Reflexology path",
+    "Senior citizen zone", "Convenience store", "EV charging", "Rainwater harvesting",
+    "Solar lighting", "Zen garden", "Viewing deck", "Skating rink"
+]
+
+PAYMENT_PLANS = [
+    "CLP (Construction Link Payment)", "10:80:10 Subvention Scheme", "20:80 Payment Plan",
+    "Down Payment Plan - 5% discount", "Monthly SIP - 12 months payment holiday",
+    "Flexi Payment Plan"
+]
+
+SCHOOLS = ["Delhi Public School", "National Public School", "Ryan International School",
+           "Kendriya Vidyalaya", "Orchid International School", "Greenwood High",
+           "Podar International School", "Vibgyor High"]
+
+OFFERS = ["Festive offer: free modular kitchen", "No EMI till possession", "Stamp duty waiver",
+          "Early bird discount 3%", "Free car parking", "RTMI", "New Tower"]
+
+
+def _weighted(rng: random.Random, items: List[tuple], weight_index: int = 1) -> tuple:
+    """Pick one tuple by its weight column"""
+    return rng.choices(items, weights=[item[weight_index] for item in items])[0]
+
+
+def _distances(rng: random.Random, names: List[str], count: int) -> List[Dict[str, str]]:
+    return [{"name": name, "distance": f"{rng.uniform(0.5, 12):.1f} Km"} for name in rng.sample(names, count)]
+
+
+# =======================
+# Generators
+# =======================
+
+def make_tenants(count: int, seed: int) -> List[Tuple[str, List[str], float]]:
+    """
+    Tenants with their developers and share of projects
+
+    Shares follow a Zipf-like curve (a few large clients, a long tail), and
+    each tenant owns one to three developers, as with real client accounts.
+
+    Returns:
+        list: (tenant_id, developer names, weight) per tenant
+    """
+    rng = random.Random(f"{seed}:tenants")
+    return [
+        (f"SYN_T{i + 1:03d}", rng.sample(DEVELOPERS, rng.randint(1, 3)), 1.0 / (i + 1))
+        for i in range(count)
+    ]
+
+
+def unit_counts(spec: SyntheticSpec) -> List[int]:
+    """
+    Units per project, summing exactly to spec["units"]
+
+    Returns:
+        list: One count (>= 1) per project
+    """
+    mean = max(spec["units_per_project"], 1)
+    rng = random.Random(f"{spec['seed']}:counts")
+    counts = [rng.randint(max(mean // 2, 1), max(mean * 3 // 2, 1))
+              for _ in range(max(round(spec["units"] / mean), 1))]
+
+    # Nudge counts up or down one at a time until the total matches
+    difference = spec["units"] - sum(counts)
+    step = 1 if difference > 0 else -1
+    i = 0
+    while difference:
+        if counts[i % len(counts)] + step >= 1:
+            counts[i % len(counts)] += step
+            difference -= step
+        i += 1
+    return counts
+
+
+def make_project(index: int, spec: SyntheticSpec, tenants: List[tuple], unit_count: int) -> Dict[str, Any]:
+    """Project record number index (independent of every other project)"""
+    rng = random.Random(spec["seed"] * 1_000_003 + index)
+    tenant_id, developers, _ = rng.choices(tenants, weights=[tenant[2] for tenant in tenants])[0]
+    developer = rng.choice(developers)
+    city = _weighted(rng, CITIES)[0]
+    status = _weighted(rng, CONSTRUCTION_STATUSES)[0]
+
+    name = " ".join(part for part in (developer.split()[0], rng.choice(NAME_STEMS), rng.choice(NAME_SUFFIXES)) if part)
+    if index >= len(NAME_STEMS) * len(NAME_SUFFIXES):
+        name += f" Phase {index % 9 + 1}"
+
+    launch = date(2016, 1, 1) + timedelta(days=rng.randint(0, 3300))
+    possession = launch + timedelta(days=rng.randint(900, 1800))
+    ready = status.startswith("RTMI")
+    towers = rng.randint(1, 20)
+
+    return {
+        "project_id": f"SYN{index:08d}",
+        "tenant_id": tenant_id,
+        "project_name": name,
+        "developer_name": developer,
+        "city": city,
+        "description": f"{name} is a {status.lower()} residential project by {developer} in {city}.",
+        "total_project_area_acres": round(rng.uniform(1, 60), 2),
+        "open_space_percentage": round(rng.uniform(50, 85), 2),
+        "number_of_towers": towers,
+        "total_units_count": max(unit_count * rng.randint(5, 20), towers),
+        "rera_registration_number": f"PRM/{CITY_STATE_CODES[city]}/RERA/{rng.randint(1000, 9999)}/{rng.randint(100, 999)}/PR/{index}",
+        "approval_body": rng.choice(["BBMP", "BDA", "CMDA", "PMRDA", "HMDA", "BMRDA"]),
+        "launch_date": launch,
+        "sales_launch_date": launch + timedelta(days=rng.randint(0, 120)),
+        "construction_start_date": launch + timedelta(days=rng.randint(30, 240)),
+        "rera_possession_date": possession + timedelta(days=180),
+        "estimated_possession_date": possession,
+        "construction_status": status,
+        "completion_percentage": 100.0 if ready else round(rng.uniform(5, 95), 2),
+        "construction_technology": rng.choice(["Mivan", "Conventional RCC", "Precast"]),
+        "stamp_duty_percentage": rng.choice([5.0, 6.0, 7.0]),
+        "registration_charges_percentage": 1.0,
+        "amenities": rng.sample(AMENITIES, rng.randint(5, 20)),
+        "payment_plans": rng.sample(PAYMENT_PLANS, rng.randint(1, 3)),
+        "schools": _distances(rng, SCHOOLS, rng.randint(0, 4)),
+        "airport_distance": f"{rng.randint(8, 55)} Km",
+        "modified_at": (launch + timedelta(days=rng.randint(0, 900))).isoformat()
+    }
+
+
+def make_units(index: int, spec: SyntheticSpec, project: Dict[str, Any], count: int) -> Iterator[Dict[str, Any]]:
+    """The units of project number index"""
+    rng = random.Random(spec["seed"] * 1_000_003 + index + 500_000_000_000)
+    city_psf = next(psf for city, _, psf in CITIES if city == project["city"])
+    project_psf = city_psf * rng.lognormvariate(0, 0.25)  # Location and brand premium
+
+    for j in range(count):
+        configuration, property_type, _, (low, high) = _weighted(rng, CONFIGURATIONS, 2)
+        carpet = rng.randint(low, high)
+        psf = round(project_psf * rng.uniform(0.92, 1.12), 2)
+        revised = rng.random() < 0.3
+        yield {
+            "unit_id": f"{project['project_id']}-{j:05d}",
+            "project_id": project["project_id"],
+            "tenant_id": project["tenant_id"],
+            "configuration_type": configuration,
+            "property_type": property_type,
+            "built_up_area_sqft": round(carpet * rng.uniform(1.2, 1.35), 2),
+            "carpet_area_sqft": carpet,
+            "base_price": round(carpet * psf, -3),
+            "current_average_psf": psf,
+            "market_psf": round(psf * rng.uniform(0.9, 1.1), 2) if rng.random() < 0.5 else None,
+            "last_price_revision_date": project["launch_date"] + timedelta(days=rng.randint(60, 900)) if revised else None,
+            "last_price_change_percentage": round(rng.uniform(-3, 12), 2) if revised else None,
+            "current_festive_offers": rng.choice(OFFERS) if rng.random() < 0.2 else None
+        }
+
+
+def iter_dataset(spec: SyntheticSpec) -> Tuple[Iterator[Dict[str, Any]], Iterator[Dict[str, Any]]]:
+    """
+    Lazy project and unit streams for a spec
+
+    Every project and its units come from their own seeded generator, so the
+    two streams can be consumed one after the other (as the bulk loader
+    does) without holding any records in memory.
+
+    Returns:
+        Tuple of (projects, units) iterators
+    """
+    tenants = make_tenants(spec["tenants"], spec["seed"])
+    counts = unit_counts(spec)
+
+    def projects():
+        for i, count in enumerate(counts):
+            yield make_project(i, spec, tenants, count)
+
+    def units():
+        for i, count in enumerate(counts):
+            yield from make_units(i, spec, make_project(i, spec, tenants, count), count)
+
+    return projects(), units()
+
+
+def generate_database(db_path: str, units: int, tenants: int = SYNTHETIC_TENANTS,
+                      units_per_project: int = SYNTHETIC_UNITS_PER_PROJECT, seed: int = SYNTHETIC_SEED,
+                      batch_size: int = INGEST_BATCH_SIZE) -> IngestReport:
+    """
+    Create (or replace) a database at db_path filled with synthetic data
+
+    Uses the production schema (real_estate_db.py) and the bulk-load path
+    (ingest.py), so the result matches what real imports produce. Memory
+    stays flat from 10k to 10M units. An existing file at db_path is removed
+    first, so the database holds exactly the rows the spec describes.
+
+    Args:
+        db_path: Database file to create
+        units: Total number of units
+        tenants: Number of tenants
+        units_per_project: Mean units per project
+        seed: Random seed
+        batch_size: Records per transaction
+
+    Returns:
+        IngestReport: Row counts and throughput of the load
+    """
+    spec: SyntheticSpec = {"units": units, "tenants": tenants, "units_per_project": units_per_project, "seed": seed}
+    for suffix in ("", "-journal", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    create_real_estate_db(db_path)
+    projects, unit_records = iter_dataset(spec)
+    return ingest_records(projects, unit_records, db_path=db_path, batch_size=batch_size)
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 3:
+        print("Usage: python synthetic_data.py <db_path> <units> [seed] [tenants]")
+        sys.exit(1)
+
+    report = generate_database(
+        sys.argv[1], int(sys.argv[2].replace("_", "")),
+        seed=int(sys.argv[3]) if len(sys.argv) > 3 else SYNTHETIC_SEED,
+        tenants=int(sys.argv[4]) if len(sys.argv) > 4 else SYNTHETIC_TENANTS
+    )
+    print(f"✅ {format_report(report)}")
+    if report["rejected"]:
+        print(f"⚠️  First errors: {report['errors'][:3]}")
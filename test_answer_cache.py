@@ -0,0 +1,51 @@
+"""
+Test script for the final-answer cache
+"""
+
+import threading
+import time
+
+from answer_cache import AnswerCache, make_answer_key
+
+
+def test_fresh_stale_and_expired():
+    cache = AnswerCache(fresh_ttl=0.05, stale_ttl=0.05)
+    key = make_answer_key("How many projects?", "T1", "model", 1)
+    assert key == make_answer_key("  how many   PROJECTS ", "T1", "model", 1)
+    cache.put(key, {"final_answer": "2"})
+
+    assert cache.get(key) == ({"final_answer": "2"}, False)
+    time.sleep(0.06)
+    assert cache.get(key) == ({"final_answer": "2"}, True)
+    time.sleep(0.06)
+    assert cache.get(key) is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["stale_hits"], stats["misses"], stats["entries"]) == (1, 1, 1, 0)
+
+
+def test_one_refresh_per_key():
+    cache = AnswerCache(fresh_ttl=0, stale_ttl=60)
+    key = make_answer_key("How many projects?", "T1", "model", 1)
+    cache.put(key, {"final_answer": "old"})
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(1)
+        return {"final_answer": "new"}
+
+    for _ in range(5):
+        cache.refresh(key, compute)
+    release.set()
+    cache._executor.shutdown(wait=True)
+
+    assert len(calls) == 1 and cache.stats()["refreshes"] == 1
+    assert cache.get(key)[0] == {"final_answer": "new"}
+
+
+if __name__ == "__main__":
+    test_fresh_stale_and_expired()
+    test_one_refresh_per_key()
+    print("✅ Answer cache tests passed!")
@@ -0,0 +1,52 @@
+"""
+Test script for the end-to-end benchmark harness
+"""
+
+import json
+import os
+import tempfile
+
+from benchmark import build_corpus, percentiles, run_benchmark
+from database import db_interface
+from synthetic_data import generate_database
+
+QUIET = {"latency_ms": 0, "ms_per_token": 0, "jitter": 0}
+
+
+def test_corpus_is_seeded():
+    assert build_corpus(50, seed=3) == build_corpus(50, seed=3)
+    assert build_corpus(50, seed=3) != build_corpus(50, seed=4)
+    assert len(build_corpus(17)) == 17
+
+
+def test_percentiles():
+    stats = percentiles(list(range(1, 101)))
+    assert (stats["p50"], stats["p95"], stats["p99"], stats["max"]) == (50, 95, 99, 100)
+    assert percentiles([7.0]) == {"p50": 7.0, "p95": 7.0, "p99": 7.0, "mean": 7.0, "max": 7.0}
+    assert percentiles([])["p99"] == 0.0
+
+
+def test_run_benchmark_reports_every_level():
+    questions = ["Hello", "How many projects are there?", "Show all projects in Chennai",
+                 "What is the average price of 3 BHK in Bangalore?"]
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    generate_database(path, 400, tenants=2, seed=11)
+    shared_path = db_interface.db_path
+    report = run_benchmark(questions, concurrency_levels=(1, 2), profile=QUIET, warmup=1, db_path=path)
+    json.dumps(report)
+    assert db_interface.db_path == shared_path
+
+    assert [level["concurrency"] for level in report["levels"]] == [1, 2]
+    level = report["levels"][0]
+    assert level["requests"] == 4 and level["errors"] == 0 and level["cached"] == 0
+    assert {"router", "sql_gen", "execute_sql", "response"} <= set(level["nodes"])
+    assert level["nodes"]["sql_gen"]["p50"] > 0
+    assert level["tokens"]["prompt_mean"] > 0 and level["tokens"]["llm_calls"] == 11  # 2 for the greeting, 3 per data question
+    assert report["database"]["path"] == path and report["database"]["project_units"] == 400
+
+
+if __name__ == "__main__":
+    test_corpus_is_seeded()
+    test_percentiles()
+    test_run_benchmark_reports_every_level()
+    print("✅ All benchmark tests passed!")
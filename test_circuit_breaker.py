@@ -0,0 +1,113 @@
+"""
+Test script for per-model circuit breakers and the per-stage failover chain
+"""
+
+import time
+
+import llm_client
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, breaker_for, reset_breakers
+from config import AVAILABLE_MODELS, ROUTER_SYSTEM_PROMPT
+from llm_client import (
+    FailoverLLM, LLMError, RetryPolicy, create_llm_client, failover_chain, set_retry_policy, stage_model
+)
+from mock_llm import FakeLLM, FaultInjector
+
+QUIET = {"latency_ms": 0, "ms_per_token": 0, "jitter": 0}
+
+
+def test_breaker_opens_on_error_rate_and_recovers():
+    breaker = CircuitBreaker(window_seconds=60, min_calls=4, error_rate=0.5, open_seconds=0.05, probes=1)
+    for failed in (False, True, False):
+        assert breaker.allow()
+        breaker.record(failed, 0.1)
+    assert breaker.state == CLOSED  # Below min_calls
+    breaker.record(True, 0.1)
+    assert breaker.state == OPEN and not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()  # Only one probe at a time
+    breaker.record(True, 0.1)
+    assert breaker.state == OPEN and breaker.times_opened == 2
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record(None, 0.0)  # Probe never reached the model: the slot is freed, state unchanged
+    assert breaker.state == HALF_OPEN and breaker.allow()
+    breaker.record(False, 0.1)
+    assert breaker.state == CLOSED and breaker.allow()
+
+
+def test_breaker_opens_on_slow_calls():
+    breaker = CircuitBreaker(min_calls=3, slow_call_seconds=1.0, slow_rate=0.6)
+    for elapsed in (0.1, 2.0, 3.0):
+        breaker.record(False, elapsed)
+    assert breaker.state == OPEN
+
+
+def test_failover_chain_per_stage():
+    qwen, deepseek, glm4 = (AVAILABLE_MODELS[key]["id"] for key in ("qwen", "deepseek", "glm4"))
+    assert failover_chain(qwen, "router") == [qwen, glm4, deepseek]
+    assert failover_chain(stage_model(qwen, "router"), "router") == [glm4, qwen, deepseek]
+    assert failover_chain("mock/primary", "city_normalization") == ["mock/primary", glm4, qwen]
+    assert failover_chain(deepseek, "unknown_stage")[0] == deepseek
+    assert isinstance(create_llm_client(qwen, stage="sql_gen"), FailoverLLM)
+
+
+def test_open_breaker_fails_over_immediately():
+    broken = FaultInjector({**QUIET, "latency_ms": 200, "error_5xx": 1.0})
+    healthy = FaultInjector(QUIET)
+    llm_client.set_llm_client_factory(
+        lambda model_id, temperature=0.3: FakeLLM(model_id, temperature, injector=broken if model_id == "mock/down"
+                                                  else healthy)
+    )
+    set_retry_policy(RetryPolicy(max_retries=0))
+    reset_breakers()
+    breaker_for("mock/down").min_calls = 2
+    try:
+        llm = create_llm_client("mock/down", stage="sql_gen")
+        for _ in range(2):
+            assert llm.invoke("Current question: hi", ROUTER_SYSTEM_PROMPT) == "general"
+            assert llm.model_used == AVAILABLE_MODELS["qwen"]["id"]
+        assert breaker_for("mock/down").state == OPEN
+
+        started = time.perf_counter()
+        assert llm.invoke("Current question: hi", ROUTER_SYSTEM_PROMPT) == "general"
+        assert time.perf_counter() - started < 0.1  # The 200 ms failing model is skipped
+
+        try:
+            FakeLLM("mock/down", injector=broken).invoke("hi")
+        except LLMError as e:
+            assert e.kind == "circuit_open" and not e.model_fault
+    finally:
+        llm_client.set_llm_client_factory(None)
+        set_retry_policy(None)
+        reset_breakers()
+
+
+def test_stream_fails_over_before_first_chunk():
+    broken = FaultInjector({**QUIET, "error_5xx": 1.0})
+    healthy = FaultInjector(QUIET)
+    llm_client.set_llm_client_factory(
+        lambda model_id, temperature=0.3: FakeLLM(model_id, temperature, injector=broken if model_id == "mock/down"
+                                                  else healthy)
+    )
+    set_retry_policy(RetryPolicy(max_retries=0))
+    reset_breakers()
+    try:
+        llm = FailoverLLM(["mock/down", "mock/up"], stage="router", max_tokens=5)
+        assert "".join(llm.stream("Current question: hi", ROUTER_SYSTEM_PROMPT)) == "general"
+        assert llm.model_used == "mock/up" and llm.last_usage["completion_tokens"] == 2
+    finally:
+        llm_client.set_llm_client_factory(None)
+        set_retry_policy(None)
+        reset_breakers()
+
+
+if __name__ == "__main__":
+    test_breaker_opens_on_error_rate_and_recovers()
+    test_breaker_opens_on_slow_calls()
+    test_failover_chain_per_stage()
+    test_open_breaker_fails_over_immediately()
+    test_stream_fails_over_before_first_chunk()
+    print("✅ All circuit breaker tests passed!")
@@ -0,0 +1,103 @@
+"""
+Shared fixtures for the test scripts
+"""
+
+import os
+import sqlite3
+import tempfile
+
+
+# =======================
+# Databases
+# =======================
+
+
+def make_tenant_db() -> str:
+    """
+    Database file with two tenants (T1: 2 projects / 3 units, T2: 1 project / 1 unit)
+
+    Returns:
+        str: Path of the new database
+    """
+    path = os.path.join(tempfile.mkdtemp(), "tenants.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE projects (project_id TEXT PRIMARY KEY, tenant_id TEXT NOT NULL,
+        project_name TEXT NOT NULL, city TEXT NOT NULL)""")
+    conn.execute("""CREATE TABLE project_units (unit_id TEXT PRIMARY KEY, project_id TEXT,
+        tenant_id TEXT NOT NULL, base_price DECIMAL(15, 2))""")
+    conn.executemany("INSERT INTO projects VALUES (?, ?, ?, ?)", [
+        ("p1", "T1", "Alpha", "Pune"), ("p2", "T1", "Beta", "Pune"), ("p3", "T2", "Gamma", "Pune")
+    ])
+    conn.executemany("INSERT INTO project_units VALUES (?, ?, ?, ?)", [
+        ("u1", "p1", "T1", 100), ("u2", "p1", "T1", 200), ("u3", "p2", "T1", 300), ("u4", "p3", "T2", 400)
+    ])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def make_ingest_db() -> str:
+    """
+    Empty database with the projects / project_units tables
+
+    Returns:
+        str: Path of the new database
+    """
+    path = os.path.join(tempfile.mkdtemp(), "ingest_test.db")
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE projects (project_id TEXT PRIMARY KEY, tenant_id TEXT NOT NULL,
+        project_name TEXT NOT NULL, developer_name TEXT NOT NULL, city TEXT NOT NULL, amenities TEXT,
+        number_of_towers INTEGER, modified_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)""")
+    conn.execute("""CREATE TABLE project_units (unit_id TEXT PRIMARY KEY, project_id TEXT,
+        tenant_id TEXT NOT NULL, base_price DECIMAL(15, 2))""")
+    conn.close()
+    return path
+
+
+# =======================
+# Records
+# =======================
+
+def project_record(project_id: str, **overrides) -> dict:
+    """Valid tenant T1 project for make_ingest_db(), with optional column overrides"""
+    project = {"project_id": project_id, "tenant_id": "T1", "project_name": f"Project {project_id}",
+               "developer_name": "Dev", "city": "Pune"}
+    project.update(overrides)
+    return project
+
+
+def unit_record(unit_id: str, project_id: str, price: int) -> dict:
+    """Valid tenant T1 unit for make_ingest_db()"""
+    return {"unit_id": unit_id, "project_id": project_id, "tenant_id": "T1", "base_price": price}
+
+
+# =======================
+# Import Mappings
+# =======================
+
+# Source layout: Project ID, Project Name, Developer, Location, Amenities, Towers, Unit, Price
+PROJECT_MAPPING = {
+    "table": "projects",
+    "fields": {
+        "project_id": {"source": ["Project ID", "Project Name"], "transform": "slug"},
+        "tenant_id": {"value": "T1"},
+        "project_name": "Project Name",
+        "developer_name": {"source": "Developer", "default": "Unknown"},
+        "city": "Location",
+        "amenities": {"source": "Amenities", "transform": "list"},
+        "number_of_towers": {"source": "Towers", "transform": "integer"}
+    },
+    "skip_unless": ["project_id"]
+}
+
+# unit_id stays empty without a Unit value, so rows without one are skipped
+UNIT_MAPPING = {
+    "table": "project_units",
+    "fields": {
+        "unit_id": {"template": "{Project Name}-{Unit}", "transform": "slug"},
+        "project_id": {"source": "Project Name", "transform": "slug"},
+        "tenant_id": {"value": "T1"},
+        "base_price": {"source": "Price", "transform": "number"}
+    },
+    "skip_unless": ["unit_id"]
+}
@@ -0,0 +1,80 @@
+"""
+Test script for the streaming file importers
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+
+from importers import compile_mapping, import_file, map_row, parse_number
+from test_fixtures import PROJECT_MAPPING, UNIT_MAPPING, make_ingest_db
+
+
+def test_parse_number():
+    assert parse_number("2,178 sq.ft") == 2178.0
+    assert parse_number("₹ 85.5 L") == 85.5
+    assert parse_number(12) == 12.0
+    assert parse_number("TBD") is None
+    assert parse_number(float("nan")) is None
+
+
+def test_map_row_fallbacks_and_defaults():
+    fields = compile_mapping(PROJECT_MAPPING)
+    record = map_row({"Project Name": " Sky Villas ", "Location": "Pune", "Amenities": "Gym; Pool"}, fields)
+    assert record["project_id"] == "sky_villas"
+    assert record["project_name"] == "Sky Villas"
+    assert record["developer_name"] == "Unknown"
+    assert record["amenities"] == ["Gym", "Pool"]
+    assert record["number_of_towers"] is None
+
+    # A template needs every column it references
+    units = compile_mapping(UNIT_MAPPING)
+    assert map_row({"Project Name": "Sky Villas", "Unit": "A-101"}, units)["unit_id"] == "sky_villas_a_101"
+    assert map_row({"Project Name": "Sky Villas", "Unit": " "}, units)["unit_id"] is None
+
+
+def test_csv_import_projects_and_units_in_one_pass():
+    path = make_ingest_db()
+    source = os.path.join(tempfile.mkdtemp(), "inventory.csv")
+    with open(source, "w", encoding="utf-8") as f:
+        f.write("Project Name,Developer,Location,Amenities,Towers,Unit,Price\n")
+        for i in range(25):
+            f.write(f"Project {i % 3},Dev,Pune,\"Gym, Pool\",{i % 3 + 1},{i},\"{i},000\"\n")
+        f.write(",,,,,,\n")                     # Blank row: skipped by both mappings
+        f.write("Section header,,,,,,\n")       # No Unit: skipped as a unit, rejected as a project (no city)
+
+    report = import_file(source, [UNIT_MAPPING, PROJECT_MAPPING], db_path=path, batch_size=7)
+    assert report["units"] == 25
+    assert report["rejected"] == 1
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0] == 3
+    assert conn.execute("SELECT amenities, number_of_towers FROM projects WHERE project_id = 'project_1'") \
+        .fetchone() == ('["Gym", "Pool"]', 2)
+    assert conn.execute("SELECT base_price FROM project_units WHERE unit_id = 'project_2_5'").fetchone()[0] == 5000
+    assert conn.execute("SELECT COUNT(*) FROM project_units WHERE project_id = 'section_header'").fetchone()[0] == 0
+
+
+def test_jsonl_import():
+    path = make_ingest_db()
+    source = os.path.join(tempfile.mkdtemp(), "projects.jsonl")
+    with open(source, "w", encoding="utf-8") as f:
+        for i in range(4):
+            f.write(json.dumps({"Project ID": f"P{i}", "Project Name": f"Tower {i}", "Location": "Chennai",
+                                "Amenities": ["Gym"], "Towers": i}) + "\n")
+        f.write("\n")
+
+    report = import_file(source, PROJECT_MAPPING, db_path=path)
+    assert (report["projects"], report["rejected"]) == (4, 0)
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT project_id, amenities FROM projects ORDER BY project_id").fetchall()[0] == \
+        ("p0", '["Gym"]')
+
+
+if __name__ == "__main__":
+    test_parse_number()
+    test_map_row_fallbacks_and_defaults()
+    test_csv_import_projects_and_units_in_one_pass()
+    test_jsonl_import()
+    print("✅ Importer tests passed!")
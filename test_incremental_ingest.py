@@ -0,0 +1,145 @@
+"""
+Test script for incremental (content-hashed) ingestion
+"""
+
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from incremental_ingest import log_table_reset, read_changes, summarize_changes, sync_records, written_records
+from test_fixtures import make_ingest_db, project_record, unit_record
+
+
+def test_rerun_is_a_no_op():
+    path = make_ingest_db()
+    projects = [project_record("p1"), project_record("p2")]
+    units = [unit_record("u1", "p1", 100), unit_record("u2", "p2", 200)]
+
+    first = sync_records(projects, units, db_path=path)
+    assert first["inserted"] == {"projects": 2, "project_units": 2}
+    assert (first["first_seq"], first["last_seq"]) == (1, 4)
+
+    second = sync_records(projects, units, db_path=path)
+    assert second["unchanged"] == {"projects": 2, "project_units": 2}
+    assert second["first_seq"] is None
+    assert len(read_changes(db_path=path)) == 4
+
+
+def test_updates_and_scoped_deletes():
+    path = make_ingest_db()
+    sync_records([project_record("p1"), project_record("p2"), project_record("x1", city="Mumbai")],
+                 [unit_record("u1", "p1", 100), unit_record("u2", "p1", 150), unit_record("u3", "p2", 200)], db_path=path)
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE projects SET modified_at = '2000-01-01'")
+    conn.commit()
+    since = read_changes(db_path=path)[-1]["seq"]
+
+    # p1 keeps one unit with a new price, p2 disappears from the Pune snapshot
+    report = sync_records([project_record("p1")], [unit_record("u1", "p1", 120)], scope={"city": "Pune"}, db_path=path)
+    assert report["updated"] == {"projects": 0, "project_units": 1}
+    assert report["deleted"] == {"projects": 1, "project_units": 2}
+
+    assert [row[0] for row in conn.execute("SELECT project_id FROM projects ORDER BY 1")] == ["p1", "x1"]
+    assert conn.execute("SELECT unit_id, base_price FROM project_units").fetchall() == [("u1", 120)]
+    assert conn.execute("SELECT modified_at FROM projects WHERE project_id = 'p1'").fetchone()[0] != "2000-01-01"
+
+    changes = read_changes(since, db_path=path)
+    assert [(c["table"], c["op"], c["record_id"]) for c in changes] == [
+        ("project_units", "update", "u1"),
+        ("project_units", "delete", "u2"),
+        ("project_units", "delete", "u3"),
+        ("projects", "delete", "p2")
+    ]
+    assert changes[0]["columns"] == ["base_price"]
+    summary = summarize_changes(changes)
+    assert summary["projects"] == {"p1", "p2"}
+    assert summary["columns"]["project_units"] == {"base_price", "*"}
+
+
+def test_written_records_skip_rejected_and_unchanged():
+    path = make_ingest_db()
+    sync_records([project_record("p1")], [unit_record("u1", "p1", 100)], db_path=path)
+    report = sync_records([project_record("p1"), project_record("p2"), project_record("p3", city=None)],
+                          [unit_record("u1", "p1", 110), unit_record("u2", "p2", 200)], db_path=path)
+    assert report["rejected"] == 1
+    assert written_records(report, db_path=path) == {
+        "projects": {"p2": "inserted"},
+        "project_units": {"u1": "updated", "u2": "inserted"}
+    }
+
+    rerun = sync_records([project_record("p1")], [unit_record("u1", "p1", 110)], db_path=path)
+    assert written_records(rerun, db_path=path) == {"projects": {}, "project_units": {}}
+
+
+def test_rejected_records_are_not_deleted_as_missing():
+    path = make_ingest_db()
+    units = [unit_record("u1", "p1", 100), unit_record("u2", "p2", 200)]
+    sync_records([project_record("p1"), project_record("p2"), project_record("p3")], units, db_path=path)
+
+    # p2 fails validation; p3 is really gone
+    report = sync_records([project_record("p1"), project_record("p2", unknown_column=1)], units,
+                          scope={"city": "Pune"}, db_path=path)
+    assert report["rejected"] == 1 and report["deleted"] == {"projects": 1, "project_units": 0}
+    conn = sqlite3.connect(path)
+    assert [row[0] for row in conn.execute("SELECT project_id FROM projects ORDER BY 1")] == ["p1", "p2"]
+    assert [row[0] for row in conn.execute("SELECT unit_id FROM project_units ORDER BY 1")] == ["u1", "u2"]
+
+    # A rejected record without a key could be any stored row: nothing is deleted
+    report = sync_records([project_record("p1"), project_record(None)], units[:1], scope={"city": "Pune"},
+                          db_path=path)
+    assert report["rejected"] == 1 and report["deleted"] == {"projects": 0, "project_units": 0}
+    assert conn.execute("SELECT COUNT(*) FROM project_units").fetchone()[0] == 2
+
+
+def test_unknown_scope_column_rejected():
+    path = make_ingest_db()
+    try:
+        sync_records([project_record("p1")], scope={"nope": 1}, db_path=path)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+    assert sqlite3.connect(path).execute("SELECT COUNT(*) FROM projects").fetchone()[0] == 0
+
+
+def test_rebuild_logs_a_reset():
+    path = make_ingest_db()
+    sync_records([project_record("p1")], [unit_record("u1", "p1", 100)], db_path=path)
+    since = read_changes(db_path=path)[-1]["seq"]
+
+    # Rebuild the tables the way real_estate_db.py does
+    conn = sqlite3.connect(path)
+    conn.execute("DELETE FROM project_units")
+    conn.execute("DELETE FROM projects")
+    log_table_reset(conn)
+    conn.commit()
+
+    changes = read_changes(since, db_path=path)
+    assert [(c["table"], c["op"], c["record_id"]) for c in changes] == [
+        ("projects", "reset", "*"), ("project_units", "reset", "*")
+    ]
+    assert summarize_changes(changes)["reset"]
+
+    # Hashes went with the rows, so the same records are inserted again
+    report = sync_records([project_record("p1")], [unit_record("u1", "p1", 100)], db_path=path)
+    assert report["inserted"] == {"projects": 1, "project_units": 1}
+
+
+def test_read_changes_path_with_special_characters():
+    directory = os.path.join(tempfile.mkdtemp(), "data #1 ?")
+    os.makedirs(directory)
+    path = shutil.copy(make_ingest_db(), os.path.join(directory, "real estate.db"))
+    sync_records([project_record("p1")], db_path=path)
+    assert [c["record_id"] for c in read_changes(db_path=path)] == ["p1"]
+
+
+if __name__ == "__main__":
+    test_rerun_is_a_no_op()
+    test_updates_and_scoped_deletes()
+    test_written_records_skip_rejected_and_unchanged()
+    test_rejected_records_are_not_deleted_as_missing()
+    test_unknown_scope_column_rejected()
+    test_rebuild_logs_a_reset()
+    test_read_changes_path_with_special_characters()
+    print("✅ Incremental ingest tests passed!")
@@ -0,0 +1,53 @@
+"""
+Test script for the bulk ingest pipeline
+"""
+
+import sqlite3
+
+from ingest import BulkIngestor, ingest_records
+from test_fixtures import make_ingest_db, project_record
+
+
+def test_bulk_load_and_upsert():
+    path = make_ingest_db()
+    units = ({"unit_id": f"u{i}", "project_id": "p1", "tenant_id": "T1", "base_price": i} for i in range(12))
+    report = ingest_records([project_record("p1", amenities=["Gym", "Pool"])], units, db_path=path, batch_size=5)
+    assert (report["projects"], report["units"], report["rejected"]) == (1, 12, 0)
+
+    report = ingest_records([project_record("p1", project_name="Renamed", number_of_towers="4")], db_path=path)
+    assert report["projects"] == 1
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT project_name, number_of_towers, amenities FROM projects").fetchall() == \
+        [("Renamed", 4, '["Gym", "Pool"]')]
+    assert conn.execute("SELECT COUNT(*) FROM project_units").fetchone()[0] == 12
+
+
+def test_invalid_records_rejected():
+    path = make_ingest_db()
+    report = ingest_records(
+        [project_record("p1"), project_record("p2", city=None), project_record("p3", bogus=1)],
+        [{"unit_id": "u1", "tenant_id": "T1", "base_price": "not a price"}],
+        db_path=path
+    )
+    assert (report["projects"], report["units"], report["rejected"]) == (1, 0, 3)
+    assert len(report["errors"]) == 3
+
+
+def test_load_pragmas():
+    path = make_ingest_db()
+    with BulkIngestor(path) as ingestor:
+        assert ingestor.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert ingestor.conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        ingestor.write_batch("projects", [project_record("p1")])
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"  # Persists with the file
+    assert conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0] == 1
+
+
+if __name__ == "__main__":
+    test_bulk_load_and_upsert()
+    test_invalid_records_rejected()
+    test_load_pragmas()
+    print("✅ Ingest tests passed!")
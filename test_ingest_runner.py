@@ -0,0 +1,47 @@
+"""
+Test script for the parallel multi-source ingest runner
+"""
+
+import os
+import sqlite3
+import tempfile
+
+from ingest_runner import run_ingest
+from test_fixtures import PROJECT_MAPPING, UNIT_MAPPING, make_ingest_db
+
+
+def _write_csv(directory: str, name: str, projects: int, units: int) -> str:
+    path = os.path.join(directory, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("Project Name,Developer,Location,Amenities,Towers,Unit,Price\n")
+        for i in range(units):
+            f.write(f"{name} {i % projects},Dev,Pune,Gym,1,{i},{i}\n")
+        f.write(f"{name} broken,Dev,,Gym,1,x,1\n")  # Project rejected (no city), unit x still loaded
+        f.write(f"{name} section,,,,,,\n")           # Section header: no unit, project rejected
+    return path
+
+
+def test_parallel_sources_single_writer():
+    path = make_ingest_db()
+    directory = tempfile.mkdtemp()
+    jobs = [
+        {"path": _write_csv(directory, "a.csv", 3, 40), "mappings": [PROJECT_MAPPING, UNIT_MAPPING]},
+        {"path": _write_csv(directory, "b.csv", 2, 25), "mappings": [PROJECT_MAPPING, UNIT_MAPPING]},
+        {"path": os.path.join(directory, "missing.csv"), "mappings": [PROJECT_MAPPING]}
+    ]
+
+    report = run_ingest(jobs, db_path=path, workers=2, batch_size=10, queue_batches=2)
+    assert report["rejected"] == 4
+    assert report["units"] == 67
+    assert [source["rows"] for source in report["sources"]] == [42, 27, 0]
+    assert report["sources"][2]["error"].startswith("FileNotFoundError")
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(DISTINCT project_id) FROM projects").fetchone()[0] == 5
+    assert conn.execute("SELECT COUNT(*) FROM project_units").fetchone()[0] == 67
+    assert conn.execute("SELECT COUNT(*) FROM project_units WHERE unit_id LIKE '%section%'").fetchone()[0] == 0
+
+
+if __name__ == "__main__":
+    test_parallel_sources_single_writer()
+    print("✅ Ingest runner tests passed!")
@@ -0,0 +1,221 @@
+"""
+Test script for LLM client retries (backoff, Retry-After, retry budget, request deadline), hedging and stage settings
+"""
+
+import email.utils
+import time
+
+import llm_client
+from config import AVAILABLE_MODELS, LLM_TENANT_STAGE_OVERRIDES, ROUTER_SYSTEM_PROMPT
+from llm_client import (
+    FailoverLLM, HedgePolicy, LLMError, OpenRouterLLM, RetryPolicy, create_llm_client, llm_deadline,
+    parse_retry_after, set_hedge_policy, set_retry_policy
+)
+from metrics import end_request, start_request, timed_node
+from mock_llm import FakeLLM, FaultInjector, MockOpenRouterServer
+
+QUIET = {"latency_ms": 0, "ms_per_token": 0, "jitter": 0}
+FAST = {"backoff_base": 0.001, "backoff_cap": 0.001}
+
+
+def _failing(kind: str, failures: int = 1000, retry_after: float = None):
+    """Attempt function failing `failures` times with kind, then answering; records each call's timeout"""
+    timeouts = []
+
+    def attempt(timeout: float) -> str:
+        timeouts.append(timeout)
+        if len(timeouts) <= failures:
+            raise LLMError("failed", kind, retry_after)
+        return "ok"
+
+    return attempt, timeouts
+
+
+def test_retry_after_parsing_and_backoff():
+    assert parse_retry_after("2") == 2.0 and parse_retry_after("-1") == 0.0
+    assert parse_retry_after(None) is None and parse_retry_after("soon") is None
+    in_five = email.utils.formatdate(time.time() + 5, usegmt=True)
+    assert 3 < parse_retry_after(in_five) <= 5
+
+    policy = RetryPolicy(backoff_base=0.5, backoff_cap=4)
+    for retry, ceiling in [(0, 0.5), (1, 1), (2, 2), (3, 4), (6, 4)]:
+        delays = [policy.backoff(retry) for _ in range(200)]
+        assert 0 <= min(delays) and max(delays) <= ceiling and max(delays) > ceiling / 2  # full jitter
+    assert 3 <= policy.backoff(0, retry_after=3) <= 3.5
+
+
+def test_transient_errors_are_retried():
+    policy = RetryPolicy(max_retries=3, **FAST)
+    attempt, timeouts = _failing("503", failures=2)
+    assert policy.call(attempt) == "ok" and len(timeouts) == 3
+
+    attempt, timeouts = _failing("429")
+    try:
+        policy.call(attempt)
+    except LLMError as e:
+        assert e.kind == "429" and len(timeouts) == 4
+    else:
+        raise AssertionError("expected the last 429")
+
+    attempt, timeouts = _failing("401")
+    try:
+        policy.call(attempt)
+    except LLMError:
+        assert len(timeouts) == 1  # Not retryable
+    assert not LLMError("x", "bad_response").retryable and LLMError("x", "timeout").retryable
+
+
+def test_retry_budget_stops_retry_storms():
+    policy = RetryPolicy(max_retries=3, budget_ratio=0.5, budget_burst=1, **FAST)
+    attempts = []
+    for _ in range(4):
+        attempt, timeouts = _failing("503")
+        try:
+            policy.call(attempt)
+        except LLMError:
+            attempts.append(len(timeouts))
+    # One token to start, half a token deposited per call
+    assert attempts == [2, 1, 2, 1]
+
+
+def test_deadline_bounds_attempts_and_waits():
+    policy = RetryPolicy(max_retries=3, **FAST)
+    started = time.monotonic()
+    with llm_deadline(0.2):
+        attempt, timeouts = _failing("429", retry_after=1.0)
+        try:
+            policy.call(attempt)
+        except LLMError as e:
+            assert e.kind == "429"
+    # The 1 s Retry-After would pass the deadline, so no wait happens
+    assert len(timeouts) == 1 and timeouts[0] <= 0.2 and time.monotonic() - started < 0.1
+
+    with llm_deadline(0):
+        attempt, timeouts = _failing("429")
+        try:
+            policy.call(attempt)
+        except LLMError as e:
+            assert e.kind == "deadline" and timeouts == []
+
+
+def test_client_honours_retry_after_from_server():
+    set_retry_policy(RetryPolicy(max_retries=2, **FAST))
+    try:
+        with MockOpenRouterServer({**QUIET, "error_429": 1.0, "retry_after": 0.1}, port=0) as server:
+            llm = OpenRouterLLM("mock/model", api_key="test")
+            llm.base_url = server.url
+            started = time.monotonic()
+            try:
+                llm.invoke("Current question: hello")
+            except LLMError as e:
+                assert e.kind == "429" and e.retry_after == 0.1 and "Rate limit" in str(e)
+            assert server.stats == {"429": 3} and time.monotonic() - started >= 0.2
+    finally:
+        set_retry_policy(None)
+
+
+def _hedged_call(policy: HedgePolicy, latencies_ms: dict) -> tuple:
+    """Invoke a router-stage chain of FakeLLMs with per-model latencies inside a timed node"""
+    injectors = {model: FaultInjector({**QUIET, "latency_ms": ms}) for model, ms in latencies_ms.items()}
+    llm_client.set_llm_client_factory(
+        lambda model_id, temperature=0.3: FakeLLM(model_id, temperature, injector=injectors[model_id])
+    )
+    set_hedge_policy(policy)
+    llm = FailoverLLM(list(latencies_ms), stage="router")
+    node = timed_node("router", lambda state: {"answer": llm.invoke("Current question: hi", ROUTER_SYSTEM_PROMPT)})
+    timer = start_request()
+    started = time.perf_counter()
+    try:
+        assert node({})["answer"] == "general"
+    finally:
+        end_request()
+        set_hedge_policy(None)
+        llm_client.set_llm_client_factory(None)
+    return timer.finish(), llm.model_used, time.perf_counter() - started
+
+
+def test_hedge_threshold_percentile():
+    policy = HedgePolicy(percentile=90, min_samples=10)
+    for ms in range(1, 10):
+        policy.observe("m", "router", ms / 100)
+    assert policy.threshold("m", "router") is None
+    policy.observe("m", "router", 0.10)
+    assert policy.threshold("m", "router") == 0.09 and policy.threshold("m", "sql_gen") is None
+
+
+def test_slow_call_is_hedged_to_fallback():
+    policy = HedgePolicy(min_samples=3, target="fallback")
+    for _ in range(3):
+        policy.observe("mock/slow", "router", 0.02)
+    timings, model_used, elapsed = _hedged_call(policy, {"mock/slow": 400, "mock/fast": 0})
+    assert model_used == "mock/fast" and elapsed < 0.3
+    assert timings["hedges"] == 1 and timings["hedge_wins"] == 1 and policy.stats["sent"] == 1
+
+    denied = HedgePolicy(min_samples=3, budget_ratio=0, budget_burst=0)
+    for _ in range(3):
+        denied.observe("mock/slow", "router", 0.02)
+    timings, model_used, elapsed = _hedged_call(denied, {"mock/slow": 150, "mock/fast": 0})
+    assert model_used == "mock/slow" and elapsed >= 0.15
+    assert timings["hedges"] == 0 and denied.stats == {"sent": 0, "won": 0, "denied": 1}
+
+
+def test_original_can_win():
+    policy = HedgePolicy(min_samples=3, target="same")
+    for _ in range(3):
+        policy.observe("mock/steady", "router", 0.03)
+    timings, model_used, _ = _hedged_call(policy, {"mock/steady": 80})
+    assert model_used == "mock/steady" and timings["hedges"] == 1 and timings["hedge_wins"] == 0
+    # The abandoned hedge still finishes and records its latency
+    time.sleep(0.15)
+    assert len(policy._latencies[("mock/steady", "router")]) == 5
+
+
+class _TimeoutRecordingPolicy(RetryPolicy):
+    """Retry policy remembering the per-attempt timeout of every call"""
+
+    def __init__(self):
+        super().__init__(max_retries=0)
+        self.timeouts = []
+
+    def call(self, attempt, breaker=None, timeout=None):
+        self.timeouts.append(timeout)
+        return super().call(attempt, breaker, timeout)
+
+
+def test_stage_settings_and_tenant_overrides():
+    qwen, deepseek, glm4 = (AVAILABLE_MODELS[key]["id"] for key in ("qwen", "deepseek", "glm4"))
+    router = create_llm_client(qwen, stage="router")
+    assert router.model_id == glm4 and router.temperature == 0.0 and router.max_tokens == 5
+    assert create_llm_client(deepseek, stage="response").model_id == deepseek  # No stage model: the chatbot's
+
+    LLM_TENANT_STAGE_OVERRIDES["tenant-a"] = {"sql_gen": {"model": "deepseek", "max_tokens": 4, "timeout": 5}}
+    policy = _TimeoutRecordingPolicy()
+    llm_client.set_llm_client_factory(
+        lambda model_id, temperature=0.3: FakeLLM(model_id, temperature, injector=FaultInjector(QUIET))
+    )
+    set_retry_policy(policy)
+    try:
+        assert create_llm_client(qwen, stage="sql_gen").model_id == qwen
+        sql_gen = create_llm_client(qwen, stage="sql_gen", tenant_id="tenant-a")
+        assert sql_gen.model_id == deepseek and sql_gen.temperature == 0.0
+
+        # Every model of the chain gets the stage's timeout and max_tokens
+        sql_gen.invoke("Current question: hello")
+        assert policy.timeouts == [5] and sql_gen.last_usage["completion_tokens"] == 4
+    finally:
+        LLM_TENANT_STAGE_OVERRIDES.pop("tenant-a")
+        llm_client.set_llm_client_factory(None)
+        set_retry_policy(None)
+
+
+if __name__ == "__main__":
+    test_retry_after_parsing_and_backoff()
+    test_transient_errors_are_retried()
+    test_retry_budget_stops_retry_storms()
+    test_deadline_bounds_attempts_and_waits()
+    test_client_honours_retry_after_from_server()
+    test_hedge_threshold_percentile()
+    test_slow_call_is_hedged_to_fallback()
+    test_original_can_win()
+    test_stage_settings_and_tenant_overrides()
+    print("✅ All LLM client tests passed!")
@@ -0,0 +1,88 @@
+"""
+Test script for pipeline timing instrumentation and metrics sinks
+"""
+
+from config import ROUTER_SYSTEM_PROMPT
+from answer_cache import answer_cache
+from chatbot_core import RealEstateChatbot
+from llm_client import OpenRouterLLM
+from metrics import (
+    InMemorySink, add_metrics_sink, end_request, record_llm_call,
+    remove_metrics_sink, start_request, timed_node
+)
+from mock_llm import MockOpenRouterServer, install_fake_llm, uninstall_fake_llm
+
+QUIET = {"latency_ms": 0, "ms_per_token": 0, "jitter": 0}
+
+
+def test_timed_node_records_only_inside_a_request():
+    def node(state):
+        record_llm_call(12.5, {"prompt_tokens": 100, "completion_tokens": 7})
+        return {"retry_count": state["retry_count"] + 1}
+
+    wrapped = timed_node("sql_gen", node)
+    assert wrapped({"retry_count": 0}) == {"retry_count": 1}
+
+    timer = start_request()
+    try:
+        wrapped({"retry_count": 0})
+        wrapped({"retry_count": 1})
+        record_llm_call(1.0, None)  # Between nodes: not attributed
+    finally:
+        end_request()
+
+    timings = timer.finish()
+    assert [n["retry_count"] for n in timings["nodes"]] == [1, 2]
+    assert timings["llm_calls"] == 2 and timings["llm_ms"] == 25.0
+    assert (timings["prompt_tokens"], timings["completion_tokens"]) == (200, 14)
+    assert timings["retries"] == 1 and timings["rows"] is None
+
+
+def test_openrouter_usage_is_captured():
+    with MockOpenRouterServer(QUIET, port=0) as server:
+        llm = OpenRouterLLM("mock/model", api_key="test")
+        llm.base_url = server.url
+        timer = start_request()
+        try:
+            timed_node("router", lambda state: {"query_type": llm.invoke("Current question: hello", ROUTER_SYSTEM_PROMPT)})({})
+        finally:
+            end_request()
+
+    assert llm.last_usage["completion_tokens"] == 2 and llm.last_usage["prompt_tokens"] > 0
+    node = timer.finish()["nodes"][0]
+    assert node["llm_calls"] == 1 and node["prompt_tokens"] == llm.last_usage["prompt_tokens"]
+
+
+def test_ask_returns_timings_and_feeds_sinks():
+    sink = InMemorySink()
+    add_metrics_sink(sink)
+    install_fake_llm(QUIET)
+    answer_cache.clear()
+    try:
+        chatbot = RealEstateChatbot()
+        response = chatbot.ask("How many projects are there?", preserve_history=False)
+        timings = response["timings"]
+        assert [n["node"] for n in timings["nodes"]] == ["router", "sql_gen", "scope_sql", "validate_sql",
+                                                          "execute_sql", "response"]
+        execute = timings["nodes"][4]
+        assert execute["rows"] == 1 and execute["llm_calls"] == 0 and timings["rows"] == 1
+        assert timings["llm_calls"] == 3 and timings["prompt_tokens"] > timings["completion_tokens"] > 0
+        assert timings["total_ms"] >= sum(n["wall_ms"] for n in timings["nodes"])
+        assert not timings["answer_cache_hit"] and timings["retries"] == 0
+
+        cached = chatbot.ask("How many projects are there?", preserve_history=False)["timings"]
+        assert cached["answer_cache_hit"] and cached["nodes"] == [] and cached["llm_calls"] == 0
+
+        assert [labels["query_type"] for _, labels in sink.entries] == ["data", "data"]
+        assert sink.entries[0][0] is timings and sink.entries[0][1]["error"] is None
+    finally:
+        uninstall_fake_llm()
+        remove_metrics_sink(sink)
+        answer_cache.clear()
+
+
+if __name__ == "__main__":
+    test_timed_node_records_only_inside_a_request()
+    test_openrouter_usage_is_captured()
+    test_ask_returns_timings_and_feeds_sinks()
+    print("✅ All metrics tests passed!")
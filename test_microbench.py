@@ -0,0 +1,34 @@
+"""
+Test script for the database / fuzzy-matching micro-benchmarks
+"""
+
+import os
+import tempfile
+
+from microbench import dataset_path, run_micro_benchmarks, time_call
+
+
+def test_time_call():
+    stats = time_call(lambda: [1, 2, 3], repeats=3, min_seconds=0.01)
+    assert stats["calls"] > 1 and stats["output_size"] == 3
+    assert 0 < stats["best_us"] <= stats["median_us"]
+
+
+def test_runs_each_size_against_its_own_database():
+    data_dir = tempfile.mkdtemp()
+    report = run_micro_benchmarks((300, 600), seed=2, data_dir=data_dir, only=("get_schema", "find_matching_projects"))
+
+    assert set(report["sizes"]) == {300, 600}
+    assert set(report["sizes"][300]) == {"get_schema", "get_schema.tenant", "find_matching_projects"}
+    assert report["sizes"][600]["find_matching_projects"]["median_us"] > 0
+    assert set(report["scaling"]) == set(report["sizes"][300])
+
+    # Generated once, reused afterwards
+    path = dataset_path(300, seed=2, data_dir=data_dir)
+    assert os.path.basename(path) == "synthetic_300_2.db" and not os.path.exists(f"{path}.building")
+
+
+if __name__ == "__main__":
+    test_time_call()
+    test_runs_each_size_against_its_own_database()
+    print("✅ All micro-benchmark tests passed!")
@@ -0,0 +1,115 @@
+"""
+Test script for the offline LLM stand-in
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+
+import requests
+
+from config import ROUTER_SYSTEM_PROMPT, SQL_GENERATOR_SYSTEM_PROMPT, RESPONSE_SYSTEM_PROMPT
+import llm_client
+from llm_client import LLMError, OpenRouterLLM, RetryPolicy, create_llm_client, set_retry_policy
+from mock_llm import (
+    FakeLLM, FaultInjector, MockOpenRouterServer, MockResponder,
+    generate_sql, install_fake_llm, uninstall_fake_llm
+)
+from synthetic_data import generate_database
+
+QUIET = {"latency_ms": 0, "ms_per_token": 0, "jitter": 0}
+
+
+def test_stage_rules():
+    responder = MockResponder()
+    router = "\nRecent conversation:\nNone\n\nCurrent question: {}\n\nClassification:"
+    assert responder.complete(router.format("Hello!"), ROUTER_SYSTEM_PROMPT) == "general"
+    assert responder.complete(router.format("How many projects in Pune?"), ROUTER_SYSTEM_PROMPT) == "data"
+
+    sql = responder.complete("User question: How many projects in Pune?\n\nSQL query:", SQL_GENERATOR_SYSTEM_PROMPT + "\n")
+    assert sql == "SELECT COUNT(*) FROM projects WHERE UPPER(city) LIKE '%PUNE%'"
+
+    answer = responder.complete("User question: x\n\nSQL Query executed: y\nResults: 1 row\nCOUNT(*)\n42\n\n"
+                                "Provide a clear, concise answer:", RESPONSE_SYSTEM_PROMPT)
+    assert answer == "The answer is 42."
+
+
+def test_template_sql_runs_on_the_real_schema():
+    path = os.path.join(tempfile.mkdtemp(), "synthetic.db")
+    generate_database(path, 400, seed=5)
+    conn = sqlite3.connect(path)
+    for question in ["How many projects are there?", "How many projects are under construction?",
+                     "What is the average price of 3 BHK in Bangalore?", "Show the cheapest 2BHK units in Pune",
+                     "List projects by Brigade", "Which projects have a swimming pool?",
+                     "Show all projects in Chennai", "Something else entirely"]:
+        conn.execute(generate_sql(question)).fetchall()
+
+
+def test_faults_are_seeded():
+    profile = {**QUIET, "error_429": 0.3, "error_5xx": 0.2, "seed": 11}
+    first, second = FaultInjector(profile), FaultInjector(profile)
+    sequence = [first.draw_fault() for _ in range(200)]
+    assert sequence == [second.draw_fault() for _ in range(200)]
+    assert 40 < sequence.count("429") < 80 and 20 < sequence.count("5xx") < 60
+
+    llm = FakeLLM("mock", injector=FaultInjector({**QUIET, "error_429": 1.0, "retry_after": 0}))
+    set_retry_policy(RetryPolicy(max_retries=1, backoff_base=0.001))
+    try:
+        llm.invoke("hi")
+    except LLMError as e:
+        assert "Rate limit" in str(e) and e.kind == "429" and llm.last_error == "429"
+    else:
+        raise AssertionError("expected a rate limit error")
+    finally:
+        set_retry_policy(None)
+
+
+def test_install_fake_llm():
+    install_fake_llm(QUIET)
+    try:
+        llm = create_llm_client("qwen/qwen-2.5-72b-instruct")
+        assert isinstance(llm, FakeLLM)
+        assert llm.invoke("Current question: hi", ROUTER_SYSTEM_PROMPT) == "general"
+        assert llm.last_usage["completion_tokens"] == 2
+        assert "".join(llm.stream("Current question: hi", ROUTER_SYSTEM_PROMPT)) == "general"
+    finally:
+        uninstall_fake_llm()
+    assert llm_client._client_factory is None
+
+
+def test_http_server():
+    with MockOpenRouterServer(QUIET, port=0) as server:
+        llm = OpenRouterLLM("mock/model", api_key="test")
+        llm.base_url = server.url
+        assert llm.invoke("Current question: hello", ROUTER_SYSTEM_PROMPT) == "general"
+
+        payload = {"model": "mock/model", "stream": True, "messages": [
+            {"role": "system", "content": SQL_GENERATOR_SYSTEM_PROMPT},
+            {"role": "user", "content": "User question: How many projects in Pune?"}
+        ]}
+        response = requests.post(server.url, json=payload, headers={"Authorization": "Bearer test"}, stream=True)
+        chunks = [json.loads(line[6:]) for line in response.iter_lines(decode_unicode=True)
+                  if line.startswith("data: ") and line != "data: [DONE]"]
+        text = "".join(chunk["choices"][0]["delta"].get("content", "") for chunk in chunks)
+        assert text.startswith("SELECT COUNT(*) FROM projects")
+        assert chunks[-1]["usage"]["completion_tokens"] == len(chunks) - 1
+
+        response = requests.post(server.url, json={**payload, "stream": False, "max_tokens": 3},
+                                 headers={"Authorization": "Bearer test"}).json()
+        assert response["choices"][0]["finish_reason"] == "length"
+        assert response["choices"][0]["message"]["content"] == "SELECT COUN"  # 3 tokens of <= 4 characters
+
+    with MockOpenRouterServer({**QUIET, "error_429": 1.0, "retry_after": 2}, port=0) as server:
+        response = requests.post(server.url, json=payload, headers={"Authorization": "Bearer test"})
+        assert response.status_code == 429 and response.headers["Retry-After"] == "2"
+        assert server.stats == {"429": 1}
+
+
+if __name__ == "__main__":
+    test_stage_rules()
+    test_template_sql_runs_on_the_real_schema()
+    test_faults_are_seeded()
+    test_install_fake_llm()
+    test_http_server()
+    print("✅ Mock LLM tests passed!")
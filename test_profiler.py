@@ -0,0 +1,100 @@
+"""
+Test script for the per-request stack-sampling profiler and its folded-stack aggregation
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from config import PROFILE_DIR, PROFILE_SAMPLE_RATE
+from answer_cache import answer_cache
+from chatbot_core import RealEstateChatbot
+from mock_llm import install_fake_llm, uninstall_fake_llm
+from profiler import aggregate, configure_profiling, format_folded, load_profiles, profile_request, should_profile
+
+
+def _waits_on_network():
+    time.sleep(0.05)
+
+
+def _burns_cpu():
+    deadline = time.perf_counter() + 0.05
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _work():
+    _waits_on_network()
+    _burns_cpu()
+
+
+def test_profile_request_samples_below_the_caller():
+    directory = tempfile.mkdtemp()
+    configure_profiling(directory=directory)
+    try:
+        with profile_request("abc123", interval_ms=2, question="q") as stored:
+            _work()
+    finally:
+        configure_profiling(directory=PROFILE_DIR)
+
+    assert stored["path"] == os.path.join(directory, "abc123.json")
+    with open(stored["path"], encoding="utf-8") as f:
+        profile = json.load(f)
+    assert profile["metadata"] == {"question": "q"} and profile["samples"] > 10
+    # Sleeping counts as wall time only; the spin loop as CPU time too
+    assert profile["wall_ms"] >= 100 and 30 < profile["cpu_ms"] < profile["wall_ms"]
+
+    stacks = profile["stacks"]
+    assert all(stack.startswith("test_profile_request_samples_below_the_caller (") for stack in stacks)
+    assert any("_work (" in stack and "_waits_on_network (" in stack for stack in stacks)
+    assert any("_burns_cpu (" in stack for stack in stacks)
+
+
+def test_sampling_decision():
+    configure_profiling(sample_rate=0.0)
+    assert should_profile(True) and not should_profile(None)
+    configure_profiling(sample_rate=1.0)
+    try:
+        assert should_profile(None) and not should_profile(False)
+    finally:
+        configure_profiling(sample_rate=PROFILE_SAMPLE_RATE)
+
+
+def test_ask_stores_profile_under_trace_id():
+    directory = tempfile.mkdtemp()
+    configure_profiling(directory=directory)
+    install_fake_llm({"latency_ms": 20, "ms_per_token": 0, "jitter": 0})
+    answer_cache.clear()
+    try:
+        chatbot = RealEstateChatbot()
+        profiled = chatbot.ask("How many projects in Pune?", preserve_history=False, profile=True)
+        unprofiled = chatbot.ask("How many projects in Mumbai?", preserve_history=False, profile=False)
+    finally:
+        uninstall_fake_llm()
+        answer_cache.clear()
+        configure_profiling(directory=PROFILE_DIR)
+
+    assert unprofiled["profile_path"] is None
+    assert profiled["profile_path"] == os.path.join(directory, f"{profiled['trace_id']}.json")
+    [profile] = load_profiles([directory])
+    assert profile["trace_id"] == profiled["trace_id"] and profile["metadata"]["question"].endswith("Pune?")
+    assert all(stack.startswith("ask (chatbot_core.py:") for stack in profile["stacks"])
+    assert any("router_node (" in stack for stack in profile["stacks"])
+
+
+def test_aggregate_to_folded_milliseconds():
+    profiles = [
+        {"wall_ms": 50.0, "interval_ms": 5, "stacks": {"ask;router": 4, "ask;response": 2}},
+        {"wall_ms": 900.0, "interval_ms": 10, "stacks": {"ask;router": 3}}
+    ]
+    assert format_folded(aggregate(profiles)) == "ask;response 10\nask;router 50\n"
+    assert format_folded(aggregate(profiles, min_wall_ms=100)) == "ask;router 30\n"
+
+
+if __name__ == "__main__":
+    test_profile_request_samples_below_the_caller()
+    test_sampling_decision()
+    test_ask_stores_profile_under_trace_id()
+    test_aggregate_to_folded_milliseconds()
+    print("✅ All profiler tests passed!")
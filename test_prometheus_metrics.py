@@ -0,0 +1,99 @@
+"""
+Test script for the in-process Prometheus registry and metrics sink
+"""
+
+import time
+
+from answer_cache import answer_cache
+from chatbot_core import RealEstateChatbot
+from circuit_breaker import reset_breakers
+from llm_client import RetryPolicy, failover_chain, set_retry_policy, stage_model
+from metrics import add_metrics_sink, remove_metrics_sink
+from mock_llm import install_fake_llm, uninstall_fake_llm
+from prometheus_metrics import (
+    Counter, Gauge, Histogram, Registry,
+    LLM_ERRORS, NODE_LATENCY, REQUESTS, RESULT_CACHE_LOOKUPS, SQL_ATTEMPTS, SQL_RETRIES, prometheus_sink
+)
+
+QUIET = {"latency_ms": 0, "ms_per_token": 0, "jitter": 0}
+
+
+def test_exposition_format():
+    registry = Registry()
+    latency = registry.register(Histogram("t_seconds", "Latency", ["node"], buckets=(0.1, 1)))
+    errors = registry.register(Counter("t_errors_total", "Errors", ["status"]))
+    in_flight = registry.register(Gauge("t_in_flight", "In flight"))
+    latency.observe(0.05, node="router")
+    latency.observe(0.5, node="router")
+    latency.observe(5, node="router")
+    errors.inc(status="429")
+    errors.inc(2, status='5"x')
+    with in_flight.track_in_progress():
+        text = registry.render()
+
+    assert '# TYPE t_seconds histogram' in text
+    assert 't_seconds_bucket{node="router",le="0.1"} 1' in text
+    assert 't_seconds_bucket{node="router",le="1.0"} 2' in text
+    assert 't_seconds_bucket{node="router",le="+Inf"} 3' in text
+    assert 't_seconds_count{node="router"} 3' in text and 't_seconds_sum{node="router"} 5.55' in text
+    assert 't_errors_total{status="5\\"x"} 2' in text
+    assert "t_in_flight 1" in text and in_flight.value() == 0
+
+
+def test_sink_counts_pipeline_outcomes():
+    add_metrics_sink(prometheus_sink)
+    answer_cache.clear()
+    attempts, retries, limited = SQL_ATTEMPTS.value(), SQL_RETRIES.value(), LLM_ERRORS.value(status="429")
+    lookups = RESULT_CACHE_LOOKUPS.value(result="hit") + RESULT_CACHE_LOOKUPS.value(result="miss")
+    try:
+        install_fake_llm(QUIET)
+        chatbot = RealEstateChatbot(model_id="mock/ok")
+        chatbot.ask("How many projects are there?", preserve_history=False)
+        chatbot.ask("How many projects are there?", preserve_history=False)
+
+        install_fake_llm({**QUIET, "error_429": 1.0, "retry_after": 0})
+        set_retry_policy(RetryPolicy(max_retries=1, backoff_base=0.001, budget_burst=100))
+        RealEstateChatbot(model_id="mock/limited").ask("List projects by Brigade", preserve_history=False)
+    finally:
+        uninstall_fake_llm()
+        set_retry_policy(None)
+        reset_breakers()
+        remove_metrics_sink(prometheus_sink)
+        answer_cache.clear()
+
+    assert REQUESTS.value(model="mock/ok", query_type="data", outcome="ok") == 1
+    assert REQUESTS.value(model="mock/ok", query_type="data", outcome="cached") == 1
+    assert REQUESTS.value(model="mock/limited", query_type="data", outcome="error") == 1
+    # Router plus MAX_SQL_RETRIES generations fail (each attempted twice on every model of the
+    # stage's failover chain); the response stage then answers without the LLM
+    chain = lambda stage: failover_chain(stage_model("mock/limited", stage), stage)
+    models = len(chain("router")) + 2 * len(chain("sql_gen"))
+    assert LLM_ERRORS.value(status="429") - limited == 2 * models
+    assert SQL_ATTEMPTS.value() - attempts == 3 and SQL_RETRIES.value() - retries == 1
+    assert NODE_LATENCY.count(node="execute_sql") >= 1
+    assert RESULT_CACHE_LOOKUPS.value(result="hit") + RESULT_CACHE_LOOKUPS.value(result="miss") - lookups == 1
+
+
+def test_sink_is_cheap():
+    timings = {"total_ms": 1200.0, "answer_cache_hit": False, "llm_ms": 1100.0, "llm_calls": 3,
+               "prompt_tokens": 1500, "completion_tokens": 60, "llm_errors": [], "hedges": 1, "hedge_wins": 1,
+               "retries": 0, "rows": 3,
+               "result_cache_hits": 0, "nodes": [
+                   {"node": name, "wall_ms": 100.0, "llm_ms": 90.0, "llm_calls": 1, "prompt_tokens": 500,
+                    "completion_tokens": 20, "llm_errors": [], "hedges": 0, "hedge_wins": 0, "retry_count": 0,
+                    "db_ms": 1.0,
+                    "rows": 3 if name == "execute_sql" else None,
+                    "result_cache_hit": False if name == "execute_sql" else None}
+                   for name in ("router", "sql_gen", "scope_sql", "validate_sql", "execute_sql", "response")]}
+    labels = {"model_id": "bench", "tenant_id": None, "query_type": "data", "error": None}
+    started = time.perf_counter()
+    for _ in range(1000):
+        prometheus_sink(timings, labels)
+    assert (time.perf_counter() - started) / 1000 < 0.001
+
+
+if __name__ == "__main__":
+    test_exposition_format()
+    test_sink_counts_pipeline_outcomes()
+    test_sink_is_cheap()
+    print("✅ All Prometheus metrics tests passed!")
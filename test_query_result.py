@@ -0,0 +1,45 @@
+"""
+Test script for the column-aware QueryResult
+"""
+
+from query_result import QueryResult, np
+
+DESCRIPTION = (("project_name",) + (None,) * 6, ("units",) + (None,) * 6, ("price",) + (None,) * 6)
+ROWS = [("Alpha", 3, 1.5), ("Beta", None, 2.0)]
+
+
+def test_behaves_like_a_list_of_tuples():
+    result = QueryResult(DESCRIPTION, ROWS)
+    assert len(result) == 2 and bool(result)
+    assert result[0] == ("Alpha", 3, 1.5) and result[0][0] == "Alpha"
+    assert list(result) == ROWS
+    assert result == ROWS
+    assert not QueryResult(DESCRIPTION, [])
+    assert result.columns == ["project_name", "units", "price"]
+
+
+def test_as_dicts():
+    rows = list(QueryResult(DESCRIPTION, ROWS).as_dicts())
+    assert rows[0]["project_name"] == "Alpha" and rows[1]["units"] is None
+    assert dict(rows[1]) == {"project_name": "Beta", "units": None, "price": 2.0}
+
+
+def test_to_columns():
+    result = QueryResult(DESCRIPTION, ROWS)
+    columns = result.to_columns(numpy=False)
+    assert columns == {"project_name": ["Alpha", "Beta"], "units": [3, None], "price": [1.5, 2.0]}
+    assert result.column_types() == {"project_name": "text", "units": "integer", "price": "real"}
+    assert QueryResult(DESCRIPTION, []).to_columns() == {"project_name": [], "units": [], "price": []}
+
+    if np is not None:
+        arrays = result.to_columns()
+        assert arrays["project_name"] == ["Alpha", "Beta"]
+        assert arrays["units"].dtype == np.float64 and np.isnan(arrays["units"][1])  # NULL in an integer column
+        assert arrays["price"].tolist() == [1.5, 2.0]
+
+
+if __name__ == "__main__":
+    test_behaves_like_a_list_of_tuples()
+    test_as_dicts()
+    test_to_columns()
+    print("✅ QueryResult tests passed!")
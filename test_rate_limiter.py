@@ -0,0 +1,111 @@
+"""
+Test script for the per-model rate limiter: token buckets, in-flight cap, bounded queue and metrics
+"""
+
+import threading
+import time
+
+from llm_client import LLMError
+from mock_llm import FakeLLM, FaultInjector
+from prometheus_metrics import Gauge
+from rate_limiter import LimiterRejected, ModelLimiter, limiter_for, queue_depths, set_limiter
+
+QUIET = {"latency_ms": 0, "ms_per_token": 0, "jitter": 0}
+
+
+def _in_thread(fn) -> threading.Thread:
+    thread = threading.Thread(target=fn)
+    thread.start()
+    return thread
+
+
+def test_requests_per_second():
+    limiter = ModelLimiter(requests_per_second=20)
+    for _ in range(20):
+        limiter.acquire().release()  # One second's burst
+    permit = limiter.acquire()
+    assert 0.03 < permit.waited < 0.2
+    permit.release()
+
+
+def test_tokens_per_minute_reconciles_usage():
+    limiter = ModelLimiter(tokens_per_minute=6000)  # 100 tokens/s
+    limiter.acquire(6000).release(used_tokens=3000)  # Overestimated: half is given back
+    assert limiter.acquire(2000).waited < 0.01
+
+    limiter.acquire(1000).release()
+    permit = limiter.acquire(50)
+    assert permit.waited > 0.3
+
+
+def test_in_flight_cap_and_bounded_queue():
+    limiter = ModelLimiter(max_in_flight=1, max_queue=1)
+    first = limiter.acquire()
+    admitted = []
+    waiter = _in_thread(lambda: admitted.append(limiter.acquire(timeout=2)))
+    while limiter.queued == 0:
+        time.sleep(0.001)
+
+    try:
+        limiter.acquire()
+    except LimiterRejected as e:
+        assert e.kind == "queue_full" and limiter.rejected["queue_full"] == 1
+    else:
+        raise AssertionError("expected a fast fail")
+
+    first.release()
+    waiter.join()
+    assert admitted and limiter.in_flight == 1 and limiter.queued == 0
+    try:
+        limiter.acquire(timeout=0.05)
+    except LimiterRejected as e:
+        assert e.kind == "queue_timeout" and e.waited >= 0.05
+    admitted[0].release()
+    assert limiter.in_flight == 0
+
+
+def test_retry_after_pauses_the_model():
+    limiter = ModelLimiter()
+    limiter.acquire().release(retry_after=0.1)
+    assert limiter.acquire().waited >= 0.08
+
+
+def test_clients_share_a_limiter_per_model():
+    set_limiter("mock/busy", ModelLimiter(max_in_flight=1, max_queue=0))
+    injector = FaultInjector({**QUIET, "latency_ms": 150})
+    errors = []
+
+    def call():
+        try:
+            FakeLLM("mock/busy", injector=injector).invoke("Current question: hi")
+        except LLMError as e:
+            errors.append(e)
+
+    try:
+        first = _in_thread(call)
+        while limiter_for("mock/busy").in_flight == 0:
+            time.sleep(0.001)
+        call()
+        first.join()
+    finally:
+        set_limiter("mock/busy", None)
+
+    assert len(errors) == 1 and errors[0].kind == "queue_full" and "too many requests" in str(errors[0])
+    assert "mock/busy" not in queue_depths()
+
+
+def test_labelled_gauge_function():
+    gauge = Gauge("llm_queue_depth", "Waiting calls", ["model"])
+    gauge.set_function(lambda: {("b",): 2, ("a",): 0})
+    assert gauge.render()[2:] == ['llm_queue_depth{model="a"} 0', 'llm_queue_depth{model="b"} 2']
+    assert gauge.value(model="b") == 2 and gauge.value(model="c") == 0
+
+
+if __name__ == "__main__":
+    test_requests_per_second()
+    test_tokens_per_minute_reconciles_usage()
+    test_in_flight_cap_and_bounded_queue()
+    test_retry_after_pauses_the_model()
+    test_clients_share_a_limiter_per_model()
+    test_labelled_gauge_function()
+    print("✅ All rate limiter tests passed!")
@@ -0,0 +1,59 @@
+"""
+Test script for the executed-result cache
+"""
+
+import time
+
+from database import ResultCache
+from query_result import QueryResult
+from sql_rewriter import canonicalize_sql
+
+
+def _result(value: str) -> QueryResult:
+    return QueryResult([("name", None, None, None, None, None, None)], [(value,)])
+
+
+def test_hit_and_miss_counts():
+    cache = ResultCache(max_bytes=10_000, ttl=60)
+    assert cache.get("a") is None
+    cache.put("a", _result("x"))
+    assert cache.get("a")[0] == ("x",)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_lru_eviction_by_bytes():
+    one_entry = 64 + 56 + 49 + 100
+    cache = ResultCache(max_bytes=one_entry * 2, ttl=60)
+    cache.put("a", _result("a" * 100))
+    cache.put("b", _result("b" * 100))
+    cache.get("a")  # "b" becomes least recently used
+    cache.put("c", _result("c" * 100))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry():
+    cache = ResultCache(max_bytes=10_000, ttl=0.01)
+    cache.put("a", _result("x"))
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_cache_key_keeps_quoted_tokens():
+    assert canonicalize_sql("SELECT *  FROM projects -- all\n;") == canonicalize_sql("select * from PROJECTS")
+    # Double-quoted values fall back to string literals in SQLite, so case matters
+    assert canonicalize_sql('SELECT * FROM projects WHERE city = "PUNE"') != \
+        canonicalize_sql('SELECT * FROM projects WHERE city = "Pune"')
+    assert canonicalize_sql("SELECT 'Pune'") != canonicalize_sql("SELECT 'PUNE'")
+
+
+if __name__ == "__main__":
+    test_hit_and_miss_counts()
+    test_lru_eviction_by_bytes()
+    test_ttl_expiry()
+    test_cache_key_keeps_quoted_tokens()
+    print("✅ Result cache tests passed!")
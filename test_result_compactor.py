@@ -0,0 +1,50 @@
+"""
+Test script for SQL result compaction
+"""
+
+from result_compactor import compact_results
+
+
+def test_drops_empty_and_hoists_constant_columns():
+    columns = ["project_name", "city", "amenities", "notes"]
+    rows = [("Alpha", "Pune", "[]", None), ("Beta", "Pune", "", None)]
+    text = compact_results(columns, rows)
+    assert text.splitlines() == [
+        "2 rows",
+        "empty in all rows: amenities, notes",
+        "all rows: city=Pune",
+        "project_name",
+        "Alpha",
+        "Beta",
+    ]
+
+
+def test_merges_identical_rows():
+    rows = [("2BHK", 100), ("2BHK", 100), ("3BHK", 150), ("2BHK", 100)]
+    lines = compact_results(["unit_type", "price"], rows).splitlines()
+    assert lines[2:] == ["2BHK|100 (x3)", "3BHK|150"]
+
+
+def test_caps_rows_and_marks_truncation():
+    rows = [(f"P{i}", i) for i in range(10)]
+    lines = compact_results(["project_name", "units"], rows, max_rows=3).splitlines()
+    assert lines[0] == "10 rows"
+    assert lines[-1] == "... 7 more rows"
+    assert len(lines) == 1 + 1 + 3 + 1
+
+    assert compact_results(["project_name", "units"], rows, truncated=True).startswith("10+ rows")
+    assert compact_results(["project_name"], []) == "0 rows"
+
+
+def test_small_floats_keep_precision():
+    rows = [("A", 0.004, 12500000.0), ("B", 0.125, 2.456)]
+    lines = compact_results(["project_name", "ratio", "price"], rows).splitlines()
+    assert lines[2:] == ["A|0.004|12500000", "B|0.125|2.46"]
+
+
+if __name__ == "__main__":
+    test_drops_empty_and_hoists_constant_columns()
+    test_merges_identical_rows()
+    test_caps_rows_and_marks_truncation()
+    test_small_floats_keep_precision()
+    print("✅ Result compactor tests passed!")
@@ -0,0 +1,83 @@
+"""
+Test script for SQL extraction from completions and early termination of streamed SQL generation
+"""
+
+import time
+
+from config import SQL_GENERATOR_SYSTEM_PROMPT
+from mock_llm import FakeLLM, FaultInjector, MockOpenRouterServer
+from llm_client import OpenRouterLLM
+from sql_extraction import complete_sql, extract_sql, stream_sql
+
+QUIET = {"latency_ms": 0, "ms_per_token": 0, "jitter": 0}
+QUESTION = "User question: How many projects in Pune?"
+
+
+def test_complete_statement_detection():
+    assert complete_sql("SELECT COUNT(*) FROM projects") is None
+    assert complete_sql("SELECT COUNT(*) FROM projects;") == "SELECT COUNT(*) FROM projects"
+    # Semicolons inside literals do not end the statement
+    assert complete_sql("SELECT * FROM projects WHERE project_name LIKE '%a;b") is None
+    assert complete_sql("SELECT 1 WHERE 'a;b' = 'a;b'; -- done") == "SELECT 1 WHERE 'a;b' = 'a;b'"
+
+    preamble = "Let me think about the tables.\n\nHere is the query:\n```sql\nSELECT 1 FROM projects"
+    assert complete_sql(preamble) is None
+    assert complete_sql(preamble + "\n```\nThis query") == "SELECT 1 FROM projects"
+    assert complete_sql("I will select the rows.\nSELECT 2 FROM projects;\nExplanation") == "SELECT 2 FROM projects"
+
+
+def test_extract_finished_completion():
+    assert extract_sql("```sql\nSELECT 1 FROM projects\n```") == "SELECT 1 FROM projects"
+    assert extract_sql("```sql\nSELECT 1 FROM `projects`") == "SELECT 1 FROM projects"  # Cut off by a stop sequence
+    assert extract_sql("  SELECT 1 FROM projects  ") == "SELECT 1 FROM projects"
+    assert extract_sql("I cannot answer that.") == "I cannot answer that."
+
+
+def test_prose_preamble_is_not_sql():
+    fenced = "Select the projects that are in Pune; then count them.\n```sql\nSELECT COUNT(*) FROM projects;\n```"
+    assert complete_sql(fenced) == "SELECT COUNT(*) FROM projects"
+    assert complete_sql("With that in mind; here is the query:\n```sql\nSELECT 1") is None
+    assert extract_sql("With that in mind, here it is.\nSELECT 1 FROM projects") == "SELECT 1 FROM projects"
+
+    prose = (token for token in ["Select the projects that match; ", "then count them.\n", "```sql\n", "SELECT 2 FROM projects;", "\n```"])
+    assert stream_sql(prose) == "SELECT 2 FROM projects"
+
+
+def test_stream_stops_at_complete_statement():
+    llm = FakeLLM("mock/model", injector=FaultInjector({**QUIET, "preamble": True}))
+    sql = stream_sql(llm.stream(QUESTION, SQL_GENERATOR_SYSTEM_PROMPT))
+    assert sql.startswith("SELECT COUNT(*) FROM projects") and "```" not in sql and not sql.endswith(";")
+
+    full = FakeLLM("mock/model", injector=FaultInjector({**QUIET, "preamble": True}))
+    assert "".join(full.stream(QUESTION, SQL_GENERATOR_SYSTEM_PROMPT)).endswith("as required.")
+    # The trailing explanation was never generated
+    assert llm.last_usage["completion_tokens"] < full.last_usage["completion_tokens"] - 5
+
+
+def test_http_stream_is_closed_early():
+    with MockOpenRouterServer({**QUIET, "preamble": True, "ms_per_token": 5}, port=0) as server:
+        llm = OpenRouterLLM("mock/model", api_key="test")
+        llm.base_url = server.url
+        sql = stream_sql(llm.stream(QUESTION, SQL_GENERATOR_SYSTEM_PROMPT, max_tokens=200))
+        assert sql.startswith("SELECT COUNT(*) FROM projects") and "```" not in sql
+        assert 0 < llm.last_usage["completion_tokens"] < 200
+
+        # The server notices the closed connection while writing the remaining tokens
+        waited = 0.0
+        while "cancelled" not in server.stats and waited < 2:
+            time.sleep(0.02)
+            waited += 0.02
+        assert server.stats.get("cancelled") == 1
+
+        # Stop sequences are sent to the provider
+        completion = llm.invoke(QUESTION, SQL_GENERATOR_SYSTEM_PROMPT, stop=[";\n"])
+        assert completion.rstrip().endswith("```sql\n" + sql) and "as required" not in completion
+
+
+if __name__ == "__main__":
+    test_complete_statement_detection()
+    test_extract_finished_completion()
+    test_prose_preamble_is_not_sql()
+    test_stream_stops_at_complete_statement()
+    test_http_stream_is_closed_early()
+    print("✅ All SQL extraction tests passed!")
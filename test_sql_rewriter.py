@@ -0,0 +1,97 @@
+"""
+Test script for tenant predicate injection
+"""
+
+import sqlite3
+
+from sql_rewriter import inject_tenant_predicates
+
+
+def _make_db() -> sqlite3.Connection:
+    """In-memory database with two tenants"""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE projects (project_id TEXT, tenant_id TEXT, project_name TEXT, city TEXT)")
+    conn.execute("CREATE TABLE project_units (unit_id TEXT, project_id TEXT, tenant_id TEXT, configuration_type TEXT)")
+    conn.execute("INSERT INTO projects VALUES ('p1', 'T1', 'Alpha', 'Pune'), ('p2', 'T2', 'Beta', 'Pune')")
+    conn.execute("INSERT INTO project_units VALUES ('u1', 'p1', 'T1', '3BHK'), ('u2', 'p2', 'T2', '3BHK')")
+    return conn
+
+
+def test_no_tenant_is_passthrough():
+    sql = "SELECT COUNT(*) FROM projects"
+    assert inject_tenant_predicates(sql, None) == (sql, ())
+
+
+def test_simple_query_scoped():
+    conn = _make_db()
+    sql, params = inject_tenant_predicates("SELECT COUNT(*) FROM projects WHERE city = 'Pune' OR city = 'Mumbai'", "T1")
+    assert sql == "SELECT COUNT(*) FROM projects WHERE projects.tenant_id = ? AND (city = 'Pune' OR city = 'Mumbai')"
+    assert conn.execute(sql, params).fetchone()[0] == 1
+
+
+def test_join_and_subquery_scoped():
+    conn = _make_db()
+    queries = [
+        "SELECT p.project_name, u.unit_id FROM projects p JOIN project_units u ON p.project_id = u.project_id",
+        "SELECT p.project_name, u.unit_id FROM projects AS p LEFT JOIN project_units AS u ON p.project_id = u.project_id ORDER BY 1",
+        "SELECT project_name, (SELECT unit_id FROM project_units WHERE project_id = projects.project_id) FROM projects",
+        "SELECT project_name, unit_id FROM projects, project_units WHERE projects.project_id = project_units.project_id",
+    ]
+    for query in queries:
+        sql, params = inject_tenant_predicates(query, "T1")
+        assert conn.execute(sql, params).fetchall() == [("Alpha", "u1")], sql
+
+
+def test_outer_joins_keep_unmatched_rows():
+    conn = _make_db()
+    conn.execute("INSERT INTO projects VALUES ('p3', 'T1', 'Gamma', 'Pune')")
+    queries = [
+        "SELECT p.project_name, u.unit_id FROM projects p LEFT JOIN project_units u USING (project_id) ORDER BY 1",
+        "SELECT project_name, unit_id FROM projects NATURAL LEFT JOIN project_units ORDER BY 1",
+        "SELECT p.project_name, u.unit_id FROM project_units u RIGHT JOIN projects p ON p.project_id = u.project_id ORDER BY 1",
+    ]
+    for query in queries:
+        sql, params = inject_tenant_predicates(query, "T1")
+        assert conn.execute(sql, params).fetchall() == [("Alpha", "u1"), ("Gamma", None)], sql
+
+
+def test_compound_select_scoped():
+    conn = _make_db()
+    sql, params = inject_tenant_predicates("SELECT project_id FROM projects UNION SELECT project_id FROM project_units", "T2")
+    assert len(params) == 2
+    assert conn.execute(sql, params).fetchall() == [("p2",)]
+
+
+def test_parenthesized_from_items_scoped():
+    conn = _make_db()
+    queries = [
+        ("SELECT project_name FROM (projects)", [("Alpha",)]),
+        ("SELECT p.project_name, u.unit_id FROM (projects p JOIN project_units u ON p.project_id = u.project_id)",
+         [("Alpha", "u1")]),
+        ("SELECT p.project_name, u.unit_id FROM projects p, (project_units) u WHERE p.project_id = u.project_id",
+         [("Alpha", "u1")]),
+        ("SELECT u.unit_id FROM projects p, (project_units) u", [("u1",)]),
+    ]
+    for query, expected in queries:
+        sql, params = inject_tenant_predicates(query, "T1")
+        assert params and conn.execute(sql, params).fetchall() == expected, sql
+
+
+def test_unparseable_sql_rejected():
+    for bad in ["SELECT * FROM projects WHERE (city = 'Pune'", "SELECT * FROM projects WHERE tenant_id = ?"]:
+        try:
+            inject_tenant_predicates(bad, "T1")
+        except ValueError:
+            continue
+        raise AssertionError(f"Expected ValueError for: {bad}")
+
+
+if __name__ == "__main__":
+    test_no_tenant_is_passthrough()
+    test_simple_query_scoped()
+    test_join_and_subquery_scoped()
+    test_outer_joins_keep_unmatched_rows()
+    test_compound_select_scoped()
+    test_parenthesized_from_items_scoped()
+    test_unparseable_sql_rejected()
+    print("✅ SQL rewriter tests passed!")
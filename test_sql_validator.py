@@ -0,0 +1,43 @@
+"""
+Test script for pre-execution SQL validation
+"""
+
+from database import DatabaseInterface
+from sql_validator import format_findings, validate_sql
+from test_fixtures import make_tenant_db
+
+
+def test_rejects_non_select_statements():
+    db = DatabaseInterface(make_tenant_db())
+    for sql in ["DELETE FROM projects", "UPDATE projects SET city = 'X'", "DROP TABLE projects", ""]:
+        report = validate_sql(sql, db=db)
+        assert not report["ok"] and report["errors"], sql
+
+    # A WITH prefix does not smuggle in a write
+    report = validate_sql("WITH x AS (SELECT 1) DELETE FROM projects", db=db)
+    assert not report["ok"] and "read-only" in report["errors"][0]
+
+
+def test_rejects_multiple_statements():
+    db = DatabaseInterface(make_tenant_db())
+    report = validate_sql("SELECT 1; DROP TABLE projects", db=db)
+    assert not report["ok"]
+    assert db.execute_query("SELECT COUNT(*) FROM projects")[0][0][0] == 3
+
+
+def test_warns_about_cartesian_joins():
+    db = DatabaseInterface(make_tenant_db())
+    report = validate_sql("SELECT * FROM projects p, project_units u", db=db)
+    assert report["ok"]
+    assert any("Cartesian join" in warning for warning in report["warnings"])
+    assert "WARNING: Cartesian join" in format_findings(report)
+
+    report = validate_sql("SELECT * FROM projects p JOIN project_units u ON u.project_id = p.project_id LIMIT 5", db=db)
+    assert report["ok"] and not any("Cartesian" in warning for warning in report["warnings"])
+
+
+if __name__ == "__main__":
+    test_rejects_non_select_statements()
+    test_rejects_multiple_statements()
+    test_warns_about_cartesian_joins()
+    print("✅ SQL validator tests passed!")
@@ -0,0 +1,86 @@
+"""
+Test script for the synthetic data generator
+"""
+
+import os
+import sqlite3
+import tempfile
+
+from synthetic_data import generate_database, iter_dataset, unit_counts
+
+
+def _dump(path: str) -> list:
+    """All rows except the load-time created_at column"""
+    conn = sqlite3.connect(path)
+    rows = []
+    for table, key in (("projects", "project_id"), ("project_units", "unit_id")):
+        cursor = conn.execute(f"SELECT * FROM {table} ORDER BY {key}")
+        keep = [i for i, column in enumerate(cursor.description) if column[0] != "created_at"]
+        rows += [tuple(row[i] for i in keep) for row in cursor]
+    conn.close()
+    return rows
+
+
+def test_unit_counts_are_exact():
+    for units in (1, 39, 2000, 12345):
+        spec = {"units": units, "tenants": 3, "units_per_project": 40, "seed": 7}
+        counts = unit_counts(spec)
+        assert sum(counts) == units and min(counts) >= 1
+
+
+def test_same_seed_same_database():
+    directory = tempfile.mkdtemp()
+    paths = [os.path.join(directory, f"{name}.db") for name in ("a", "b", "c")]
+    for path, seed in zip(paths, (1, 1, 2)):
+        report = generate_database(path, 2000, tenants=4, seed=seed)
+        assert (report["units"], report["rejected"]) == (2000, 0)
+
+    first, second, other = (_dump(path) for path in paths)
+    assert first == second
+    assert first != other
+
+
+def test_replaces_existing_database():
+    directory = tempfile.mkdtemp()
+    fresh, reused = (os.path.join(directory, f"{name}.db") for name in ("fresh", "reused"))
+    generate_database(reused, 3000, tenants=2, seed=5)
+    conn = sqlite3.connect(reused)
+    conn.execute("CREATE TABLE leftover (x)")
+    conn.commit()
+    conn.close()
+
+    generate_database(fresh, 500, tenants=3, seed=9)
+    generate_database(reused, 500, tenants=3, seed=9)
+    assert _dump(fresh) == _dump(reused)
+    conn = sqlite3.connect(reused)
+    assert conn.execute("SELECT COUNT(*) FROM project_units").fetchone()[0] == 500
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'leftover'").fetchone()[0] == 0
+
+
+def test_realistic_shape():
+    spec = {"units": 4000, "tenants": 5, "units_per_project": 40, "seed": 3}
+    projects, units = iter_dataset(spec)
+    projects = list(projects)
+    units = list(units)
+
+    tenants = {project["tenant_id"] for project in projects}
+    assert len(tenants) == 5
+    largest = max(sum(1 for project in projects if project["tenant_id"] == tenant) for tenant in tenants)
+    assert largest > len(projects) / 5  # Skewed towards the first tenants
+
+    by_id = {project["project_id"]: project for project in projects}
+    assert all(by_id[unit["project_id"]]["tenant_id"] == unit["tenant_id"] for unit in units)
+    assert all(5 <= len(project["amenities"]) <= 20 for project in projects)
+    two_bhk = sum(1 for unit in units if unit["configuration_type"] == "2 BHK") / len(units)
+    assert 0.25 < two_bhk < 0.45
+    states = {"Chennai": "/TN/", "Pune": "/MH/", "Bangalore": "/KA/"}
+    assert all(states[project["city"]] in project["rera_registration_number"]
+               for project in projects if project["city"] in states)
+
+
+if __name__ == "__main__":
+    test_unit_counts_are_exact()
+    test_same_seed_same_database()
+    test_replaces_existing_database()
+    test_realistic_shape()
+    print("✅ Synthetic data tests passed!")
@@ -0,0 +1,70 @@
+"""
+Test script for tenant-scoped execution ("view" and "shard" modes)
+"""
+
+import os
+import sqlite3
+
+from database import DatabaseInterface
+from test_fixtures import make_tenant_db
+
+
+def _interface(mode: str) -> DatabaseInterface:
+    path = make_tenant_db()
+    return DatabaseInterface(path, mode, os.path.join(os.path.dirname(path), "shards"))
+
+
+def _count(db: DatabaseInterface, sql: str, tenant_id: str):
+    result, error = db.execute_query(sql, tenant_id=tenant_id)
+    return error if error else result[0][0]
+
+
+def test_view_mode_isolates_tenants():
+    db = _interface("view")
+    assert _count(db, "SELECT COUNT(*) FROM projects", "T1") == 2
+    assert _count(db, "SELECT COUNT(*) FROM project_units u JOIN projects p USING (project_id)", "T2") == 1
+
+    # The shared tables are unreachable except through the tenant's views
+    assert _count(db, "SELECT COUNT(*) FROM main.projects", "T1") == "not authorized"
+    conn = db.get_connection("T1")
+    for statement in ["CREATE TEMP VIEW leak AS SELECT * FROM main.projects",
+                      f"ATTACH DATABASE '{db.db_path}' AS other"]:
+        try:
+            conn.execute(statement)
+        except sqlite3.DatabaseError:
+            continue
+        raise AssertionError(f"Expected denial for: {statement}")
+
+
+def test_shard_mode_opens_only_the_shard():
+    db = _interface("shard")
+    assert _count(db, "SELECT COUNT(*) FROM projects", "T1") == 2  # No shard yet: view fallback
+
+    assert db.export_tenant_shard("T1") == 3
+    assert _count(db, "SELECT COUNT(*) FROM main.projects", "T1") == 2
+    assert _count(db, "SELECT COUNT(*) FROM main.project_units", "T1") == 3
+
+
+def test_shard_rebuild_invalidates_connections_and_cache():
+    db = _interface("shard")
+    db.export_tenant_shard("T1")
+    assert _count(db, "SELECT COUNT(*) FROM projects", "T1") == 2
+    assert db.execute_query("SELECT COUNT(*) FROM projects", tenant_id="T1")[0].cached
+
+    version = db.get_data_version("T1")
+    conn = sqlite3.connect(db.db_path)
+    conn.execute("DELETE FROM projects WHERE project_id = 'p2'")
+    conn.commit()
+    conn.close()
+    db.export_tenant_shard("T1")
+
+    assert db.get_data_version("T1") != version
+    result, _ = db.execute_query("SELECT COUNT(*) FROM projects", tenant_id="T1")
+    assert result.rows == [(1,)] and not result.cached
+
+
+if __name__ == "__main__":
+    test_view_mode_isolates_tenants()
+    test_shard_mode_opens_only_the_shard()
+    test_shard_rebuild_invalidates_connections_and_cache()
+    print("✅ Tenant mode tests passed!")
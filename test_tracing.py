@@ -0,0 +1,110 @@
+"""
+Test script for local span tracing and the rolling OTLP JSON exporter
+"""
+
+import json
+import os
+import tempfile
+
+from config import TRACE_SAMPLE_RATE
+from answer_cache import answer_cache
+from chatbot_core import RealEstateChatbot
+from database import db_interface
+from mock_llm import install_fake_llm, uninstall_fake_llm
+from tracing import RollingFileExporter, configure_tracing, current_trace_id, span, start_trace
+
+QUIET = {"latency_ms": 0, "ms_per_token": 0, "jitter": 0}
+
+
+def _use_temp_exporter(**kwargs) -> str:
+    path = os.path.join(tempfile.mkdtemp(), "traces.jsonl")
+    configure_tracing(exporter=RollingFileExporter(path, **kwargs))
+    return path
+
+
+def _spans(line: str) -> list:
+    return json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+
+
+def test_unsampled_traces_record_nothing():
+    path = _use_temp_exporter()
+    with start_trace("root", sample=False) as trace:
+        with span("child") as child:
+            assert child is None and current_trace_id() is None
+    assert len(trace.trace_id) == 32 and not os.path.exists(path)
+
+
+def test_head_sampling_rate():
+    _use_temp_exporter()
+    configure_tracing(sample_rate=0.25)
+    try:
+        sampled = 0
+        for _ in range(2000):
+            with start_trace("root") as trace:
+                sampled += trace.sampled
+        assert 400 < sampled < 600
+    finally:
+        configure_tracing(sample_rate=TRACE_SAMPLE_RATE)
+
+
+def test_ask_writes_a_span_tree():
+    path = _use_temp_exporter()
+    install_fake_llm(QUIET)
+    answer_cache.clear()
+    try:
+        response = RealEstateChatbot().ask("How many projects in Pune?", preserve_history=False, trace=True)
+    finally:
+        uninstall_fake_llm()
+        answer_cache.clear()
+
+    with open(path, encoding="utf-8") as f:
+        lines = f.readlines()
+    assert len(lines) == 1
+    spans = _spans(lines[0])
+    by_id = {s["spanId"]: s for s in spans}
+    assert {s["traceId"] for s in spans} == {response["trace_id"]}
+
+    def parent_name(s):
+        return by_id[s["parentSpanId"]]["name"] if "parentSpanId" in s else None
+
+    names = [(s["name"], parent_name(s)) for s in spans]
+    assert names[0] == ("chatbot.ask", None)
+    for expected in [("node.router", "chatbot.ask"), ("llm.chat", "node.router"),
+                     ("fuzzy.get_fuzzy_matching_context", "node.sql_gen"),
+                     ("sqlite.get_distinct_cities", "fuzzy.get_fuzzy_matching_context"),
+                     ("sqlite.query", "node.execute_sql"), ("llm.chat", "node.response")]:
+        assert expected in names, expected
+
+    query = next(s for s in spans if s["name"] == "sqlite.query")
+    attributes = {a["key"]: a["value"] for a in query["attributes"]}
+    assert attributes["db.rows"] == {"intValue": "1"} and "PUNE" in attributes["db.statement"]["stringValue"]
+    assert all(int(s["endTimeUnixNano"]) >= int(s["startTimeUnixNano"]) for s in spans)
+
+
+def test_failed_query_marks_span_error():
+    path = _use_temp_exporter()
+    with start_trace("root", sample=True):
+        _, error = db_interface.execute_query("SELECT nope FROM projects")
+    assert error
+    with open(path, encoding="utf-8") as f:
+        query = _spans(f.readline())[1]
+    assert query["status"]["code"] == 2 and "nope" in query["status"]["message"]
+
+
+def test_rolling_file():
+    path = _use_temp_exporter(max_bytes=2000, backups=2)
+    for _ in range(12):
+        with start_trace("root", sample=True):
+            with span("child", **{"padding": "x" * 100}):
+                pass
+    assert os.path.exists(f"{path}.1") and os.path.exists(f"{path}.2")
+    assert not os.path.exists(f"{path}.3") and os.path.getsize(path) <= 2000
+
+
+if __name__ == "__main__":
+    test_unsampled_traces_record_nothing()
+    test_head_sampling_rate()
+    test_ask_writes_a_span_tree()
+    test_failed_query_marks_span_error()
+    test_rolling_file()
+    print("✅ All tracing tests passed!")
@@ -0,0 +1,259 @@
+"""
+Tracing Module
+Head-sampled local spans per question, exported as OpenTelemetry (OTLP JSON) lines to a rolling file
+"""
+
+import functools
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from config import TRACE_SAMPLE_RATE, TRACE_FILE, TRACE_FILE_MAX_BYTES, TRACE_FILE_BACKUPS, TRACE_MAX_SPANS
+
+SERVICE_NAME = "real-estate-chatbot"
+
+# OTLP span kinds and status codes
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+
+class Span:
+    """One timed operation; attributes follow OpenTelemetry semantic conventions where they exist"""
+
+    __slots__ = ("trace", "name", "span_id", "parent_id", "kind", "start_ns", "end_ns", "attributes",
+                 "status_code", "status_message")
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], kind: int, attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.attributes = attributes
+        self.status_code = STATUS_UNSET
+        self.status_message = ""
+
+    def set(self, **attributes: Any) -> None:
+        """Add attributes (None values are skipped)"""
+        self.attributes.update((k, v) for k, v in attributes.items() if v is not None)
+
+    def set_error(self, message: str) -> None:
+        self.status_code = STATUS_ERROR
+        self.status_message = str(message)[:500]
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": self.status_code}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+class Trace:
+    """All spans of one question; only sampled traces record spans"""
+
+    def __init__(self, sampled: bool):
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.sampled = sampled
+        self.spans: List[Span] = []
+        self.dropped = 0  # Spans beyond TRACE_MAX_SPANS
+
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+# =======================
+# Exporter
+# =======================
+
+class RollingFileExporter:
+    """
+    Appends one OTLP JSON ExportTraceServiceRequest per trace to a file
+
+    When the file passes max_bytes it is renamed to .1 (older files shift up
+    to .<backups> and the oldest is deleted), like logging's
+    RotatingFileHandler. The OpenTelemetry Collector's file receiver and
+    otel-desktop-viewer read this format.
+    """
+
+    def __init__(self, path: str = TRACE_FILE, max_bytes: int = TRACE_FILE_MAX_BYTES,
+                 backups: int = TRACE_FILE_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace) -> None:
+        line = json.dumps({"resourceSpans": [{
+            "resource": {"attributes": [_otlp_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{"scope": {"name": "tracing"}, "spans": [span.to_otlp() for span in trace.spans]}]
+        }]}, separators=(",", ":")) + "\n"
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            if os.path.exists(self.path) and os.path.getsize(self.path) + len(line) > self.max_bytes:
+                self._rotate()
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def _rotate(self) -> None:
+        for index in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+_exporter: Optional[RollingFileExporter] = None
+_sample_rate = TRACE_SAMPLE_RATE
+
+
+def configure_tracing(sample_rate: Optional[float] = None, exporter: Optional[RollingFileExporter] = None) -> None:
+    """
+    Change the head-sampling rate and/or where sampled traces are written
+
+    Args:
+        sample_rate: Fraction of questions traced (0 disables, 1 traces all)
+        exporter: Destination for finished traces (defaults to TRACE_FILE)
+    """
+    global _sample_rate, _exporter
+    if sample_rate is not None:
+        _sample_rate = sample_rate
+    if exporter is not None:
+        _exporter = exporter
+
+
+# =======================
+# Spans
+# =======================
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def start_trace(name: str, sample: Optional[bool] = None, **attributes: Any) -> Iterator[Trace]:
+    """
+    Root span of one question
+
+    The sampling decision is made here, once per trace: unsampled traces
+    still get a trace id, but every span() inside them is a no-op.
+
+    Args:
+        name: Root span name
+        sample: Force (True) or suppress (False) tracing; None uses the sample rate
+        **attributes: Root span attributes
+    """
+    global _exporter
+    sampled = sample if sample is not None else (_sample_rate > 0 and random.random() < _sample_rate)
+    trace = Trace(sampled)
+    if not sampled:
+        yield trace
+        return
+
+    root = Span(trace, name, None, KIND_SERVER, {k: v for k, v in attributes.items() if v is not None})
+    trace.spans.append(root)
+    token = _current_span.set(root)
+    try:
+        yield trace
+    except BaseException as e:
+        root.set_error(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _current_span.reset(token)
+        root.end_ns = time.time_ns()
+        if trace.dropped:
+            root.set(**{"trace.dropped_spans": trace.dropped})
+        if _exporter is None:
+            _exporter = RollingFileExporter()
+        try:
+            _exporter.export(trace)
+        except OSError:
+            pass  # Tracing must never fail a request
+
+
+@contextmanager
+def span(name: str, kind: int = KIND_INTERNAL, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Child of the current span; yields None (and costs one ContextVar lookup) when not tracing
+
+    Exceptions mark the span as failed and propagate.
+    """
+    parent = _current_span.get()
+    if parent is None or len(parent.trace.spans) >= TRACE_MAX_SPANS:
+        if parent is not None:
+            parent.trace.dropped += 1
+        yield None
+        return
+
+    current = Span(parent.trace, name, parent.span_id, kind, {k: v for k, v in attributes.items() if v is not None})
+    parent.trace.spans.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.set_error(f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end_ns = time.time_ns()
+
+
+def traced(name: str, kind: int = KIND_INTERNAL) -> Callable:
+    """Decorator running the function inside span(name)"""
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            if _current_span.get() is None:
+                return fn(*args, **kwargs)
+            with span(name, kind):
+                return fn(*args, **kwargs)
+        return run
+    return decorate
+
+
+def annotate(**attributes: Any) -> None:
+    """Add attributes to the current span (no-op when not tracing)"""
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+def mark_error(message: str) -> None:
+    """Mark the current span as failed without raising (no-op when not tracing)"""
+    current = _current_span.get()
+    if current is not None:
+        current.set_error(message)
+
+
+def current_trace_id() -> Optional[str]:
+    """Trace id of the sampled trace running in this context, if any"""
+    current = _current_span.get()
+    return current.trace.trace_id if current is not None else None